@@ -0,0 +1,534 @@
+"""
+Annotation document shared by the editors.
+
+Annotations are kept as small records in image coordinates. While editing
+they are shown as vector items on the Tk canvas (see CanvasRenderer), so
+drawing, undo and redo never touch the screenshot's pixels; rasterize()
+burns them in once, when the result is saved or copied.
+"""
+import math
+import threading
+import tkinter as tk
+from collections import namedtuple, OrderedDict
+from PIL import Image, ImageDraw, ImageTk
+from display import pad_box, clamp_box, intersect_box, box_is_empty, points_box
+from redaction import redact, redact_box
+from fonts import font_cache, STAMP_FONTS
+
+
+Arrow = namedtuple('Arrow', 'x1 y1 x2 y2 color width')
+Line = namedtuple('Line', 'x1 y1 x2 y2 color width')
+Rect = namedtuple('Rect', 'x1 y1 x2 y2 color width')
+Circle = namedtuple('Circle', 'x1 y1 x2 y2 color width')  # ellipse inside the box
+Text = namedtuple('Text', 'x y text color size')  # anchored top-left
+Highlight = namedtuple('Highlight', 'points color width opacity')
+Blur = namedtuple('Blur', 'x1 y1 x2 y2 strength mode', defaults=('pixelate',))  # see redaction.py
+Stamp = namedtuple('Stamp', 'x y text color size')  # centred on (x, y)
+Badge = namedtuple('Badge', 'x y text bg_color fg_color size')  # centred on (x, y)
+
+# Highlighter paths are simplified to within this many image pixels
+STROKE_TOLERANCE = 1.0
+
+# Rough memory of a record, plus a highlighter point, for the memory budget
+RECORD_BYTES = 200
+POINT_BYTES = 80
+
+# Blur previews pushed out by the memory budget are shown as this box instead
+EVICTED_BLUR_FILL = '#555555'
+
+
+def tk_color(color):
+    """Canvas colour for an RGB tuple or a '#rrggbb' string"""
+    if isinstance(color, str):
+        return color
+    return '#%02x%02x%02x' % tuple(color[:3])
+
+
+def arrow_head(x1, y1, x2, y2, width):
+    """Triangle of an arrow head at (x2, y2): length 15 + 2w, half width 6 + w"""
+    angle = math.atan2(y2 - y1, x2 - x1)
+    length = 15 + width * 2
+    half = 6 + width
+    cos, sin = math.cos(angle), math.sin(angle)
+    return [
+        (x2, y2),
+        (x2 - length * cos - half * sin, y2 - length * sin + half * cos),
+        (x2 - length * cos + half * sin, y2 - length * sin - half * cos),
+    ]
+
+
+# Pre-rendered stamp or badge: RGBA image and its top-left relative to the centre
+Sprite = namedtuple('Sprite', 'image offset')
+BADGE_PAD = 4
+
+
+class SpriteCache:
+    """
+    Stamps and badges rendered once as RGBA sprites, keyed by kind, text,
+    colours, size and display scale, with least-recently-used eviction.
+    Placing a marker is then a single alpha paste on export and a shared
+    PhotoImage on the canvas.
+    """
+    
+    def __init__(self, max_sprites=256):
+        self.max_sprites = max_sprites
+        self._sprites = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def key(record, scale=1.0):
+        if isinstance(record, Badge):
+            return ('badge', record.text, record.bg_color, record.fg_color, record.size, scale)
+        return ('stamp', record.text, record.color, record.size, scale)
+    
+    def get(self, record, scale=1.0):
+        key = self.key(record, scale)
+        with self._lock:
+            sprite = self._sprites.get(key)
+            if sprite is not None:
+                self._sprites.move_to_end(key)
+                return sprite
+        
+        sprite = self._render(record, scale)
+        with self._lock:
+            self._sprites[key] = sprite
+            while len(self._sprites) > self.max_sprites:
+                self._sprites.popitem(last=False)
+        return sprite
+    
+    def _render(self, record, scale):
+        size = max(1, round(record.size * scale))
+        badge = isinstance(record, Badge)
+        font = font_cache.get(size) if badge else font_cache.get(size, STAMP_FONTS)
+        left, top, right, bottom = font.getbbox(record.text)
+        w, h = right - left, bottom - top
+        
+        # Area in text-origin coordinates: the ink, plus the badge background.
+        # The background reaches w // 2 either side of the centre, as it always
+        # has, so an odd-width text overhangs it by a pixel on the right
+        area = (left, top, right, bottom)
+        if badge:
+            pad = max(1, round(BADGE_PAD * scale))
+            bg_w, bg_h = w // 2 * 2, h // 2 * 2
+            area = (min(left, -pad), min(top, -pad), max(right, bg_w + pad + 1), max(bottom, bg_h + pad + 1))
+        image = Image.new('RGBA', (area[2] - area[0], area[3] - area[1]), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(image)
+        ox, oy = -area[0], -area[1]
+        if badge:
+            draw.rectangle([ox - pad, oy - pad, ox + bg_w + pad, oy + bg_h + pad], fill=record.bg_color)
+            draw.text((ox, oy), record.text, fill=record.fg_color, font=font)
+        else:
+            draw.text((ox, oy), record.text, fill=record.color, font=font)
+        # The text origin sits half the text size up-left of the centre
+        return Sprite(image, (area[0] - w // 2, area[1] - h // 2))
+
+
+sprite_cache = SpriteCache()
+
+
+def bounds(record):
+    """Image area a record can touch, including line width and arrow heads"""
+    if isinstance(record, (Arrow, Line, Rect)):
+        pad = record.width
+        if isinstance(record, Arrow):
+            pad += 15 + record.width * 3  # arrow head length and half width
+        return points_box([(record.x1, record.y1), (record.x2, record.y2)], pad)
+    if isinstance(record, Circle):
+        return pad_box(points_box([(record.x1, record.y1), (record.x2, record.y2)]), record.width)
+    if isinstance(record, Text):
+        left, top, right, bottom = font_cache.get(record.size).getbbox(record.text)
+        return pad_box((record.x + left, record.y + top, record.x + right, record.y + bottom), 2)
+    if isinstance(record, Highlight):
+        return points_box(record.points, record.width // 2 + 2)
+    if isinstance(record, Blur):
+        return (min(record.x1, record.x2), min(record.y1, record.y2),
+                max(record.x1, record.x2), max(record.y1, record.y2))
+    # Stamps and badges: their sprite
+    sprite = sprite_cache.get(record)
+    x, y = record.x + sprite.offset[0], record.y + sprite.offset[1]
+    return (x, y, x + sprite.image.width, y + sprite.image.height)
+
+
+def record_bytes(record):
+    """Rough memory held by a record (highlighter paths dominate)"""
+    if isinstance(record, Highlight):
+        return RECORD_BYTES + POINT_BYTES * len(record.points)
+    return RECORD_BYTES
+
+
+def simplify_path(points, tolerance=STROKE_TOLERANCE):
+    """
+    Ramer-Douglas-Peucker: drop points that lie within tolerance of the
+    polyline through the points that are kept. Endpoints are always kept.
+    """
+    points = [p for i, p in enumerate(points) if i == 0 or p != points[i - 1]]
+    if len(points) < 3:
+        return points
+    
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        (x1, y1), (x2, y2) = points[first], points[last]
+        dx, dy = x2 - x1, y2 - y1
+        length = math.hypot(dx, dy)
+        farthest, index = -1.0, None
+        for i in range(first + 1, last):
+            px, py = points[i]
+            if length:
+                distance = abs(dy * (px - x1) - dx * (py - y1)) / length
+            else:
+                distance = math.hypot(px - x1, py - y1)
+            if distance > farthest:
+                farthest, index = distance, i
+        if index is not None and farthest > tolerance:
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+    return [p for p, kept in zip(points, keep) if kept]
+
+
+def translate(record, dx, dy):
+    """The same record moved by (dx, dy)"""
+    if isinstance(record, Highlight):
+        return record._replace(points=[(x + dx, y + dy) for x, y in record.points])
+    changes = {}
+    for name in ('x', 'x1', 'x2'):
+        if name in record._fields:
+            changes[name] = getattr(record, name) + dx
+    for name in ('y', 'y1', 'y2'):
+        if name in record._fields:
+            changes[name] = getattr(record, name) + dy
+    return record._replace(**changes)
+
+
+def render(img, record):
+    """Draw one record onto an RGB image in place and return the image"""
+    draw = ImageDraw.Draw(img)
+
+    if isinstance(record, Arrow):
+        draw.line([record.x1, record.y1, record.x2, record.y2], fill=record.color, width=record.width)
+        draw.polygon(arrow_head(record.x1, record.y1, record.x2, record.y2, record.width),
+                     fill=record.color, outline=record.color)
+    elif isinstance(record, Line):
+        draw.line([record.x1, record.y1, record.x2, record.y2], fill=record.color, width=record.width)
+    elif isinstance(record, Rect):
+        draw.rectangle(_ordered(record), outline=record.color, width=record.width)
+    elif isinstance(record, Circle):
+        draw.ellipse(_ordered(record), outline=record.color, width=record.width)
+    elif isinstance(record, Text):
+        draw.text((record.x, record.y), record.text, fill=record.color, font=font_cache.get(record.size))
+    elif isinstance(record, Highlight):
+        _render_highlight(img, record)
+    elif isinstance(record, Blur):
+        redact_box(img, bounds(record), record.mode, record.strength)
+    elif isinstance(record, (Stamp, Badge)):
+        sprite = sprite_cache.get(record)
+        img.paste(sprite.image, (int(record.x) + sprite.offset[0], int(record.y) + sprite.offset[1]),
+                  sprite.image)
+    return img
+
+
+def _ordered(record):
+    return [min(record.x1, record.x2), min(record.y1, record.y2),
+            max(record.x1, record.x2), max(record.y1, record.y2)]
+
+
+def _render_highlight(img, record):
+    """
+    Blend the stroke into the RGB image within its bounding box only: the
+    stroke is drawn as an opacity mask the size of that box and the colour
+    is composited through it, so the cost follows the stroke, not the frame.
+    """
+    if len(record.points) < 2:
+        return
+    box = clamp_box(bounds(record), img.size)
+    if box_is_empty(box):
+        return
+    left, top = box[0], box[1]
+    size = (box[2] - left, box[3] - top)
+    points = [(int(x) - left, int(y) - top) for x, y in record.points]
+
+    # Segments and joints are drawn at one alpha, so overlaps don't darken
+    mask = Image.new('L', size, 0)
+    mask_draw = ImageDraw.Draw(mask)
+    r = record.width // 2
+    for (x1, y1), (x2, y2) in zip(points, points[1:]):
+        mask_draw.line([(x1, y1), (x2, y2)], fill=record.opacity, width=record.width)
+        mask_draw.ellipse([x1 - r, y1 - r, x1 + r, y1 + r], fill=record.opacity)
+    x, y = points[-1]
+    mask_draw.ellipse([x - r, y - r, x + r, y + r], fill=record.opacity)
+
+    region = img.crop(box)
+    color = Image.new('RGB', size, tuple(record.color[:3]))
+    img.paste(Image.composite(color, region, mask), box[:2])
+
+
+def rasterize(base, records, box=None):
+    """
+    The base image with records burned in, as a new image. With a box only
+    that area is produced; the work area is grown to whole blur regions, and
+    to the regions of blurs overlapping those, until it stops growing, so
+    the result matches cropping a full rasterization.
+    """
+    if box is None:
+        box = (0, 0) + base.size
+    box = clamp_box(box, base.size)
+
+    work = box
+    blurs = [clamp_box(bounds(record), base.size) for record in records if isinstance(record, Blur)]
+    grown = True
+    while grown:
+        grown = False
+        for blur in blurs:
+            if box_is_empty(intersect_box(blur, work)):
+                continue
+            wider = (min(work[0], blur[0]), min(work[1], blur[1]),
+                     max(work[2], blur[2]), max(work[3], blur[3]))
+            if wider != work:
+                work = wider
+                grown = True
+
+    img = base.crop(work) if work != (0, 0) + base.size else base.copy()
+    for record in records:
+        if box_is_empty(intersect_box(bounds(record), work)):
+            continue
+        img = render(img, translate(record, -work[0], -work[1]))
+
+    if work != box:
+        img = img.crop((box[0] - work[0], box[1] - work[1], box[2] - work[0], box[3] - work[1]))
+    return img
+
+
+class CanvasRenderer:
+    """
+    Shows records as canvas items. Canvas position is image position *
+    scale + offset. Every item of a record carries the record's tag, so it
+    can be removed with one delete.
+
+    Blurs are the only records that hold pixels: a display-size patch each.
+    trim_patches() swaps the oldest for plain boxes to stay within a budget.
+    """
+
+    def __init__(self, canvas, base, scale=1.0, offset=(0, 0)):
+        self.canvas = canvas
+        self.base = base
+        self.scale = scale
+        self.offset = offset
+        self.patches = OrderedDict()  # tag -> PhotoImage shown by that record, oldest first
+        self.patch_bytes = 0
+        self.sprite_photos = {}  # sprite key -> PhotoImage shared by every copy
+
+    def point(self, x, y):
+        return (x * self.scale + self.offset[0], y * self.scale + self.offset[1])
+    
+    def extend_stroke(self, item, points, x, y, color, width, tags=()):
+        """
+        Add image point (x, y) to a highlighter stroke being drawn. The
+        stroke is one canvas polyline that grows in place, however long the
+        scribble gets: item is the polyline so far (None before the second
+        point) and the one to keep is returned.
+        """
+        if (x, y) == points[-1]:
+            return item
+        points.append((x, y))
+        if item is None:
+            return self.canvas.create_line(
+                *(c for point in points for c in self.point(*point)),
+                fill=color, width=width,
+                capstyle=tk.ROUND, joinstyle=tk.ROUND, stipple='gray50', tags=tags
+            )
+        self.canvas.insert(item, tk.END, self.point(x, y))
+        return item
+
+    def size(self, value):
+        return max(1, round(value * self.scale))
+
+    def draw(self, record, tag):
+        canvas = self.canvas
+        tags = ("annotation", tag)
+
+        if isinstance(record, (Arrow, Line)):
+            options = {}
+            if isinstance(record, Arrow):
+                # Same head as arrow_head(): length 15 + 2w, half width 6 + w
+                length = self.scale * (15 + record.width * 2)
+                options = dict(arrow=tk.LAST, arrowshape=(length, length, self.scale * (6 + record.width / 2)))
+            canvas.create_line(*self.point(record.x1, record.y1), *self.point(record.x2, record.y2),
+                               fill=tk_color(record.color), width=self.size(record.width),
+                               tags=tags, **options)
+        elif isinstance(record, Rect):
+            canvas.create_rectangle(*self.point(record.x1, record.y1), *self.point(record.x2, record.y2),
+                                    outline=tk_color(record.color), width=self.size(record.width), tags=tags)
+        elif isinstance(record, Circle):
+            canvas.create_oval(*self.point(record.x1, record.y1), *self.point(record.x2, record.y2),
+                               outline=tk_color(record.color), width=self.size(record.width), tags=tags)
+        elif isinstance(record, Text):
+            # Negative Tk font sizes are pixels, matching the PIL font size
+            canvas.create_text(*self.point(record.x, record.y), text=record.text, anchor=tk.NW,
+                               fill=tk_color(record.color), font=('Arial', -self.size(record.size)),
+                               tags=tags)
+        elif isinstance(record, Highlight):
+            coords = [c for x, y in record.points for c in self.point(x, y)]
+            canvas.create_line(*coords, fill=tk_color(record.color), width=self.size(record.width),
+                               capstyle=tk.ROUND, joinstyle=tk.ROUND, stipple='gray50', tags=tags)
+        elif isinstance(record, Blur):
+            self.draw_blur(record, tags)
+        elif isinstance(record, (Stamp, Badge)):
+            self.draw_sprite(record, tags)
+
+    def draw_sprite(self, record, tags=()):
+        """
+        Stamp or badge as its sprite at display scale; returns the item.
+        The item's coordinates are its top-left, see sprite_offset().
+        """
+        key = sprite_cache.key(record, self.scale)
+        photo = self.sprite_photos.get(key)
+        if photo is None:
+            photo = ImageTk.PhotoImage(sprite_cache.get(record, self.scale).image, master=self.canvas)
+            self.sprite_photos[key] = photo
+        x, y = self.point(record.x, record.y)
+        dx, dy = self.sprite_offset(record)
+        return self.canvas.create_image(x + dx, y + dy, anchor=tk.NW, image=photo, tags=tags)
+    
+    def sprite_offset(self, record):
+        """Canvas offset from a stamp or badge's centre to its item's top-left"""
+        return sprite_cache.get(record, self.scale).offset
+    
+    def draw_blur(self, record, tags):
+        """The redacted region of the base frame, at display size"""
+        box = clamp_box(bounds(record), self.base.size)
+        if box_is_empty(box):
+            return
+        patch = redact(self.base.crop(box), record.mode, record.strength)
+        left, top = self.point(box[0], box[1])
+        right, bottom = self.point(box[2], box[3])
+        size = (max(1, round(right - left)), max(1, round(bottom - top)))
+        if size != patch.size:
+            resample = Image.Resampling.BILINEAR if record.mode in ('blur', 'gaussian') else Image.Resampling.NEAREST
+            patch = patch.resize(size, resample)
+        photo = ImageTk.PhotoImage(patch, master=self.canvas)
+        self.patches[tags[-1]] = photo
+        self.patch_bytes += self._photo_bytes(photo)
+        self.canvas.create_image(left, top, anchor=tk.NW, image=photo, tags=tags)
+
+    @staticmethod
+    def _photo_bytes(photo):
+        return photo.width() * photo.height() * 4  # Tk keeps 32-bit pixels
+
+    def trim_patches(self, budget):
+        """
+        Show the oldest blurs as solid boxes, freeing their patches, until
+        the patches left take at most budget bytes. The newest is kept.
+        """
+        while self.patch_bytes > budget and len(self.patches) > 1:
+            tag, photo = self.patches.popitem(last=False)
+            self.patch_bytes -= self._photo_bytes(photo)
+            for item in self.canvas.find_withtag(tag):
+                box = self.canvas.bbox(item)
+                if box is None:
+                    continue
+                # Same place in the stacking order, so later items stay on top
+                replacement = self.canvas.create_rectangle(*box, fill=EVICTED_BLUR_FILL, width=0,
+                                                           tags=self.canvas.gettags(item))
+                self.canvas.tag_lower(replacement, item)
+                self.canvas.delete(item)
+
+    def delete(self, tag):
+        self.canvas.delete(tag)
+        photo = self.patches.pop(tag, None)
+        if photo is not None:
+            self.patch_bytes -= self._photo_bytes(photo)
+
+    def clear(self):
+        self.canvas.delete("annotation")
+        self.patches.clear()
+        self.patch_bytes = 0
+
+
+class AnnotationDocument:
+    """
+    Ordered annotation records with undo/redo. With a renderer, the canvas
+    is kept in step: record i is drawn with tag(i).
+
+    With a memory_budget (bytes), the redo steps furthest back are dropped
+    first when the budget is passed, then the renderer's oldest blur
+    previews; the records themselves are never dropped.
+    """
+
+    def __init__(self, renderer=None, memory_budget=None):
+        self.renderer = renderer
+        self.memory_budget = memory_budget
+        self.records = []
+        self.redo_records = []
+
+    @property
+    def memory_used(self):
+        """Rough bytes held by the records, the redo steps and the blur previews"""
+        used = sum(map(record_bytes, self.records)) + sum(map(record_bytes, self.redo_records))
+        if self.renderer is not None:
+            used += self.renderer.patch_bytes
+        return used
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
+
+    @staticmethod
+    def tag(index):
+        return f"annotation{index}"
+
+    def add(self, record):
+        self.records.append(record)
+        self.redo_records.clear()
+        self._show(record)
+
+    def undo(self):
+        """Remove the newest record; returns it, or None if there is none"""
+        if not self.records:
+            return None
+        record = self.records.pop()
+        self.redo_records.append(record)
+        if self.renderer is not None:
+            self.renderer.delete(self.tag(len(self.records)))
+        self._trim()
+        return record
+
+    def redo(self):
+        """Restore the last undone record; returns it, or None"""
+        if not self.redo_records:
+            return None
+        record = self.redo_records.pop()
+        self.records.append(record)
+        self._show(record)
+        return record
+
+    def set_base(self, base):
+        """Show the records over another frame (only blurs depend on it)"""
+        if self.renderer is not None:
+            self.renderer.base = base
+            self.renderer.clear()
+            for index, record in enumerate(self.records):
+                self.renderer.draw(record, self.tag(index))
+            self._trim()
+
+    def rasterize(self, base, box=None):
+        return rasterize(base, self.records, box)
+
+    def _show(self, record):
+        if self.renderer is not None:
+            self.renderer.draw(record, self.tag(len(self.records) - 1))
+        self._trim()
+
+    def _trim(self):
+        """Keep memory_used within memory_budget, see the class docstring"""
+        if self.memory_budget is None:
+            return
+        over = self.memory_used - self.memory_budget
+        while over > 0 and self.redo_records:
+            over -= record_bytes(self.redo_records.pop(0))
+        if over > 0 and self.renderer is not None:
+            self.renderer.trim_patches(self.renderer.patch_bytes - over)
@@ -0,0 +1,77 @@
+"""
+Annotation export benchmark.
+
+Annotations are kept as records and only burned into the screenshot when it
+is saved or copied, so this is the one place their drawing cost shows up.
+Rasterizes 500 mixed records at common screen sizes, and checks that
+rasterizing a selection box gives the same pixels as cropping the full
+result (the Lightshot editor exports only its selection), including for
+a box touching a blur that overlaps another blur.
+
+Run from the project folder:
+    python -m benchmarks.bench_annotations
+"""
+import random
+import time
+from annotations import Arrow, Line, Rect, Circle, Text, Highlight, Blur, Stamp, Badge, rasterize
+from benchmarks.frames import make_frame
+
+
+SIZES = [(1920, 1080), (2560, 1440), (3840, 2160)]
+RECORDS = 500
+REPEAT = 3
+
+
+def random_record(rng, width, height):
+    x, y = rng.randrange(width - 400), rng.randrange(height - 300)
+    w, h = rng.randrange(20, 400), rng.randrange(20, 300)
+    color = (rng.randrange(256), rng.randrange(256), rng.randrange(256))
+    weight = rng.randrange(1, 8)
+    kind = rng.choice([Arrow, Line, Rect, Circle, Text, Highlight, Blur, Stamp, Badge])
+    if kind in (Arrow, Line, Rect, Circle):
+        return kind(x, y, x + w, y + h, color, weight)
+    if kind is Text:
+        return Text(x, y, 'Annotation %d' % rng.randrange(1000), color, 12 + weight * 2)
+    if kind is Highlight:
+        points = [(x + i * w // 10, y + rng.randrange(h)) for i in range(10)]
+        return Highlight(points, color, max(8, weight * 3), 100)
+    if kind is Blur:
+        return Blur(x, y, x + w, y + h, 10)
+    if kind is Stamp:
+        return Stamp(x, y, '✔', color, 48)
+    return Badge(x, y, str(rng.randrange(1, 100)), color, (255, 255, 255), 14)
+
+
+def best_of(fn, repeat=REPEAT):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings), result
+
+
+def main(seed=1):
+    print(f"{'size':<12}{'full':>10}{'box':>10}   ({RECORDS} records, ms)")
+    print("-" * 42)
+    for width, height in SIZES:
+        rng = random.Random(seed)
+        frame = make_frame(width, height)
+        records = [random_record(rng, width, height) for _ in range(RECORDS)]
+        box = (width // 4, height // 4, width * 3 // 4, height * 3 // 4)
+
+        full_ms, full = best_of(lambda: rasterize(frame, records))
+        box_ms, part = best_of(lambda: rasterize(frame, records, box))
+        assert part.tobytes() == full.crop(box).tobytes(), f"box mismatch at {width}x{height}"
+        print(f"{width}x{height:<7}{full_ms:>10.0f}{box_ms:>10.0f}")
+    
+    # The box only touches the first blur, whose result depends on the second
+    frame = make_frame(400, 300)
+    chained = [Blur(153, 7, 300, 100, 10), Blur(50, 50, 200, 200, 10)]
+    box = (150, 60, 153, 70)
+    assert rasterize(frame, chained, box).tobytes() == rasterize(frame, chained).crop(box).tobytes(), \
+        "box mismatch with chained blurs"
+
+
+if __name__ == "__main__":
+    main()
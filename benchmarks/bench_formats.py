@@ -0,0 +1,67 @@
+"""
+Output format benchmark.
+
+Encodes the bench_png corpus (text page, flat UI, gradient, photo at
+1080p) in every format in encoders.OUTPUT_FORMATS, with the default PNG
+profile, palette mode and lossy quality, and reports encode time and
+size. Each file is decoded again to check that its metadata survives and,
+for the lossless formats, that the pixels do.
+
+Run from the project folder:
+    python -m benchmarks.bench_formats
+"""
+import io
+import statistics
+import time
+from PIL import Image, ImageChops
+from encoders import OUTPUT_FORMATS, write_image, read_metadata
+from benchmarks.bench_png import make_corpus, REPEAT
+
+
+METADATA = {'viewclipper_version': '1.0', 'viewclipper_mode': 'region'}
+
+
+def encode(img, name):
+    output = io.BytesIO()
+    start = time.perf_counter()
+    write_image(img, output, name, METADATA)
+    return time.perf_counter() - start, output
+
+
+def check(img, name, output):
+    """Whether the metadata and (for lossless formats) the pixels come back"""
+    output.seek(0)
+    decoded = Image.open(output)
+    if read_metadata(decoded).get('viewclipper_format') != name:
+        return "metadata lost"
+    if OUTPUT_FORMATS[name].lossless and ImageChops.difference(decoded.convert('RGB'), img).getbbox():
+        return "pixels differ"
+    return "ok"
+
+
+def main():
+    corpus = make_corpus()
+
+    print(f"{'format':<15}{'image':<10}{'ms':>8}{'KB':>9}  check")
+    print("-" * 50)
+    totals = {}
+    for name in OUTPUT_FORMATS:
+        total_s = total_bytes = 0
+        for image_name, img in corpus.items():
+            runs = [encode(img, name) for _ in range(REPEAT)]
+            seconds = statistics.median(run[0] for run in runs)
+            output = runs[0][1]
+            total_s += seconds
+            total_bytes += output.tell()
+            print(f"{name:<15}{image_name:<10}{seconds * 1000:>8.0f}{output.tell() / 1024:>9.0f}  "
+                  f"{check(img, name, output)}")
+        totals[name] = (total_s, total_bytes)
+        print()
+
+    print(f"{'total':<15}{'ms':>8}{'KB':>9}   (whole corpus)")
+    for name, (seconds, size) in totals.items():
+        print(f"{name:<15}{seconds * 1000:>8.0f}{size / 1024:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
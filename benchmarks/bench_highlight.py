@@ -0,0 +1,72 @@
+"""
+Highlighter commit benchmark.
+
+Commits the same 400x60 px stroke on frames of increasing size, once with
+the old full-frame blend (RGBA overlay the size of the screen, RGB->RGBA,
+alpha composite, RGBA->RGB) and once with the bounding-box blend in
+annotations.py. The new timing should stay flat as the frame grows.
+Both results are compared pixel by pixel (they may differ by one level
+from rounding).
+
+Run from the project folder:
+    python -m benchmarks.bench_highlight
+"""
+import time
+from PIL import Image, ImageChops, ImageDraw
+from annotations import Highlight, render
+from benchmarks.frames import make_frame
+
+
+SIZES = [(1920, 1080), (2560, 1440), (3840, 2160), (5120, 2880)]
+REPEAT = 10
+
+
+def stroke(width, height):
+    x, y = width // 3, height // 2
+    points = [(x + i * 20, y + (i % 4) * 15) for i in range(21)]
+    return Highlight(points, (255, 235, 59), 15, 100)
+
+
+def full_frame_highlight(img, record):
+    """The previous implementation, kept here for comparison"""
+    overlay = Image.new('RGBA', img.size, (0, 0, 0, 0))
+    overlay_draw = ImageDraw.Draw(overlay)
+    rgba = tuple(record.color[:3]) + (record.opacity,)
+    r = record.width // 2
+    points = record.points
+    for (x1, y1), (x2, y2) in zip(points, points[1:]):
+        overlay_draw.line([(x1, y1), (x2, y2)], fill=rgba, width=record.width)
+        overlay_draw.ellipse([x1 - r, y1 - r, x1 + r, y1 + r], fill=rgba)
+    x, y = points[-1]
+    overlay_draw.ellipse([x - r, y - r, x + r, y + r], fill=rgba)
+    return Image.alpha_composite(img.convert('RGBA'), overlay).convert('RGB')
+
+
+def best_of(fn):
+    timings = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings), result
+
+
+def main():
+    print(f"{'size':<12}{'full frame':>12}{'bbox':>10}")
+    print("-" * 34)
+    for width, height in SIZES:
+        frame = make_frame(width, height)
+        record = stroke(width, height)
+        old_ms, old = best_of(lambda: full_frame_highlight(frame, record))
+        # Blending in place: time repeated strokes on one copy, check a fresh one
+        target = frame.copy()
+        new_ms, _ = best_of(lambda: render(target, record))
+        new = render(frame.copy(), record)
+        extrema = ImageChops.difference(old, new).getextrema()
+        assert max(high for _, high in extrema) <= 1, f"pixel mismatch at {width}x{height}"
+        print(f"{width}x{height:<7}{old_ms:>12.1f}{new_ms:>10.2f}")
+    print("(ms per stroke)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Frame ingestion microbenchmark.
+
+Compares the old path (screenshot.rgb -> Image.frombytes -> copy) with the
+raw BGRX decoder used by capture_service.frame_to_image.
+
+Run from the project folder:
+    python -m benchmarks.bench_ingest
+"""
+import os
+import time
+from mss.screenshot import ScreenShot
+from PIL import Image
+from capture_service import frame_to_image
+
+
+RESOLUTIONS = [
+    ('1080p', 1920, 1080),
+    ('1440p', 2560, 1440),
+    ('4K', 3840, 2160),
+]
+
+
+def make_frame(width, height):
+    """Fresh mss screenshot with random BGRA pixels (no cached .rgb)"""
+    return ScreenShot.from_size(bytearray(os.urandom(width * height * 4)), width, height)
+
+
+def old_path(shot):
+    full = Image.frombytes('RGB', shot.size, shot.rgb)
+    work = full.copy()
+    return full, work
+
+
+def new_path(shot):
+    full = frame_to_image(shot)
+    # Working image shares the frame until the first edit
+    return full, full
+
+
+def measure(func, width, height, rounds):
+    frames = [make_frame(width, height) for _ in range(rounds)]
+    timings = []
+    for shot in frames:
+        start = time.perf_counter()
+        func(shot)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return timings[len(timings) // 2]
+
+
+def main(rounds=7):
+    print(f"{'Size':<8}{'old (ms)':>12}{'new (ms)':>12}{'speedup':>10}")
+    print("-" * 42)
+    for name, width, height in RESOLUTIONS:
+        old_ms = measure(old_path, width, height, rounds)
+        new_ms = measure(new_path, width, height, rounds)
+        print(f"{name:<8}{old_ms:>12.1f}{new_ms:>12.1f}{old_ms / new_ms:>9.1f}x")
+
+    # Sanity check: both paths must produce identical pixels
+    shot = make_frame(64, 32)
+    assert old_path(shot)[0].tobytes() == new_path(shot)[0].tobytes()
+
+
+if __name__ == "__main__":
+    main()
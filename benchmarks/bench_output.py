@@ -0,0 +1,143 @@
+"""
+Output fan-out benchmark.
+
+For each editor action (Save Local, Save Cloud, Copy) on a 1080p and a 4K
+capture, compares the previous output path with the shipped encode-once
+functions from capture.py:
+
+  before  local  PNG written straight to the file
+          cloud  the same, then MediaFileUpload reads the file back
+          copy   RGB copy, BMP into a buffer, header sliced off, onto the
+                 clipboard (the old copy_to_clipboard)
+  after   local  encode_screenshot, then write_screenshot
+          cloud  the same, then MediaIoBaseUpload over the encoded bytes,
+                 as upload_to_drive builds it
+          copy   copy_to_clipboard, then add_png_to_clipboard with the
+                 encode_screenshot bytes, as main.py does
+
+and reports CPU time, bytes written to and read back from disk, and the
+peak of Python-heap buffers (tracemalloc) along the way: the BMP and
+slice copies of the old copy show up there, Pillow's own image memory
+(such as the RGB conversion) does not. The upload body is read the way
+the Drive client reads it, but no request is sent. For copies it also
+reports the time until the DIB is on the clipboard.
+
+Needs Windows (the clipboard) and the Drive client library. Run from the
+project folder:
+    python -m benchmarks.bench_output
+"""
+import io
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+import win32clipboard
+from googleapiclient.http import MediaFileUpload, MediaIoBaseUpload
+from capture import encode_screenshot, write_screenshot, copy_to_clipboard, add_png_to_clipboard
+from drive_upload import mimetype_for
+from encoders import write_image, DEFAULT_OUTPUT_FORMAT
+from benchmarks.bench_parallel_png import mosaic
+from benchmarks.bench_png import make_corpus
+
+
+SIZES = [(1920, 1080), (3840, 2160)]
+REPEAT = 3
+METADATA = {'viewclipper_version': '1.0', 'viewclipper_mode': 'region'}
+
+
+def upload_body(media):
+    """Read an upload's body the way the Drive client does"""
+    return media.getbytes(0, media.size())
+
+
+def before(img, action, path):
+    """Returns (bytes written, bytes read back from disk)"""
+    if action == 'copy':
+        copy_before(img)
+        return 0, 0
+    with open(path, 'wb') as f:
+        write_image(img, f, DEFAULT_OUTPUT_FORMAT, METADATA)
+    written = os.path.getsize(path)
+    if action == 'cloud':
+        return written, len(upload_body(MediaFileUpload(path, mimetype=mimetype_for(path))))
+    return written, 0
+
+
+def copy_before(img):
+    """copy_to_clipboard as it was before encode-once"""
+    output = io.BytesIO()
+    img.convert('RGB').save(output, 'BMP')
+    data = output.getvalue()[14:]
+    output.close()
+
+    win32clipboard.OpenClipboard()
+    try:
+        win32clipboard.EmptyClipboard()
+        win32clipboard.SetClipboardData(win32clipboard.CF_DIB, data)
+    finally:
+        win32clipboard.CloseClipboard()
+
+
+def after(img, action, path):
+    """Returns (bytes written, bytes read back from disk)"""
+    if action == 'copy':
+        sequence = copy_to_clipboard(img)
+        add_png_to_clipboard(encode_screenshot(img, METADATA), sequence)
+        return 0, 0
+    data = encode_screenshot(img, METADATA)
+    write_screenshot(data, path)
+    written = os.path.getsize(path)
+    if action == 'cloud':
+        # The body comes from memory; nothing is read from the file
+        upload_body(MediaIoBaseUpload(io.BytesIO(data), mimetype=mimetype_for(path)))
+    return written, 0
+
+
+def measure(fn, *args):
+    """Median CPU seconds, peak traced bytes of the last run, fn's result"""
+    cpu = []
+    for _ in range(REPEAT):
+        tracemalloc.start()
+        start = time.process_time()
+        result = fn(*args)
+        cpu.append(time.process_time() - start)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return statistics.median(cpu), peak, result
+
+
+def ready(fn, img):
+    """Median wall seconds until fn has put img on the clipboard"""
+    times = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        fn(img)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main():
+    corpus = make_corpus()
+    path = os.path.join(tempfile.mkdtemp(), 'capture.png')
+    kb = 1 / 1024
+    print(f"{'capture':<12}{'action':<8}{'CPU ms':>15}{'written KB':>17}{'read KB':>14}{'peak KB':>15}")
+    print(f"{'':<20}{'before':>8}{'after':>7}{'before':>10}{'after':>7}{'before':>8}{'after':>6}"
+          f"{'before':>9}{'after':>6}")
+    print("-" * 80)
+    for width, height in SIZES:
+        img = mosaic(corpus, width, height)
+        for action in ('local', 'cloud', 'copy'):
+            old_cpu, old_peak, (old_w, old_r) = measure(before, img, action, path)
+            new_cpu, new_peak, (new_w, new_r) = measure(after, img, action, path)
+            print(f"{f'{width}x{height}':<12}{action:<8}{old_cpu * 1000:>8.0f}{new_cpu * 1000:>7.0f}"
+                  f"{old_w * kb:>10.0f}{new_w * kb:>7.0f}{old_r * kb:>8.0f}{new_r * kb:>6.0f}"
+                  f"{old_peak * kb:>9.0f}{new_peak * kb:>6.0f}")
+        print(f"{'':<12}{'copy':<8}DIB on the clipboard after {ready(copy_before, img) * 1000:.0f} ms before, "
+              f"{ready(copy_to_clipboard, img) * 1000:.0f} ms after")
+        print()
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Parallel PNG benchmark.
+
+Writes mosaics of the bench_png corpus (text, flat UI, gradient and photo
+tiles, mirrored so repeats don't compress for free) at 1080p, 4K, a
+dual-4K desktop and 8K, once with Pillow's single-threaded encoder and
+then with parallel_png at 1, 2, 4, ... worker threads up to the number of
+cores. Both use the default PNG profile's level. Every parallel file is
+decoded again and compared with the source pixels.
+
+Run from the project folder:
+    python -m benchmarks.bench_parallel_png
+"""
+import io
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from PIL import Image
+from encoders import png_options, DEFAULT_PNG_PROFILE
+import parallel_png
+from benchmarks.bench_png import make_corpus, WIDTH, HEIGHT
+
+
+SIZES = [(1920, 1080), (3840, 2160), (7680, 2160), (7680, 4320)]
+REPEAT = 3
+
+
+def mosaic(corpus, width, height):
+    """Tile the corpus images over width x height, flipping every other tile"""
+    tiles = list(corpus.values())
+    img = Image.new('RGB', (width, height))
+    for row, y in enumerate(range(0, height, HEIGHT)):
+        for col, x in enumerate(range(0, width, WIDTH)):
+            tile = tiles[(row * 3 + col) % len(tiles)]
+            if (row + col) % 2:
+                tile = tile.transpose(Image.Transpose.FLIP_LEFT_RIGHT)
+            img.paste(tile, (x, y))
+    return img
+
+
+def timed(fn):
+    runs = []
+    for _ in range(REPEAT):
+        output = io.BytesIO()
+        start = time.perf_counter()
+        fn(output)
+        runs.append((time.perf_counter() - start, output))
+    return statistics.median(run[0] for run in runs), runs[0][1]
+
+
+def worker_counts():
+    cores = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 <= cores:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != cores:
+        counts.append(cores)
+    return counts
+
+
+def main():
+    corpus = make_corpus()
+    options = png_options(DEFAULT_PNG_PROFILE)
+    level = options['compress_level']
+    print(f"{os.cpu_count()} cores, zlib level {level}")
+    print(f"{'size':<12}{'encoder':<12}{'ms':>8}{'speedup':>9}{'KB':>9}{'vs Pillow':>11}")
+    print("-" * 61)
+
+    for width, height in SIZES:
+        img = mosaic(corpus, width, height)
+        base_s, base_out = timed(lambda out: img.save(out, 'PNG', **options))
+        label = f"{width}x{height}"
+        print(f"{label:<12}{'Pillow':<12}{base_s * 1000:>8.0f}{1:>8.1f}x{base_out.tell() / 1024:>9.0f}")
+
+        for workers in worker_counts():
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                seconds, output = timed(lambda out: parallel_png.save(img, out, level, pool=pool))
+            output.seek(0)
+            if not np.array_equal(np.asarray(Image.open(output)), np.asarray(img)):
+                raise AssertionError(f"{label}: parallel PNG decodes to different pixels")
+            size = output.getbuffer().nbytes
+            print(f"{'':<12}{f'{workers} threads':<12}{seconds * 1000:>8.0f}{base_s / seconds:>8.1f}x"
+                  f"{size / 1024:>9.0f}{size / base_out.tell() - 1:>+10.1%}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
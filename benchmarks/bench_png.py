@@ -0,0 +1,122 @@
+"""
+PNG encoder benchmark.
+
+Encodes a synthetic corpus of typical screenshots (text-heavy page, flat
+UI panels, gradients, a photo) at 1080p with each profile in encoders.py
+and reports encode time, size and throughput. Times are the median of a
+few runs. The totals are what DEFAULT_PNG_PROFILE is chosen from: it
+should be the smallest output that still encodes a typical screenshot
+well under the time the editor takes to close.
+
+A second table compares the palette modes with the default profile; its
+times include counting colours and building the indexed image.
+
+Run from the project folder:
+    python -m benchmarks.bench_png
+"""
+import io
+import os
+import random
+import statistics
+import time
+from PIL import Image, ImageDraw, ImageFilter
+from encoders import PNG_PROFILES, DEFAULT_PNG_PROFILE, PALETTE_MODES, png_options, palettize, write_png
+
+
+WIDTH, HEIGHT = 1920, 1080
+REPEAT = 5
+
+
+def text_heavy(rng):
+    """Dark text lines on white, like a document or a code editor"""
+    img = Image.new('RGB', (WIDTH, HEIGHT), (255, 255, 255))
+    draw = ImageDraw.Draw(img)
+    for y in range(10, HEIGHT - 20, 18):
+        x = 10
+        while x < WIDTH - 200:
+            word = ''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randrange(2, 10)))
+            draw.text((x, y), word, fill=(30, 30, 30))
+            x += len(word) * 7 + 6
+    return img
+
+
+def flat_ui(rng):
+    """Solid panels, buttons and bars"""
+    img = Image.new('RGB', (WIDTH, HEIGHT), (240, 240, 240))
+    draw = ImageDraw.Draw(img)
+    for _ in range(80):
+        x, y = rng.randrange(WIDTH), rng.randrange(HEIGHT)
+        color = tuple(rng.randrange(256) for _ in range(3))
+        draw.rectangle([x, y, x + rng.randrange(50, 500), y + rng.randrange(20, 300)], fill=color)
+    return img
+
+
+def gradients(rng):
+    """Smooth two-axis gradient, like a wallpaper or a styled header"""
+    ramp = Image.linear_gradient('L').resize((WIDTH, HEIGHT))
+    return Image.merge('RGB', (ramp, ramp.transpose(Image.Transpose.ROTATE_180),
+                               Image.new('L', (WIDTH, HEIGHT), rng.randrange(256))))
+
+
+def photo(rng):
+    """Soft shapes with sensor-like noise"""
+    small = Image.frombytes('RGB', (WIDTH // 8, HEIGHT // 8), os.urandom(WIDTH // 8 * HEIGHT // 8 * 3))
+    img = small.resize((WIDTH, HEIGHT), Image.Resampling.BICUBIC).filter(ImageFilter.GaussianBlur(2))
+    noise = Image.frombytes('RGB', (WIDTH, HEIGHT), os.urandom(WIDTH * HEIGHT * 3))
+    return Image.blend(img, noise, 0.08)
+
+
+def make_corpus(seed=1):
+    rng = random.Random(seed)
+    return {name: make(rng) for name, make in
+            (('text', text_heavy), ('flat', flat_ui), ('gradient', gradients), ('photo', photo))}
+
+
+def encode(img, options, palette='off'):
+    output = io.BytesIO()
+    start = time.perf_counter()
+    write_png(palettize(img, palette), output, options)
+    return time.perf_counter() - start, output.tell()
+
+
+def main():
+    corpus = make_corpus()
+    raw_mb = WIDTH * HEIGHT * 3 / 2 ** 20
+    totals = {}
+
+    print(f"{'profile':<10}{'image':<10}{'ms':>8}{'KB':>9}{'MB/s':>8}")
+    print("-" * 45)
+    for profile in PNG_PROFILES:
+        options = png_options(profile)
+        total_s = total_bytes = 0
+        for name, img in corpus.items():
+            runs = [encode(img, options) for _ in range(REPEAT)]
+            seconds = statistics.median(run[0] for run in runs)
+            size = runs[0][1]
+            total_s += seconds
+            total_bytes += size
+            print(f"{profile:<10}{name:<10}{seconds * 1000:>8.0f}{size / 1024:>9.0f}{raw_mb / seconds:>8.0f}")
+        totals[profile] = (total_s, total_bytes)
+        print()
+
+    print(f"{'total':<10}{'ms':>8}{'KB':>9}   (whole corpus)")
+    for profile, (seconds, size) in totals.items():
+        mark = "  <- default" if profile == DEFAULT_PNG_PROFILE else ""
+        print(f"{profile:<10}{seconds * 1000:>8.0f}{size / 1024:>9.0f}{mark}")
+
+    print()
+    print(f"{'palette':<15}{'image':<10}{'ms':>8}{'KB':>9}{'vs RGB':>9}")
+    print("-" * 51)
+    options = png_options(DEFAULT_PNG_PROFILE)
+    for name, img in corpus.items():
+        rgb_size = None
+        for mode in PALETTE_MODES:
+            runs = [encode(img, options, mode) for _ in range(REPEAT)]
+            seconds = statistics.median(run[0] for run in runs)
+            size = runs[0][1]
+            rgb_size = rgb_size or size
+            print(f"{mode:<15}{name:<10}{seconds * 1000:>8.0f}{size / 1024:>9.0f}{rgb_size / size:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Redaction benchmark.
+
+Times each blur tool mode on regions up to a whole 4K frame, next to the
+old pixelation (NEAREST downscale and upscale), and the live preview the
+editors render on every drag motion from the display-size frame.
+
+Run from the project folder:
+    python -m benchmarks.bench_redaction
+"""
+import time
+from PIL import Image
+from redaction import MODES, redact
+from benchmarks.frames import make_frame
+
+
+WIDTH, HEIGHT = 3840, 2160
+REGIONS = [(400, 300), (1600, 900), (WIDTH, HEIGHT)]
+STRENGTH = 10
+DISPLAY_SCALE = 0.5  # a 4K capture shown on a 1080p-sized canvas
+REPEAT = 5
+
+
+def old_pixelate(region, pixel_size):
+    """The previous blur tool, kept here for comparison"""
+    small = region.resize((max(1, region.width // pixel_size), max(1, region.height // pixel_size)),
+                          Image.Resampling.NEAREST)
+    return small.resize(region.size, Image.Resampling.NEAREST)
+
+
+def best_of(fn):
+    timings = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def main():
+    frame = make_frame(WIDTH, HEIGHT)
+    display = frame.resize((int(WIDTH * DISPLAY_SCALE), int(HEIGHT * DISPLAY_SCALE)),
+                           Image.Resampling.LANCZOS)
+
+    columns = ('old',) + MODES
+    print(f"{'region':<12}" + "".join(f"{name:>10}" for name in columns) + f"{'preview':>10}")
+    print("-" * (12 + 10 * (len(columns) + 1)))
+    for width, height in REGIONS:
+        region = frame.crop((0, 0, width, height))
+        shown = display.crop((0, 0, int(width * DISPLAY_SCALE), int(height * DISPLAY_SCALE)))
+        row = [best_of(lambda: old_pixelate(region, STRENGTH))]
+        row += [best_of(lambda: redact(region, mode, STRENGTH)) for mode in MODES]
+        preview = best_of(lambda: redact(shown, 'pixelate', STRENGTH * DISPLAY_SCALE))
+        print(f"{width}x{height:<7}" + "".join(f"{ms:>10.1f}" for ms in row) + f"{preview:>10.1f}")
+    print(f"(ms, strength {STRENGTH} px, preview at {DISPLAY_SCALE:g}x display scale)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Region-selection drag benchmark (needs a display, run on Windows).
+
+Compares one drag frame of the old overlay (full-brightness frame under
+four stippled rectangles, deleted and recreated on every motion event) with
+the new one (pre-baked dimmed background plus the bright pixels copied into
+the selection only).
+
+Run from the project folder:
+    python -m benchmarks.bench_selection_drag
+"""
+import time
+import tkinter as tk
+from PIL import ImageTk
+from capture import dim_frame
+from benchmarks.frames import make_frame
+
+
+RESOLUTIONS = [
+    ('1080p', 1920, 1080),
+    ('1440p', 2560, 1440),
+    ('4K', 3840, 2160),
+]
+
+
+def drag_path(width, height, steps):
+    """Selection corners for a diagonal drag from the upper-left quarter"""
+    x0, y0 = width // 8, height // 8
+    for i in range(1, steps + 1):
+        yield x0, y0, x0 + (width * 3 // 4) * i // steps, y0 + (height * 3 // 4) * i // steps
+
+
+class OldOverlay:
+    def __init__(self, canvas, img):
+        self.canvas = canvas
+        self.width, self.height = img.size
+        self.photo = ImageTk.PhotoImage(img)
+        canvas.create_image(0, 0, anchor=tk.NW, image=self.photo)
+        self.rect = None
+
+    def update(self, x1, y1, x2, y2):
+        canvas, w, h = self.canvas, self.width, self.height
+        if self.rect:
+            canvas.delete(self.rect)
+        self.rect = canvas.create_rectangle(x1, y1, x2, y2, outline='red', width=2)
+        canvas.delete("dim")
+        canvas.create_rectangle(0, 0, w, y1, fill='black', stipple='gray50', tags="dim")
+        canvas.create_rectangle(0, y2, w, h, fill='black', stipple='gray50', tags="dim")
+        canvas.create_rectangle(0, y1, x1, y2, fill='black', stipple='gray50', tags="dim")
+        canvas.create_rectangle(x2, y1, w, y2, fill='black', stipple='gray50', tags="dim")
+
+
+class NewOverlay:
+    def __init__(self, canvas, img):
+        self.canvas = canvas
+        self.photo = ImageTk.PhotoImage(img)
+        self.dim_photo = ImageTk.PhotoImage(dim_frame(img))
+        canvas.create_image(0, 0, anchor=tk.NW, image=self.dim_photo)
+        self.bright = tk.PhotoImage(master=canvas)
+        self.bright_item = canvas.create_image(0, 0, anchor=tk.NW, image=self.bright)
+        self.rect = canvas.create_rectangle(0, 0, 0, 0, outline='red', width=2)
+
+    def update(self, x1, y1, x2, y2):
+        canvas = self.canvas
+        canvas.coords(self.rect, x1, y1, x2, y2)
+        self.bright.tk.call(str(self.bright), 'copy', str(self.photo),
+                            '-from', x1, y1, x2, y2, '-to', 0, 0, '-shrink')
+        canvas.coords(self.bright_item, x1, y1)
+
+
+def measure(overlay_cls, img, steps):
+    root = tk.Tk()
+    root.overrideredirect(True)
+    root.geometry(f"{img.width}x{img.height}+0+0")
+    canvas = tk.Canvas(root, width=img.width, height=img.height, highlightthickness=0)
+    canvas.pack()
+    overlay = overlay_cls(canvas, img)
+    root.update()
+
+    timings = []
+    for corners in drag_path(img.width, img.height, steps):
+        start = time.perf_counter()
+        overlay.update(*corners)
+        root.update()  # redraw, as the event loop would before the next frame
+        timings.append((time.perf_counter() - start) * 1000)
+    root.destroy()
+
+    timings.sort()
+    return timings[len(timings) // 2], timings[int(len(timings) * 0.95)]
+
+
+def main(steps=60):
+    print(f"{'Size':<8}{'old p50':>10}{'old p95':>10}{'new p50':>10}{'new p95':>10}")
+    print("-" * 48)
+    for name, width, height in RESOLUTIONS:
+        img = make_frame(width, height)
+        old_p50, old_p95 = measure(OldOverlay, img, steps)
+        new_p50, new_p95 = measure(NewOverlay, img, steps)
+        print(f"{name:<8}{old_p50:>10.1f}{old_p95:>10.1f}{new_p50:>10.1f}{new_p95:>10.1f}")
+    print("(ms per drag frame)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Stamp and badge benchmark.
+
+Places QA markers (emoji stamps and severity badges) on a 1440p frame,
+first the old way (measure with textbbox, then draw.text, per marker) and
+then as cached sprites pasted with alpha. The results are compared pixel
+by pixel (antialiased edges may differ by a few levels).
+
+Run from the project folder:
+    python -m benchmarks.bench_stamps
+"""
+import random
+import time
+from PIL import ImageChops, ImageDraw
+from annotations import Stamp, Badge, render, sprite_cache
+from fonts import font_cache, STAMP_FONTS
+from benchmarks.frames import make_frame
+
+
+WIDTH, HEIGHT = 2560, 1440
+MARKERS = 60
+STAMPS = ['🐛', '❌', '✅', '❓', '⚠️', '💡']
+BADGES = [('CRITICAL', '#ff0000', '#ffffff'), ('HIGH', '#ff6600', '#ffffff'),
+          ('MED', '#ffcc00', '#000000'), ('LOW', '#00cc00', '#ffffff')]
+
+
+def markers(rng):
+    result = []
+    for _ in range(MARKERS):
+        x, y = rng.randrange(100, WIDTH - 100), rng.randrange(100, HEIGHT - 100)
+        if rng.random() < 0.5:
+            result.append(Stamp(x, y, rng.choice(STAMPS), (255, 0, 0), 48))
+        else:
+            result.append(Badge(x, y, *rng.choice(BADGES), 14))
+    return result
+
+
+def draw_text_marker(img, record):
+    """The previous per-marker rendering, kept here for comparison"""
+    draw = ImageDraw.Draw(img)
+    font = font_cache.get(record.size, STAMP_FONTS) if isinstance(record, Stamp) else font_cache.get(record.size)
+    left, top, right, bottom = draw.textbbox((0, 0), record.text, font=font)
+    w, h = right - left, bottom - top
+    x, y = record.x - w // 2, record.y - h // 2
+    if isinstance(record, Badge):
+        pad = 4
+        draw.rectangle([record.x - w // 2 - pad, record.y - h // 2 - pad,
+                        record.x + w // 2 + pad, record.y + h // 2 + pad], fill=record.bg_color)
+        draw.text((x, y), record.text, fill=record.fg_color, font=font)
+    else:
+        draw.text((x, y), record.text, fill=record.color, font=font)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def main(seed=1):
+    rng = random.Random(seed)
+    frame = make_frame(WIDTH, HEIGHT)
+    records = markers(rng)
+    # Both paths share the font cache; load the fonts before timing either
+    font_cache.get(48, STAMP_FONTS)
+    font_cache.get(14)
+
+    old = frame.copy()
+    old_ms = timed(lambda: [draw_text_marker(old, record) for record in records])
+
+    new = frame.copy()
+    cold_ms = timed(lambda: [render(new, record) for record in records])
+    warm = frame.copy()
+    warm_ms = timed(lambda: [render(warm, record) for record in records])
+
+    extrema = ImageChops.difference(old, new).getextrema()
+    print(f"{MARKERS} markers on {WIDTH}x{HEIGHT}:")
+    print(f"  textbbox + draw.text   {old_ms:8.1f} ms")
+    print(f"  sprites, first use     {cold_ms:8.1f} ms")
+    print(f"  sprites, cached        {warm_ms:8.1f} ms  ({len(sprite_cache._sprites)} sprites)")
+    print(f"  largest pixel difference: {max(high for _, high in extrema)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Undo/redo stress benchmark for the annotation document.
+
+Adds 500 mixed records (the bench_annotations mix) over a 4K capture shown
+at half size on a Tk canvas, as the fullscreen editor does, then undoes
+them one by one and redoes them all. Each step is timed including the
+canvas redraw, which is what a user waits for on Ctrl+Z / Ctrl+Y.
+Afterwards the canvas must hold as many items as before and the export
+must match the one taken before undoing.
+
+Opens a borderless window, so it needs a desktop session.
+
+Run from the project folder:
+    python -m benchmarks.bench_undo
+"""
+import random
+import time
+import tkinter as tk
+from PIL import ImageTk
+from annotations import AnnotationDocument, CanvasRenderer
+from benchmarks.bench_annotations import random_record
+from benchmarks.frames import make_frame
+
+
+WIDTH, HEIGHT = 3840, 2160
+SCALE = 0.5
+RECORDS = 500
+TARGET_MS = 50
+
+
+def percentile(timings, fraction):
+    timings = sorted(timings)
+    return timings[min(len(timings) - 1, int(len(timings) * fraction))]
+
+
+def timed_steps(root, step, count):
+    """Run step() count times, timing each one together with the redraw"""
+    timings = []
+    for _ in range(count):
+        start = time.perf_counter()
+        step()
+        root.update()  # redraw, as the event loop would before the next key
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main(seed=1):
+    rng = random.Random(seed)
+    frame = make_frame(WIDTH, HEIGHT)
+    records = [random_record(rng, WIDTH, HEIGHT) for _ in range(RECORDS)]
+
+    root = tk.Tk()
+    root.overrideredirect(True)
+    shown = (int(WIDTH * SCALE), int(HEIGHT * SCALE))
+    root.geometry(f"{shown[0]}x{shown[1]}+0+0")
+    canvas = tk.Canvas(root, width=shown[0], height=shown[1], highlightthickness=0)
+    canvas.pack()
+    photo = ImageTk.PhotoImage(frame.resize(shown))
+    canvas.create_image(0, 0, anchor=tk.NW, image=photo)
+    document = AnnotationDocument(CanvasRenderer(canvas, frame, SCALE))
+
+    pending = iter(records)
+    add_timings = timed_steps(root, lambda: document.add(next(pending)), RECORDS)
+    items = len(canvas.find_withtag("annotation"))
+    exported = document.rasterize(frame)
+
+    undo_timings = timed_steps(root, document.undo, RECORDS)
+    assert not canvas.find_withtag("annotation"), "items left after undoing everything"
+    redo_timings = timed_steps(root, document.redo, RECORDS)
+    assert len(canvas.find_withtag("annotation")) == items, "canvas items differ after redo"
+    root.destroy()
+
+    assert list(document) == records, "records differ after redo"
+    assert document.rasterize(frame).tobytes() == exported.tobytes(), "export differs after redo"
+
+    print(f"{RECORDS} records on {WIDTH}x{HEIGHT} shown at {SCALE}x, {items} canvas items")
+    print(f"{'':<8}{'p50':>10}{'p95':>10}{'max':>10}")
+    print("-" * 38)
+    for name, timings in (('add', add_timings), ('undo', undo_timings), ('redo', redo_timings)):
+        print(f"{name:<8}{percentile(timings, 0.5):>10.1f}{percentile(timings, 0.95):>10.1f}"
+              f"{max(timings):>10.1f}")
+    print("(ms per step, including the canvas redraw)")
+
+    worst = max(percentile(undo_timings, 0.95), percentile(redo_timings, 0.95))
+    print(f"undo/redo p95 {worst:.1f} ms vs target {TARGET_MS} ms: {'OK' if worst <= TARGET_MS else 'MISSED'}")
+
+
+if __name__ == "__main__":
+    main()
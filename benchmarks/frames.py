@@ -0,0 +1,10 @@
+"""
+Synthetic frames shared by the benchmarks.
+"""
+import os
+from PIL import Image
+
+
+def make_frame(width, height):
+    """Noisy RGB frame so nothing compresses or caches trivially"""
+    return Image.frombytes('RGB', (width, height), os.urandom(width * height * 3))
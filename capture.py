@@ -1,15 +1,24 @@
-from mss import mss
-from PIL import Image, ImageDraw, ImageTk, ImageFont, ImageFilter, PngImagePlugin
+from PIL import ImageTk
 import os
 from config import Config
+from capture_service import capture_service
+from screen_geometry import display_info, bounding_box
+from snapping import start_snap_detection
+from loupe import Loupe
+from annotations import (AnnotationDocument, CanvasRenderer, Arrow, Line, Rect, Circle,
+                         Text, Highlight, Blur, simplify_path)
+from display import ScaledDisplay
+from redaction import RedactionPreview
+from encoders import write_image, DEFAULT_OUTPUT_FORMAT, DEFAULT_PALETTE_MODE, DEFAULT_LOSSY_QUALITY
 import ctypes
 import time
 import io
 import win32clipboard
 import tkinter as tk
 from tkinter import colorchooser
-import math
 import sys
+import threading
+from concurrent.futures import Future
 from datetime import datetime
 
 
@@ -31,24 +40,50 @@ set_dpi_awareness()
 
 
 def get_dpi_scale():
-    """Get Windows DPI scaling factor"""
-    try:
-        dc = ctypes.windll.user32.GetDC(0)
-        dpi = ctypes.windll.gdi32.GetDeviceCaps(dc, 88)
-        ctypes.windll.user32.ReleaseDC(0, dc)
-        return dpi / 96.0
-    except:
-        return 1.0
+    """Get Windows DPI scaling factor (cached until the display changes)"""
+    return display_info.dpi_scale()
 
 
 def get_screen_size():
-    """Get actual physical screen size in pixels"""
-    try:
-        width = ctypes.windll.user32.GetSystemMetrics(0)
-        height = ctypes.windll.user32.GetSystemMetrics(1)
-        return width, height
-    except:
-        return 1920, 1080
+    """Get actual physical primary screen size in pixels (cached until the display changes)"""
+    return display_info.screen_size()
+
+
+# Halves every channel, the same average darkening as a gray50 stipple over black
+DIM_LUT = [value // 2 for value in range(256)] * 3
+
+
+def dim_frame(img):
+    """Darkened copy of an RGB frame for the selection overlay"""
+    return img.point(DIM_LUT)
+
+
+def start_dimming(img):
+    """Run dim_frame on a worker thread; returns a Future for the result"""
+    future = Future()
+    
+    def work():
+        try:
+            future.set_result(dim_frame(img))
+        except Exception as e:
+            future.set_exception(e)
+    
+    threading.Thread(target=work, daemon=True).start()
+    return future
+
+
+def crop_to_capture(frame, layout, capture_box):
+    """
+    Cut a pre-captured virtual-desktop frame down to a capture's area.
+    Returns None if the frame was recorded with a different monitor layout.
+    """
+    virtual = layout.virtual
+    if frame.size != (virtual.width, virtual.height):
+        return None
+    if capture_box == virtual.box:
+        return frame
+    x1, y1, x2, y2 = capture_box
+    return frame.crop((x1 - virtual.left, y1 - virtual.top, x2 - virtual.left, y2 - virtual.top))
 
 
 def get_resource_path(filename):
@@ -136,7 +171,8 @@ class RegionSelector:
 class LightshotRegionCapture:
     """Lightshot-style region capture with integrated editing toolbar"""
     
-    def __init__(self, default_to_clipboard=True):
+    def __init__(self, default_to_clipboard=True, frames=None,
+                 redaction_mode='pixelate', redaction_strength=10, undo_memory_mb=128):
         self.root = None
         self.canvas = None
         self.full_screenshot = None
@@ -145,12 +181,34 @@ class LightshotRegionCapture:
         
         self.default_to_clipboard = default_to_clipboard
         
+        # Blur tool: redaction.py mode and cell size / radius
+        self.redaction_mode = redaction_mode
+        self.redaction_strength = redaction_strength
+        self.redaction_preview = None
+        self.undo_memory_mb = undo_memory_mb
+        
         self.selecting = True
         self.start_x = None
         self.start_y = None
         self.current_rect = None
         self.selection = None
         
+        # Selection drag: overlay items are reused, motion is coalesced per frame
+        self.dim_photo = None
+        self.bright_photo = None
+        self.bright_item = None
+        self.hole = (0, 0, 0, 0)
+        self.pending_motion = None
+        self.motion_job = None
+        self.frame_ms = 16
+        
+        # UI-edge map built in the background; hover shows the candidate rectangle
+        self.snap_future = None
+        self.hover_rect = None
+        
+        # Magnifier with coordinates/RGB readout while selecting
+        self.loupe = None
+        
         self.tool = None
         self.color = (255, 0, 0)
         self.weight = 3
@@ -158,7 +216,8 @@ class LightshotRegionCapture:
         self.draw_start_x = None
         self.draw_start_y = None
         self.temp_items = []
-        self.drawn_items = []
+        # Records shown as canvas items, rasterized on save/copy (see annotations.py)
+        self.annotations = None
         
         self.text_mode = False
         self.text_position = None
@@ -166,6 +225,7 @@ class LightshotRegionCapture:
         self.text_cursor = None
         
         self.highlighter_points = []
+        self.stroke_item = None  # live highlighter polyline
         
         self.toolbar_frame = None
         self.tool_buttons = {}
@@ -174,24 +234,37 @@ class LightshotRegionCapture:
         self.save_action = None
         self.metadata = None
         
-        self.img = None
-        self.draw = None
+        # Pre-captured frames (newest first), stepped through with Left/Right
+        self.recent_frames = frames
+        self.frame_index = 0
+        self.live_frame = None
+        self.capture_time = None
+        self.scrubber_label = None
+        
+        # Monitor layout; the overlay spans the whole virtual desktop
+        self.layout = None
+        self.capture_box = None
+        self.screen_width = 0
+        self.screen_height = 0
     
     def capture_and_edit(self):
         """Main entry point - capture screen and start selection/editing"""
-        screen_width, screen_height = get_screen_size()
+        self.layout = display_info.layout()
+        virtual = self.layout.virtual
+        screen_width, screen_height = virtual.width, virtual.height
+        self.screen_width, self.screen_height = screen_width, screen_height
+        self.capture_box = virtual.box
         
-        with mss() as sct:
-            monitor = {"top": 0, "left": 0, "width": screen_width, "height": screen_height}
-            screenshot = sct.grab(monitor)
-            self.full_screenshot = Image.frombytes('RGB', screenshot.size, screenshot.rgb)
+        self.full_screenshot = capture_service.grab_monitors(self.layout.monitors)
+        self.live_frame = self.full_screenshot
+        self.capture_time = time.time()
         
-        self.img = self.full_screenshot.copy()
-        self.draw = ImageDraw.Draw(self.img)
+        # Bake the dimmed background while the window is being built
+        dimmed = start_dimming(self.full_screenshot)
         
         self.root = tk.Tk()
         self.root.overrideredirect(True)
-        self.root.geometry(f"{screen_width}x{screen_height}+0+0")
+        self.root.geometry(f"{screen_width}x{screen_height}+{virtual.left}+{virtual.top}")
         self.root.attributes('-topmost', True)
         self.root.lift()
         self.root.focus_force()
@@ -200,28 +273,51 @@ class LightshotRegionCapture:
                                 highlightthickness=0, cursor="cross")
         self.canvas.pack()
         
-        self.photo = ImageTk.PhotoImage(self.img)
-        self.canvas.create_image(0, 0, anchor=tk.NW, image=self.photo, tags="screenshot")
-        
-        self.dim_overlay = self.canvas.create_rectangle(
-            0, 0, screen_width, screen_height,
-            fill='black', stipple='gray50', tags="dim"
+        # Full-brightness frame, only used as the source for the selection item
+        self.photo = ImageTk.PhotoImage(self.full_screenshot)
+        
+        # Dimmed frame as background, bright pixels copied in only inside the selection
+        self.dim_photo = ImageTk.PhotoImage(dimmed.result())
+        self.dim_overlay = self.canvas.create_image(0, 0, anchor=tk.NW, image=self.dim_photo,
+                                                    tags="screenshot")
+        self.bright_photo = tk.PhotoImage(master=self.root)
+        self.bright_item = self.canvas.create_image(0, 0, anchor=tk.NW, image=self.bright_photo,
+                                                    state='hidden', tags="screenshot")
+        self.current_rect = self.canvas.create_rectangle(
+            0, 0, 0, 0, outline='red', width=2, state='hidden', tags="selection"
         )
+        self.loupe = Loupe(self.canvas)
+        self.loupe.set_frame(self.full_screenshot, (virtual.left, virtual.top))
+        self.annotations = AnnotationDocument(CanvasRenderer(self.canvas, self.full_screenshot),
+                                              memory_budget=self.undo_memory_mb << 20)
+        self.frame_ms = max(4, int(1000 / display_info.refresh_rate()))
         
         self.instruction_label = tk.Label(
             self.root,
-            text="Drag to select region • ESC to cancel",
+            text="Drag to select region • Click to pick the highlighted area • Hold Ctrl to disable snapping • ESC to cancel",
             bg='#333', fg='white', font=('Arial', 12, 'bold'),
             padx=15, pady=8
         )
-        self.instruction_label.place(relx=0.5, y=30, anchor='center')
+        # Show hints on the monitor the user is looking at
+        current = self.layout.current()
+        self.hint_x = current.left - virtual.left + current.width // 2
+        self.hint_bottom = current.bottom - virtual.top
+        self.instruction_label.place(x=self.hint_x, y=current.top - virtual.top + 30, anchor='center')
         
         self.canvas.bind('<ButtonPress-1>', self.on_mouse_down)
         self.canvas.bind('<B1-Motion>', self.on_mouse_move)
         self.canvas.bind('<ButtonRelease-1>', self.on_mouse_up)
+        self.canvas.bind('<Motion>', self.on_hover)
         self.root.bind('<Escape>', self.on_escape)
         self.root.bind('<Return>', self.on_enter)
         self.root.bind('<Key>', self.on_key_press)
+        self.root.bind('<Control-z>', lambda e: self.undo())
+        self.root.bind('<Control-y>', lambda e: self.redo())
+        
+        self.show_frame_scrubber()
+        
+        # Edge detection starts once the overlay has been painted
+        self.root.after_idle(self.start_snapping)
         
         self.root.mainloop()
         
@@ -229,10 +325,98 @@ class LightshotRegionCapture:
             return (self.result, self.metadata, self.save_action)
         return None
     
+    def show_frame_scrubber(self):
+        """Show the pre-capture scrubber when older frames are available"""
+        if not self.recent_frames:
+            return
+        
+        self.root.bind('<Left>', lambda e: self.step_frame(1))
+        self.root.bind('<Right>', lambda e: self.step_frame(-1))
+        
+        self.scrubber_label = tk.Label(
+            self.root, text='', bg='#333', fg='white',
+            font=('Arial', 10), padx=12, pady=6
+        )
+        self.scrubber_label.place(x=self.hint_x, y=self.hint_bottom - 40, anchor='center')
+        self.update_scrubber_label()
+    
+    def step_frame(self, delta):
+        """Step back (delta > 0) or forward through the pre-captured frames"""
+        if not self.selecting:
+            return
+        
+        index = max(0, min(len(self.recent_frames), self.frame_index + delta))
+        if index == self.frame_index:
+            return
+        
+        if index == 0:
+            frame = self.live_frame
+        else:
+            frame = crop_to_capture(self.recent_frames.image(index - 1), self.layout, self.capture_box)
+            if frame is None:
+                return  # recorded before the monitor layout changed
+        
+        self.frame_index = index
+        self.full_screenshot = frame
+        self.annotations.set_base(frame)
+        
+        self.refresh_display()
+        self.update_scrubber_label()
+        self.start_snapping()
+        self.loupe.set_frame(frame, self.capture_box[:2])
+    
+    def update_scrubber_label(self):
+        if self.frame_index == 0:
+            when = 'now'
+        else:
+            age = self.capture_time - self.recent_frames.timestamp(self.frame_index - 1)
+            when = f'-{age:.1f} s'
+        self.scrubber_label.config(
+            text=f"⏪ Frame {when} ({self.frame_index}/{len(self.recent_frames)}) • ← older  → newer"
+        )
+    
+    def start_snapping(self):
+        """(Re)build the UI-edge map for the frame being selected from"""
+        self.snap_future = start_snap_detection(self.full_screenshot)
+        self.hover_rect = None
+    
+    def get_snap_map(self):
+        """The edge map if detection has finished, otherwise None"""
+        future = self.snap_future
+        if future is None or not future.done() or future.exception() is not None:
+            return None
+        return future.result()
+    
+    def snap_point(self, x, y, state):
+        """Snap a selection corner to nearby edges unless Ctrl is held"""
+        snap_map = self.get_snap_map()
+        if snap_map is None or state & 0x0004:
+            return x, y
+        return snap_map.snap_point(x, y)
+    
+    def on_hover(self, event):
+        if self.selecting and self.start_x is None:
+            self.pending_motion = (event.x, event.y, event.state)
+            if self.motion_job is None:
+                self.motion_job = self.root.after(self.frame_ms, self.flush_motion)
+    
+    def show_hover_rect(self, rect):
+        """Highlight the detected rectangle under the cursor"""
+        if rect == self.hover_rect:
+            return
+        self.hover_rect = rect
+        if rect is None:
+            self.canvas.itemconfig(self.current_rect, state='hidden')
+            self.update_dim_overlay(0, 0, 0, 0)
+            return
+        self.canvas.coords(self.current_rect, *rect)
+        self.canvas.itemconfig(self.current_rect, outline='#00aaff', dash=(6, 4), state='normal')
+        self.update_dim_overlay(*rect)
+    
     def on_mouse_down(self, event):
         if self.selecting:
-            self.start_x = event.x
-            self.start_y = event.y
+            self.cancel_motion()
+            self.start_x, self.start_y = self.snap_point(event.x, event.y, event.state)
         elif self.tool:
             self.drawing = True
             self.draw_start_x = event.x
@@ -242,59 +426,86 @@ class LightshotRegionCapture:
                 self.start_text_mode(event.x, event.y)
             elif self.tool == 'highlight':
                 self.highlighter_points = [(event.x, event.y)]
+                self.stroke_item = None
+            elif self.tool == 'blur':
+                # The canvas shows the capture 1:1
+                self.redaction_preview = RedactionPreview(self.canvas, self.full_screenshot)
     
     def on_mouse_move(self, event):
         if self.selecting and self.start_x is not None:
-            if self.current_rect:
-                self.canvas.delete(self.current_rect)
-            
-            self.current_rect = self.canvas.create_rectangle(
-                self.start_x, self.start_y, event.x, event.y,
-                outline='red', width=2, tags="selection"
-            )
-            
-            self.update_dim_overlay(self.start_x, self.start_y, event.x, event.y)
+            # Only remember the position; the overlay is redrawn once per frame
+            self.pending_motion = (event.x, event.y, event.state)
+            if self.motion_job is None:
+                self.motion_job = self.root.after(self.frame_ms, self.flush_motion)
             
         elif self.drawing and self.tool:
             if self.tool == 'highlight':
-                self.highlighter_points.append((event.x, event.y))
-                if len(self.highlighter_points) >= 2:
-                    p1 = self.highlighter_points[-2]
-                    p2 = self.highlighter_points[-1]
-                    item = self.canvas.create_line(
-                        p1[0], p1[1], p2[0], p2[1],
-                        fill=self.rgb_to_hex(self.color), width=self.weight * 3,
-                        capstyle=tk.ROUND, stipple='gray50', tags="drawing"
-                    )
+                # The canvas shows the capture 1:1
+                item = self.annotations.renderer.extend_stroke(
+                    self.stroke_item, self.highlighter_points, event.x, event.y,
+                    self.rgb_to_hex(self.color), self.weight * 3, tags="drawing"
+                )
+                if item is not self.stroke_item:
+                    self.stroke_item = item
                     self.temp_items.append(item)
             elif self.tool == 'blur':
-                self.cleanup_temp_items()
-                item = self.canvas.create_rectangle(
-                    self.draw_start_x, self.draw_start_y, event.x, event.y,
-                    outline='#ff6600', width=2, dash=(4, 4), tags="temp"
-                )
-                self.temp_items.append(item)
+                self.redaction_preview.show((self.draw_start_x, self.draw_start_y, event.x, event.y),
+                                            self.redaction_mode, self.redaction_strength, outline=True)
             elif self.tool != 'text':
                 self.cleanup_temp_items()
                 self.draw_preview_shape(event.x, event.y)
     
+    def flush_motion(self):
+        """Apply the latest coalesced selection drag position"""
+        self.motion_job = None
+        if self.pending_motion is None or not self.selecting:
+            return
+        x, y, state = self.pending_motion
+        self.pending_motion = None
+        
+        if self.start_x is None:
+            snap_map = self.get_snap_map()
+            if snap_map is not None and not state & 0x0004:
+                self.show_hover_rect(snap_map.rect_at(x, y))
+            else:
+                self.show_hover_rect(None)
+            self.loupe.show(x, y)
+            return
+        
+        x, y = self.snap_point(x, y, state)
+        self.canvas.coords(self.current_rect, self.start_x, self.start_y, x, y)
+        self.canvas.itemconfig(self.current_rect, outline='red', dash='', state='normal')
+        self.update_dim_overlay(self.start_x, self.start_y, x, y)
+        self.loupe.show(x, y, f"{abs(x - self.start_x)} × {abs(y - self.start_y)}")
+    
+    def cancel_motion(self):
+        if self.motion_job is not None:
+            self.root.after_cancel(self.motion_job)
+            self.motion_job = None
+        self.pending_motion = None
+    
     def on_mouse_up(self, event):
         if self.selecting and self.start_x is not None:
-            x1, y1 = min(self.start_x, event.x), min(self.start_y, event.y)
-            x2, y2 = max(self.start_x, event.x), max(self.start_y, event.y)
+            self.cancel_motion()
+            end_x, end_y = self.snap_point(event.x, event.y, event.state)
+            x1, y1 = min(self.start_x, end_x), min(self.start_y, end_y)
+            x2, y2 = max(self.start_x, end_x), max(self.start_y, end_y)
+            
+            # A click without a real drag picks the highlighted rectangle
+            if (x2 - x1) < 10 and (y2 - y1) < 10 and self.hover_rect:
+                x1, y1, x2, y2 = self.hover_rect
             
             if (x2 - x1) >= 10 and (y2 - y1) >= 10:
                 self.selection = (x1, y1, x2, y2)
                 self.selecting = False
                 
                 self.instruction_label.place_forget()
+                if self.scrubber_label:
+                    self.scrubber_label.place_forget()
+                self.loupe.hide()
                 
-                if self.current_rect:
-                    self.canvas.delete(self.current_rect)
-                self.current_rect = self.canvas.create_rectangle(
-                    x1, y1, x2, y2,
-                    outline='#00aaff', width=2, tags="selection"
-                )
+                self.canvas.coords(self.current_rect, x1, y1, x2, y2)
+                self.canvas.itemconfig(self.current_rect, outline='#00aaff', dash='', state='normal')
                 
                 self.update_dim_overlay(x1, y1, x2, y2)
                 self.show_toolbar()
@@ -302,9 +513,9 @@ class LightshotRegionCapture:
             else:
                 self.start_x = None
                 self.start_y = None
-                if self.current_rect:
-                    self.canvas.delete(self.current_rect)
-                    self.current_rect = None
+                self.hover_rect = None
+                self.canvas.itemconfig(self.current_rect, state='hidden')
+                self.update_dim_overlay(0, 0, 0, 0)
                     
         elif self.drawing and self.tool:
             self.drawing = False
@@ -316,6 +527,7 @@ class LightshotRegionCapture:
                     self.commit_highlighter()
                 self.highlighter_points = []
             elif self.tool == 'blur':
+                self.redaction_preview.hide()
                 self.commit_blur(event.x, event.y)
             else:
                 self.commit_shape(event.x, event.y)
@@ -323,19 +535,20 @@ class LightshotRegionCapture:
             self.cleanup_temp_items()
     
     def update_dim_overlay(self, x1, y1, x2, y2):
-        """Update the dim overlay to have a clear hole where selection is"""
-        self.canvas.delete("dim")
+        """Show the bright frame inside the selection over the dimmed background"""
+        x1, x2 = max(0, min(x1, x2)), min(self.screen_width, max(x1, x2))
+        y1, y2 = max(0, min(y1, y2)), min(self.screen_height, max(y1, y2))
+        self.hole = (x1, y1, x2, y2)
         
-        screen_width, screen_height = get_screen_size()
+        if x2 <= x1 or y2 <= y1:
+            self.canvas.itemconfig(self.bright_item, state='hidden')
+            return
         
-        self.canvas.create_rectangle(0, 0, screen_width, y1, 
-                                     fill='black', stipple='gray50', tags="dim")
-        self.canvas.create_rectangle(0, y2, screen_width, screen_height,
-                                     fill='black', stipple='gray50', tags="dim")
-        self.canvas.create_rectangle(0, y1, x1, y2,
-                                     fill='black', stipple='gray50', tags="dim")
-        self.canvas.create_rectangle(x2, y1, screen_width, y2,
-                                     fill='black', stipple='gray50', tags="dim")
+        # Photo-to-photo copy of just the selected pixels, no PIL round trip
+        self.bright_photo.tk.call(str(self.bright_photo), 'copy', str(self.photo),
+                                  '-from', x1, y1, x2, y2, '-to', 0, 0, '-shrink')
+        self.canvas.coords(self.bright_item, x1, y1)
+        self.canvas.itemconfig(self.bright_item, state='normal')
     
     def show_toolbar(self):
         """Show editing toolbar positioned near the selection"""
@@ -343,7 +556,12 @@ class LightshotRegionCapture:
             return
         
         x1, y1, x2, y2 = self.selection
-        screen_width, screen_height = get_screen_size()
+        
+        # Keep the toolbar on the monitor holding the selection
+        origin_x, origin_y = self.capture_box[:2]
+        monitor = self.layout.monitor_at(origin_x + (x1 + x2) // 2, origin_y + (y1 + y2) // 2)
+        mon_left, mon_top = monitor.left - origin_x, monitor.top - origin_y
+        mon_right, mon_bottom = mon_left + monitor.width, mon_top + monitor.height
         
         self.toolbar_frame = tk.Frame(self.root, bg='#3c3c3c', padx=5, pady=5)
         
@@ -414,6 +632,13 @@ class LightshotRegionCapture:
             font=('Arial', 10), relief=tk.RAISED, cursor='hand2'
         ).pack(side=tk.LEFT, padx=2)
         
+        tk.Button(
+            self.toolbar_frame, text='↷',
+            command=self.redo,
+            bg='#4a4a4a', fg='white', width=3,
+            font=('Arial', 10), relief=tk.RAISED, cursor='hand2'
+        ).pack(side=tk.LEFT, padx=2)
+        
         tk.Frame(self.toolbar_frame, bg='#666', width=2).pack(side=tk.LEFT, fill=tk.Y, padx=6, pady=2)
         
         save_bg = '#2d6a2d' if not self.default_to_clipboard else '#4a4a4a'
@@ -451,17 +676,17 @@ class LightshotRegionCapture:
         toolbar_height = 40
         
         toolbar_x = (x1 + x2) // 2 - toolbar_width // 2
-        toolbar_x = max(10, min(toolbar_x, screen_width - toolbar_width - 10))
+        toolbar_x = max(mon_left + 10, min(toolbar_x, mon_right - toolbar_width - 10))
         
-        space_above = y1 - 50
-        space_below = screen_height - y2 - 50
+        space_above = y1 - mon_top - 50
+        space_below = mon_bottom - y2 - 50
         
         if space_above >= toolbar_height:
             toolbar_y = y1 - toolbar_height - 10
         elif space_below >= toolbar_height:
             toolbar_y = y2 + 10
         else:
-            toolbar_y = 10
+            toolbar_y = mon_top + 10
         
         self.toolbar_frame.place(x=toolbar_x, y=toolbar_y)
     
@@ -524,91 +749,35 @@ class LightshotRegionCapture:
         self.temp_items.append(item)
     
     def commit_shape(self, end_x, end_y):
-        """Commit shape to both canvas and PIL image"""
+        """Add the dragged shape to the annotations"""
         color = self.color
         width = self.weight
         sx, sy = self.draw_start_x, self.draw_start_y
         
         if self.tool == 'arrow':
-            self.draw.line([sx, sy, end_x, end_y], fill=color, width=width)
-            self.draw_arrow_head(sx, sy, end_x, end_y, color, width)
-            self.canvas.create_line(sx, sy, end_x, end_y,
-                                   arrow=tk.LAST, fill=self.rgb_to_hex(color), 
-                                   width=width, tags="drawing")
-            self.drawn_items.append(('arrow', sx, sy, end_x, end_y, color, width))
-            
+            record = Arrow(sx, sy, end_x, end_y, color, width)
         elif self.tool == 'line':
-            self.draw.line([sx, sy, end_x, end_y], fill=color, width=width)
-            self.canvas.create_line(sx, sy, end_x, end_y,
-                                   fill=self.rgb_to_hex(color), width=width, tags="drawing")
-            self.drawn_items.append(('line', sx, sy, end_x, end_y, color, width))
-            
+            record = Line(sx, sy, end_x, end_y, color, width)
         elif self.tool == 'rect':
-            self.draw.rectangle([sx, sy, end_x, end_y], outline=color, width=width)
-            self.canvas.create_rectangle(sx, sy, end_x, end_y,
-                                        outline=self.rgb_to_hex(color), width=width, tags="drawing")
-            self.drawn_items.append(('rect', sx, sy, end_x, end_y, color, width))
-            
+            record = Rect(sx, sy, end_x, end_y, color, width)
         elif self.tool == 'circle':
             radius = int(((end_x - sx)**2 + (end_y - sy)**2)**0.5)
-            self.draw.ellipse([sx - radius, sy - radius, sx + radius, sy + radius],
-                             outline=color, width=width)
-            self.canvas.create_oval(sx - radius, sy - radius, sx + radius, sy + radius,
-                                   outline=self.rgb_to_hex(color), width=width, tags="drawing")
-            self.drawn_items.append(('circle', sx, sy, radius, color, width))
+            record = Circle(sx - radius, sy - radius, sx + radius, sy + radius, color, width)
+        else:
+            return
         
-        self.refresh_display()
-    
-    def draw_arrow_head(self, x1, y1, x2, y2, color, weight):
-        """Draw arrow head on PIL image"""
-        angle = math.atan2(y2 - y1, x2 - x1)
-        arrow_length = 15 + weight * 2
-        arrow_width = 6 + weight
-        
-        tip_x, tip_y = x2, y2
-        base_left_x = x2 - arrow_length * math.cos(angle) - arrow_width * math.sin(angle)
-        base_left_y = y2 - arrow_length * math.sin(angle) + arrow_width * math.cos(angle)
-        base_right_x = x2 - arrow_length * math.cos(angle) + arrow_width * math.sin(angle)
-        base_right_y = y2 - arrow_length * math.sin(angle) - arrow_width * math.cos(angle)
-        
-        self.draw.polygon(
-            [(tip_x, tip_y), (base_left_x, base_left_y), (base_right_x, base_right_y)],
-            fill=color
-        )
+        self.annotations.add(record)
     
     def commit_highlighter(self):
-        """Commit highlighter strokes to PIL image"""
+        """Add the highlighter stroke to the annotations"""
         if len(self.highlighter_points) < 2:
             return
         
-        overlay = Image.new('RGBA', self.img.size, (0, 0, 0, 0))
-        overlay_draw = ImageDraw.Draw(overlay)
-        
-        line_width = max(8, self.weight * 3)
-        rgba_color = (self.color[0], self.color[1], self.color[2], 100)
-        
-        for i in range(len(self.highlighter_points) - 1):
-            x1, y1 = self.highlighter_points[i]
-            x2, y2 = self.highlighter_points[i + 1]
-            overlay_draw.line([(x1, y1), (x2, y2)], fill=rgba_color, width=line_width)
-            r = line_width // 2
-            overlay_draw.ellipse([x1 - r, y1 - r, x1 + r, y1 + r], fill=rgba_color)
-        
-        x, y = self.highlighter_points[-1]
-        r = line_width // 2
-        overlay_draw.ellipse([x - r, y - r, x + r, y + r], fill=rgba_color)
-        
-        if self.img.mode != 'RGBA':
-            self.img = self.img.convert('RGBA')
-        self.img = Image.alpha_composite(self.img, overlay)
-        self.img = self.img.convert('RGB')
-        self.draw = ImageDraw.Draw(self.img)
-        
-        self.drawn_items.append(('highlight', self.highlighter_points.copy(), self.color, self.weight))
-        self.refresh_display()
+        self.annotations.add(Highlight(simplify_path(self.highlighter_points), self.color,
+                                       max(8, self.weight * 3), 100))
     
     def commit_blur(self, end_x, end_y):
-        """Apply blur/pixelation to region"""
+        """Add a redacted region to the annotations"""
         x1, y1 = min(self.draw_start_x, end_x), min(self.draw_start_y, end_y)
         x2, y2 = max(self.draw_start_x, end_x), max(self.draw_start_y, end_y)
         
@@ -617,24 +786,10 @@ class LightshotRegionCapture:
         
         x1 = max(0, x1)
         y1 = max(0, y1)
-        x2 = min(self.img.width, x2)
-        y2 = min(self.img.height, y2)
-        
-        region = self.img.crop((x1, y1, x2, y2))
-        pixel_size = 10
-        small_w = max(1, (x2 - x1) // pixel_size)
-        small_h = max(1, (y2 - y1) // pixel_size)
-        small = region.resize((small_w, small_h), Image.Resampling.NEAREST)
-        pixelated = small.resize((x2 - x1, y2 - y1), Image.Resampling.NEAREST)
-        self.img.paste(pixelated, (x1, y1))
-        self.draw = ImageDraw.Draw(self.img)
-        
-        self.canvas.create_rectangle(x1, y1, x2, y2, 
-                                     fill='#888888', stipple='gray50', 
-                                     outline='#666', tags="drawing")
-        
-        self.drawn_items.append(('blur', x1, y1, x2, y2))
-        self.refresh_display()
+        x2 = min(self.full_screenshot.width, x2)
+        y2 = min(self.full_screenshot.height, y2)
+        
+        self.annotations.add(Blur(x1, y1, x2, y2, self.redaction_strength, self.redaction_mode))
     
     def start_text_mode(self, x, y):
         """Start text entry mode"""
@@ -645,7 +800,7 @@ class LightshotRegionCapture:
         self.text_cursor = self.canvas.create_text(
             x, y, text="|", anchor=tk.NW,
             fill=self.rgb_to_hex(self.color),
-            font=('Arial', 12 + self.weight * 2),
+            font=('Arial', -(12 + self.weight * 2)),
             tags="text_cursor"
         )
     
@@ -671,12 +826,12 @@ class LightshotRegionCapture:
             self.text_cursor = self.canvas.create_text(
                 x, y, text=display_text, anchor=tk.NW,
                 fill=self.rgb_to_hex(self.color),
-                font=('Arial', 12 + self.weight * 2),
+                font=('Arial', -(12 + self.weight * 2)),
                 tags="text_cursor"
             )
     
     def commit_text(self):
-        """Commit text to image"""
+        """Add the typed text to the annotations"""
         if not self.text_buffer or not self.text_position:
             self.text_mode = False
             self.canvas.delete("text_cursor")
@@ -685,24 +840,12 @@ class LightshotRegionCapture:
         x, y = self.text_position
         font_size = 12 + self.weight * 2
         
-        try:
-            font = ImageFont.truetype("arial.ttf", font_size)
-        except:
-            font = ImageFont.load_default()
-        
-        self.draw.text((x, y), self.text_buffer, fill=self.color, font=font)
-        
         self.canvas.delete("text_cursor")
-        self.canvas.create_text(x, y, text=self.text_buffer, anchor=tk.NW,
-                               fill=self.rgb_to_hex(self.color),
-                               font=('Arial', font_size), tags="drawing")
-        
-        self.drawn_items.append(('text', x, y, self.text_buffer, self.color, font_size))
+        self.annotations.add(Text(x, y, self.text_buffer, self.color, font_size))
         
         self.text_mode = False
         self.text_buffer = ""
         self.text_position = None
-        self.refresh_display()
     
     def undo(self):
         """Undo last drawing operation"""
@@ -710,138 +853,36 @@ class LightshotRegionCapture:
         if self.text_mode and self.text_buffer:
             self.commit_text()
         
-        if not self.drawn_items:
-            return
-        
-        self.drawn_items.pop()
-        
-        self.img = self.full_screenshot.copy()
-        self.draw = ImageDraw.Draw(self.img)
-        
-        for item in self.drawn_items:
-            self.replay_item(item)
-        
-        self.canvas.delete("drawing")
-        self.refresh_display()
-        
-        for item in self.drawn_items:
-            self.redraw_canvas_item(item)
-    
-    def replay_item(self, item):
-        """Replay a drawing item onto the PIL image"""
-        item_type = item[0]
-        
-        if item_type == 'arrow':
-            _, sx, sy, ex, ey, color, width = item
-            self.draw.line([sx, sy, ex, ey], fill=color, width=width)
-            self.draw_arrow_head(sx, sy, ex, ey, color, width)
-        elif item_type == 'line':
-            _, sx, sy, ex, ey, color, width = item
-            self.draw.line([sx, sy, ex, ey], fill=color, width=width)
-        elif item_type == 'rect':
-            _, sx, sy, ex, ey, color, width = item
-            self.draw.rectangle([sx, sy, ex, ey], outline=color, width=width)
-        elif item_type == 'circle':
-            _, sx, sy, radius, color, width = item
-            self.draw.ellipse([sx - radius, sy - radius, sx + radius, sy + radius],
-                             outline=color, width=width)
-        elif item_type == 'text':
-            _, x, y, text, color, font_size = item
-            try:
-                font = ImageFont.truetype("arial.ttf", font_size)
-            except:
-                font = ImageFont.load_default()
-            self.draw.text((x, y), text, fill=color, font=font)
-        elif item_type == 'highlight':
-            _, points, color, weight = item
-            overlay = Image.new('RGBA', self.img.size, (0, 0, 0, 0))
-            overlay_draw = ImageDraw.Draw(overlay)
-            line_width = max(8, weight * 3)
-            rgba_color = (color[0], color[1], color[2], 100)
-            for i in range(len(points) - 1):
-                x1, y1 = points[i]
-                x2, y2 = points[i + 1]
-                overlay_draw.line([(x1, y1), (x2, y2)], fill=rgba_color, width=line_width)
-            if self.img.mode != 'RGBA':
-                self.img = self.img.convert('RGBA')
-            self.img = Image.alpha_composite(self.img, overlay)
-            self.img = self.img.convert('RGB')
-            self.draw = ImageDraw.Draw(self.img)
-        elif item_type == 'blur':
-            _, x1, y1, x2, y2 = item
-            region = self.img.crop((x1, y1, x2, y2))
-            pixel_size = 10
-            small_w = max(1, (x2 - x1) // pixel_size)
-            small_h = max(1, (y2 - y1) // pixel_size)
-            small = region.resize((small_w, small_h), Image.Resampling.NEAREST)
-            pixelated = small.resize((x2 - x1, y2 - y1), Image.Resampling.NEAREST)
-            self.img.paste(pixelated, (x1, y1))
-            self.draw = ImageDraw.Draw(self.img)
-    
-    def redraw_canvas_item(self, item):
-        """Redraw a single item on the canvas"""
-        item_type = item[0]
-        
-        if item_type == 'arrow':
-            _, sx, sy, ex, ey, color, width = item
-            self.canvas.create_line(sx, sy, ex, ey, arrow=tk.LAST,
-                                   fill=self.rgb_to_hex(color), width=width, tags="drawing")
-        elif item_type == 'line':
-            _, sx, sy, ex, ey, color, width = item
-            self.canvas.create_line(sx, sy, ex, ey,
-                                   fill=self.rgb_to_hex(color), width=width, tags="drawing")
-        elif item_type == 'rect':
-            _, sx, sy, ex, ey, color, width = item
-            self.canvas.create_rectangle(sx, sy, ex, ey,
-                                        outline=self.rgb_to_hex(color), width=width, tags="drawing")
-        elif item_type == 'circle':
-            _, sx, sy, radius, color, width = item
-            self.canvas.create_oval(sx - radius, sy - radius, sx + radius, sy + radius,
-                                   outline=self.rgb_to_hex(color), width=width, tags="drawing")
-        elif item_type == 'text':
-            _, x, y, text, color, font_size = item
-            self.canvas.create_text(x, y, text=text, anchor=tk.NW,
-                                   fill=self.rgb_to_hex(color),
-                                   font=('Arial', font_size), tags="drawing")
-        elif item_type == 'highlight':
-            _, points, color, weight = item
-            line_width = max(8, weight * 3)
-            for i in range(len(points) - 1):
-                self.canvas.create_line(points[i][0], points[i][1],
-                                       points[i+1][0], points[i+1][1],
-                                       fill=self.rgb_to_hex(color), width=line_width,
-                                       capstyle=tk.ROUND, stipple='gray50', tags="drawing")
-        elif item_type == 'blur':
-            _, x1, y1, x2, y2 = item
-            self.canvas.create_rectangle(x1, y1, x2, y2,
-                                        fill='#888888', stipple='gray50',
-                                        outline='#666', tags="drawing")
+        self.annotations.undo()
+    
+    def redo(self):
+        """Re-apply the last undone drawing operation"""
+        if not self.text_mode:
+            self.annotations.redo()
     
     def refresh_display(self):
-        """Refresh the canvas display with current image"""
-        self.photo = ImageTk.PhotoImage(self.img)
-        self.canvas.delete("screenshot")
-        self.canvas.create_image(0, 0, anchor=tk.NW, image=self.photo, tags="screenshot")
-        self.canvas.tag_lower("screenshot")
+        """Show another frame (picked with the pre-capture scrubber)"""
+        self.photo = ImageTk.PhotoImage(self.full_screenshot)
+        if self.selecting:
+            # Re-bake the dimmed background for the new frame
+            self.dim_photo = ImageTk.PhotoImage(dim_frame(self.full_screenshot))
+            self.canvas.itemconfig(self.dim_overlay, image=self.dim_photo)
+        self.update_dim_overlay(*self.hole)
     
     def add_metadata(self):
-        """Add ViewClipper metadata to image"""
-        meta = PngImagePlugin.PngInfo()
-        meta.add_text("viewclipper_version", "1.0")
-        meta.add_text("viewclipper_mode", "region")
-        meta.add_text("viewclipper_captured_at", datetime.now().isoformat())
-        return meta
+        """ViewClipper metadata for the saved image"""
+        return {
+            "viewclipper_version": "1.0",
+            "viewclipper_mode": "region",
+            "viewclipper_captured_at": datetime.now().isoformat(),
+        }
     
     def crop_to_selection(self):
-        """Crop image to selected region"""
-        if not self.selection:
-            return self.img
-        
-        x1, y1, x2, y2 = self.selection
-        return self.img.crop((x1, y1, x2, y2))
+        """Selected region with the annotations rasterized into it"""
+        return self.annotations.rasterize(self.full_screenshot, self.selection)
     
     def save(self, action='local'):
-        """Save the cropped region"""
+        """Finish with the cropped region; action is 'local', 'cloud' or 'clipboard'"""
         if self.text_mode and self.text_buffer:
             self.commit_text()
         
@@ -852,17 +893,8 @@ class LightshotRegionCapture:
         self.root.destroy()
     
     def copy_and_close(self):
-        """Copy to clipboard and close"""
-        if self.text_mode and self.text_buffer:
-            self.commit_text()
-        
-        cropped = self.crop_to_selection()
-        copy_to_clipboard(cropped)
-        print("📋 Copied to clipboard!")
-        
-        self.result = None
-        self.root.quit()
-        self.root.destroy()
+        """Copy to clipboard and close (the copy happens on the save stage)"""
+        self.save('clipboard')
     
     def cancel(self):
         """Cancel and close"""
@@ -893,7 +925,8 @@ class LightshotRegionCapture:
 class FullscreenEditor:
     """Fullscreen capture with scaled display and toolbar ABOVE the screenshot"""
     
-    def __init__(self, default_to_clipboard=False):
+    def __init__(self, default_to_clipboard=False, frames=None, monitor_mode='current',
+                 redaction_mode='pixelate', redaction_strength=10, undo_memory_mb=128):
         self.root = None
         self.canvas = None
         self.full_screenshot = None
@@ -901,11 +934,27 @@ class FullscreenEditor:
         
         self.default_to_clipboard = default_to_clipboard
         
+        # Blur tool: redaction.py mode and cell size / radius
+        self.redaction_mode = redaction_mode
+        self.redaction_strength = redaction_strength
+        self.redaction_preview = None
+        self.undo_memory_mb = undo_memory_mb
+        
         # Scale factor for display
         self.scale = 1.0
         self.offset_x = 0
         self.offset_y = 0
         
+        # Scaled view of the capture, see display.ScaledDisplay
+        self.display = None
+        
+        # 'current' captures the monitor under the cursor, 'all' every monitor
+        self.monitor_mode = monitor_mode
+        self.layout = None
+        self.capture_box = None
+        self.screen_width = 0
+        self.screen_height = 0
+        
         # Drawing state
         self.tool = None
         self.color = (255, 0, 0)
@@ -914,7 +963,8 @@ class FullscreenEditor:
         self.draw_start_x = None
         self.draw_start_y = None
         self.temp_items = []
-        self.drawn_items = []
+        # Records shown as canvas items, rasterized on save/copy (see annotations.py)
+        self.annotations = None
         
         # Text state
         self.text_mode = False
@@ -924,6 +974,7 @@ class FullscreenEditor:
         
         # Highlighter state
         self.highlighter_points = []
+        self.stroke_item = None  # live highlighter polyline
         
         # Toolbar
         self.toolbar_frame = None
@@ -934,23 +985,29 @@ class FullscreenEditor:
         self.save_action = None
         self.metadata = None
         
-        # PIL drawing surface (full resolution)
-        self.img = None
-        self.draw = None
+        # Pre-captured frames (newest first), stepped through with Left/Right
+        self.recent_frames = frames
+        self.frame_index = 0
+        self.live_frame = None
+        self.capture_time = None
+        self.scrubber_label = None
     
     def capture_and_edit(self):
         """Capture fullscreen and show editor with scaled preview"""
-        screen_width, screen_height = get_screen_size()
+        self.layout = display_info.layout()
+        window = self.layout.current()
+        targets = self.layout.monitors if self.monitor_mode == 'all' else [window]
+        self.capture_box = bounding_box(targets)
         
-        # Capture full screen at full resolution
-        with mss() as sct:
-            monitor = {"top": 0, "left": 0, "width": screen_width, "height": screen_height}
-            screenshot = sct.grab(monitor)
-            self.full_screenshot = Image.frombytes('RGB', screenshot.size, screenshot.rgb)
+        # The editor window covers the monitor the user is working on
+        screen_width, screen_height = window.width, window.height
+        self.screen_width, self.screen_height = screen_width, screen_height
         
-        # Create working copy at full resolution
-        self.img = self.full_screenshot.copy()
-        self.draw = ImageDraw.Draw(self.img)
+        # Capture at full resolution
+        self.full_screenshot = capture_service.grab_monitors(targets)
+        img_width, img_height = self.full_screenshot.size
+        self.live_frame = self.full_screenshot
+        self.capture_time = time.time()
         
         # Calculate scale to fit screenshot with toolbar above
         toolbar_height = 60
@@ -958,12 +1015,12 @@ class FullscreenEditor:
         available_height = screen_height - toolbar_height - margin * 2
         available_width = screen_width - margin * 2
         
-        scale_x = available_width / screen_width
-        scale_y = available_height / screen_height
+        scale_x = available_width / img_width
+        scale_y = available_height / img_height
         self.scale = min(scale_x, scale_y, 0.95)  # Max 95% to ensure margin
         
-        display_width = int(screen_width * self.scale)
-        display_height = int(screen_height * self.scale)
+        display_width = int(img_width * self.scale)
+        display_height = int(img_height * self.scale)
         
         # Center the scaled screenshot
         self.offset_x = (screen_width - display_width) // 2
@@ -972,7 +1029,7 @@ class FullscreenEditor:
         # Create fullscreen window with dark background
         self.root = tk.Tk()
         self.root.overrideredirect(True)
-        self.root.geometry(f"{screen_width}x{screen_height}+0+0")
+        self.root.geometry(f"{screen_width}x{screen_height}+{window.left}+{window.top}")
         self.root.configure(bg='#2b2b2b')
         self.root.attributes('-topmost', True)
         self.root.lift()
@@ -983,11 +1040,15 @@ class FullscreenEditor:
                                 highlightthickness=0, bg='#2b2b2b', cursor="arrow")
         self.canvas.pack()
         
-        # Create scaled display image
-        self.display_img = self.img.resize((display_width, display_height), Image.Resampling.LANCZOS)
-        self.photo = ImageTk.PhotoImage(self.display_img)
+        # Scaled display image; annotations are drawn over it as canvas items
+        self.display = ScaledDisplay(self.full_screenshot, (display_width, display_height))
+        self.photo = self.display.photo
         self.canvas.create_image(self.offset_x, self.offset_y, anchor=tk.NW, 
                                 image=self.photo, tags="screenshot")
+        self.annotations = AnnotationDocument(
+            CanvasRenderer(self.canvas, self.full_screenshot, self.scale, (self.offset_x, self.offset_y)),
+            memory_budget=self.undo_memory_mb << 20,
+        )
         
         # Draw border around screenshot
         self.canvas.create_rectangle(
@@ -1003,9 +1064,12 @@ class FullscreenEditor:
         self.root.bind('<Escape>', self.on_escape)
         self.root.bind('<Return>', self.on_enter)
         self.root.bind('<Key>', self.on_key_press)
+        self.root.bind('<Control-z>', lambda e: self.undo())
+        self.root.bind('<Control-y>', lambda e: self.redo())
         
         # Show toolbar at top
         self.show_toolbar()
+        self.show_frame_scrubber()
         
         self.root.mainloop()
         
@@ -1013,6 +1077,55 @@ class FullscreenEditor:
             return (self.result, self.metadata, self.save_action)
         return None
     
+    def show_frame_scrubber(self):
+        """Show the pre-capture scrubber when older frames are available"""
+        if not self.recent_frames:
+            return
+        
+        self.root.bind('<Left>', lambda e: self.step_frame(1))
+        self.root.bind('<Right>', lambda e: self.step_frame(-1))
+        
+        self.scrubber_label = tk.Label(
+            self.root, text='', bg='#333', fg='white',
+            font=('Arial', 10), padx=12, pady=6
+        )
+        self.scrubber_label.place(relx=0.5, rely=1.0, y=-20, anchor='center')
+        self.update_scrubber_label()
+    
+    def step_frame(self, delta):
+        """Step back (delta > 0) or forward through the pre-captured frames"""
+        # Frames can only be switched before anything is drawn on them
+        if len(self.annotations) or self.text_mode:
+            return
+        
+        index = max(0, min(len(self.recent_frames), self.frame_index + delta))
+        if index == self.frame_index:
+            return
+        
+        if index == 0:
+            frame = self.live_frame
+        else:
+            frame = crop_to_capture(self.recent_frames.image(index - 1), self.layout, self.capture_box)
+            if frame is None:
+                return  # recorded before the monitor layout changed
+        
+        self.frame_index = index
+        self.full_screenshot = frame
+        self.annotations.set_base(frame)
+        
+        self.refresh_display()
+        self.update_scrubber_label()
+    
+    def update_scrubber_label(self):
+        if self.frame_index == 0:
+            when = 'now'
+        else:
+            age = self.capture_time - self.recent_frames.timestamp(self.frame_index - 1)
+            when = f'-{age:.1f} s'
+        self.scrubber_label.config(
+            text=f"⏪ Frame {when} ({self.frame_index}/{len(self.recent_frames)}) • ← older  → newer"
+        )
+    
     def display_to_image(self, dx, dy):
         """Convert display coordinates to image coordinates"""
         ix = int((dx - self.offset_x) / self.scale)
@@ -1027,8 +1140,8 @@ class FullscreenEditor:
     
     def is_in_image_area(self, x, y):
         """Check if coordinates are within the image area"""
-        display_width = int(self.img.width * self.scale)
-        display_height = int(self.img.height * self.scale)
+        display_width = int(self.full_screenshot.width * self.scale)
+        display_height = int(self.full_screenshot.height * self.scale)
         return (self.offset_x <= x <= self.offset_x + display_width and
                 self.offset_y <= y <= self.offset_y + display_height)
     
@@ -1044,30 +1157,26 @@ class FullscreenEditor:
             if self.tool == 'text':
                 self.start_text_mode(event.x, event.y)
             elif self.tool == 'highlight':
-                self.highlighter_points = [(event.x, event.y)]
+                self.highlighter_points = [self.display_to_image(event.x, event.y)]
+                self.stroke_item = None
+            elif self.tool == 'blur':
+                self.redaction_preview = RedactionPreview(self.canvas, self.display.image, self.scale,
+                                                          (self.offset_x, self.offset_y))
     
     def on_mouse_move(self, event):
         if self.drawing and self.tool:
             if self.tool == 'highlight':
                 if self.is_in_image_area(event.x, event.y):
-                    self.highlighter_points.append((event.x, event.y))
-                    if len(self.highlighter_points) >= 2:
-                        p1 = self.highlighter_points[-2]
-                        p2 = self.highlighter_points[-1]
-                        item = self.canvas.create_line(
-                            p1[0], p1[1], p2[0], p2[1],
-                            fill=self.rgb_to_hex(self.color), 
-                            width=max(1, int(self.weight * 3 * self.scale)),
-                            capstyle=tk.ROUND, stipple='gray50', tags="drawing"
-                        )
+                    item = self.annotations.renderer.extend_stroke(
+                        self.stroke_item, self.highlighter_points, *self.display_to_image(event.x, event.y),
+                        self.rgb_to_hex(self.color), max(1, int(self.weight * 3 * self.scale)), tags="drawing"
+                    )
+                    if item is not self.stroke_item:
+                        self.stroke_item = item
                         self.temp_items.append(item)
             elif self.tool == 'blur':
-                self.cleanup_temp_items()
-                item = self.canvas.create_rectangle(
-                    self.draw_start_x, self.draw_start_y, event.x, event.y,
-                    outline='#ff6600', width=2, dash=(4, 4), tags="temp"
-                )
-                self.temp_items.append(item)
+                self.redaction_preview.show((self.draw_start_x, self.draw_start_y, event.x, event.y),
+                                            self.redaction_mode, self.redaction_strength, outline=True)
             elif self.tool != 'text':
                 self.cleanup_temp_items()
                 self.draw_preview_shape(event.x, event.y)
@@ -1083,6 +1192,7 @@ class FullscreenEditor:
                     self.commit_highlighter()
                 self.highlighter_points = []
             elif self.tool == 'blur':
+                self.redaction_preview.hide()
                 self.commit_blur(event.x, event.y)
             else:
                 self.commit_shape(event.x, event.y)
@@ -1091,7 +1201,7 @@ class FullscreenEditor:
     
     def show_toolbar(self):
         """Show editing toolbar at top center"""
-        screen_width, _ = get_screen_size()
+        screen_width = self.screen_width
         
         self.toolbar_frame = tk.Frame(self.root, bg='#3c3c3c', padx=5, pady=5)
         
@@ -1162,6 +1272,13 @@ class FullscreenEditor:
             font=('Arial', 10), relief=tk.RAISED, cursor='hand2'
         ).pack(side=tk.LEFT, padx=2)
         
+        tk.Button(
+            self.toolbar_frame, text='↷',
+            command=self.redo,
+            bg='#4a4a4a', fg='white', width=3,
+            font=('Arial', 10), relief=tk.RAISED, cursor='hand2'
+        ).pack(side=tk.LEFT, padx=2)
+        
         tk.Frame(self.toolbar_frame, bg='#666', width=2).pack(side=tk.LEFT, fill=tk.Y, padx=6, pady=2)
         
         save_bg = '#2d6a2d' if not self.default_to_clipboard else '#4a4a4a'
@@ -1262,73 +1379,27 @@ class FullscreenEditor:
         img_sx, img_sy = self.display_to_image(self.draw_start_x, self.draw_start_y)
         img_ex, img_ey = self.display_to_image(end_x, end_y)
         
-        # Draw on full-resolution image
         if self.tool == 'arrow':
-            self.draw.line([img_sx, img_sy, img_ex, img_ey], fill=color, width=width)
-            self.draw_arrow_head(img_sx, img_sy, img_ex, img_ey, color, width)
-            self.drawn_items.append(('arrow', img_sx, img_sy, img_ex, img_ey, color, width))
+            record = Arrow(img_sx, img_sy, img_ex, img_ey, color, width)
         elif self.tool == 'line':
-            self.draw.line([img_sx, img_sy, img_ex, img_ey], fill=color, width=width)
-            self.drawn_items.append(('line', img_sx, img_sy, img_ex, img_ey, color, width))
+            record = Line(img_sx, img_sy, img_ex, img_ey, color, width)
         elif self.tool == 'rect':
-            self.draw.rectangle([img_sx, img_sy, img_ex, img_ey], outline=color, width=width)
-            self.drawn_items.append(('rect', img_sx, img_sy, img_ex, img_ey, color, width))
+            record = Rect(img_sx, img_sy, img_ex, img_ey, color, width)
         elif self.tool == 'circle':
             radius = int(((img_ex - img_sx)**2 + (img_ey - img_sy)**2)**0.5)
-            self.draw.ellipse([img_sx - radius, img_sy - radius, img_sx + radius, img_sy + radius],
-                             outline=color, width=width)
-            self.drawn_items.append(('circle', img_sx, img_sy, radius, color, width))
-        
-        self.refresh_display()
-    
-    def draw_arrow_head(self, x1, y1, x2, y2, color, weight):
-        angle = math.atan2(y2 - y1, x2 - x1)
-        arrow_length = 15 + weight * 2
-        arrow_width = 6 + weight
-        
-        tip_x, tip_y = x2, y2
-        base_left_x = x2 - arrow_length * math.cos(angle) - arrow_width * math.sin(angle)
-        base_left_y = y2 - arrow_length * math.sin(angle) + arrow_width * math.cos(angle)
-        base_right_x = x2 - arrow_length * math.cos(angle) + arrow_width * math.sin(angle)
-        base_right_y = y2 - arrow_length * math.sin(angle) - arrow_width * math.cos(angle)
+            record = Circle(img_sx - radius, img_sy - radius, img_sx + radius, img_sy + radius,
+                            color, width)
+        else:
+            return
         
-        self.draw.polygon(
-            [(tip_x, tip_y), (base_left_x, base_left_y), (base_right_x, base_right_y)],
-            fill=color
-        )
+        self.annotations.add(record)
     
     def commit_highlighter(self):
         if len(self.highlighter_points) < 2:
             return
         
-        # Convert all points to image coordinates
-        img_points = [self.display_to_image(x, y) for x, y in self.highlighter_points]
-        
-        overlay = Image.new('RGBA', self.img.size, (0, 0, 0, 0))
-        overlay_draw = ImageDraw.Draw(overlay)
-        
-        line_width = max(8, self.weight * 3)
-        rgba_color = (self.color[0], self.color[1], self.color[2], 100)
-        
-        for i in range(len(img_points) - 1):
-            x1, y1 = img_points[i]
-            x2, y2 = img_points[i + 1]
-            overlay_draw.line([(x1, y1), (x2, y2)], fill=rgba_color, width=line_width)
-            r = line_width // 2
-            overlay_draw.ellipse([x1 - r, y1 - r, x1 + r, y1 + r], fill=rgba_color)
-        
-        x, y = img_points[-1]
-        r = line_width // 2
-        overlay_draw.ellipse([x - r, y - r, x + r, y + r], fill=rgba_color)
-        
-        if self.img.mode != 'RGBA':
-            self.img = self.img.convert('RGBA')
-        self.img = Image.alpha_composite(self.img, overlay)
-        self.img = self.img.convert('RGB')
-        self.draw = ImageDraw.Draw(self.img)
-        
-        self.drawn_items.append(('highlight', img_points, self.color, self.weight))
-        self.refresh_display()
+        self.annotations.add(Highlight(simplify_path(self.highlighter_points), self.color,
+                                       max(8, self.weight * 3), 100))
     
     def commit_blur(self, end_x, end_y):
         img_x1, img_y1 = self.display_to_image(min(self.draw_start_x, end_x), 
@@ -1341,20 +1412,11 @@ class FullscreenEditor:
         
         img_x1 = max(0, img_x1)
         img_y1 = max(0, img_y1)
-        img_x2 = min(self.img.width, img_x2)
-        img_y2 = min(self.img.height, img_y2)
-        
-        region = self.img.crop((img_x1, img_y1, img_x2, img_y2))
-        pixel_size = 10
-        small_w = max(1, (img_x2 - img_x1) // pixel_size)
-        small_h = max(1, (img_y2 - img_y1) // pixel_size)
-        small = region.resize((small_w, small_h), Image.Resampling.NEAREST)
-        pixelated = small.resize((img_x2 - img_x1, img_y2 - img_y1), Image.Resampling.NEAREST)
-        self.img.paste(pixelated, (img_x1, img_y1))
-        self.draw = ImageDraw.Draw(self.img)
-        
-        self.drawn_items.append(('blur', img_x1, img_y1, img_x2, img_y2))
-        self.refresh_display()
+        img_x2 = min(self.full_screenshot.width, img_x2)
+        img_y2 = min(self.full_screenshot.height, img_y2)
+        
+        self.annotations.add(Blur(img_x1, img_y1, img_x2, img_y2,
+                                  self.redaction_strength, self.redaction_mode))
     
     def start_text_mode(self, x, y):
         self.text_mode = True
@@ -1365,7 +1427,7 @@ class FullscreenEditor:
         self.text_cursor = self.canvas.create_text(
             x, y, text="|", anchor=tk.NW,
             fill=self.rgb_to_hex(self.color),
-            font=('Arial', font_size),
+            font=('Arial', -font_size),
             tags="text_cursor"
         )
     
@@ -1390,7 +1452,7 @@ class FullscreenEditor:
             self.text_cursor = self.canvas.create_text(
                 x, y, text=display_text, anchor=tk.NW,
                 fill=self.rgb_to_hex(self.color),
-                font=('Arial', font_size),
+                font=('Arial', -font_size),
                 tags="text_cursor"
             )
     
@@ -1404,128 +1466,46 @@ class FullscreenEditor:
         img_x, img_y = self.display_to_image(self.text_position[0], self.text_position[1])
         font_size = 12 + self.weight * 2
         
-        try:
-            font = ImageFont.truetype("arial.ttf", font_size)
-        except:
-            font = ImageFont.load_default()
-        
-        # Draw on full-resolution image
-        self.draw.text((img_x, img_y), self.text_buffer, fill=self.color, font=font)
-        
         self.canvas.delete("text_cursor")
-        
-        self.drawn_items.append(('text', img_x, img_y, self.text_buffer, self.color, font_size))
+        self.annotations.add(Text(img_x, img_y, self.text_buffer, self.color, font_size))
         
         self.text_mode = False
         self.text_buffer = ""
         self.text_position = None
-        self.refresh_display()
     
     def undo(self):
         if self.text_mode and self.text_buffer:
             self.commit_text()
         
-        if not self.drawn_items:
-            return
-        
-        self.drawn_items.pop()
-        
-        self.img = self.full_screenshot.copy()
-        self.draw = ImageDraw.Draw(self.img)
-        
-        for item in self.drawn_items:
-            self.replay_item(item)
-        
-        self.refresh_display()
+        self.annotations.undo()
     
-    def replay_item(self, item):
-        item_type = item[0]
-        
-        if item_type == 'arrow':
-            _, sx, sy, ex, ey, color, width = item
-            self.draw.line([sx, sy, ex, ey], fill=color, width=width)
-            self.draw_arrow_head(sx, sy, ex, ey, color, width)
-        elif item_type == 'line':
-            _, sx, sy, ex, ey, color, width = item
-            self.draw.line([sx, sy, ex, ey], fill=color, width=width)
-        elif item_type == 'rect':
-            _, sx, sy, ex, ey, color, width = item
-            self.draw.rectangle([sx, sy, ex, ey], outline=color, width=width)
-        elif item_type == 'circle':
-            _, sx, sy, radius, color, width = item
-            self.draw.ellipse([sx - radius, sy - radius, sx + radius, sy + radius],
-                             outline=color, width=width)
-        elif item_type == 'text':
-            _, x, y, text, color, font_size = item
-            try:
-                font = ImageFont.truetype("arial.ttf", font_size)
-            except:
-                font = ImageFont.load_default()
-            self.draw.text((x, y), text, fill=color, font=font)
-        elif item_type == 'highlight':
-            _, points, color, weight = item
-            overlay = Image.new('RGBA', self.img.size, (0, 0, 0, 0))
-            overlay_draw = ImageDraw.Draw(overlay)
-            line_width = max(8, weight * 3)
-            rgba_color = (color[0], color[1], color[2], 100)
-            for i in range(len(points) - 1):
-                x1, y1 = points[i]
-                x2, y2 = points[i + 1]
-                overlay_draw.line([(x1, y1), (x2, y2)], fill=rgba_color, width=line_width)
-            if self.img.mode != 'RGBA':
-                self.img = self.img.convert('RGBA')
-            self.img = Image.alpha_composite(self.img, overlay)
-            self.img = self.img.convert('RGB')
-            self.draw = ImageDraw.Draw(self.img)
-        elif item_type == 'blur':
-            _, x1, y1, x2, y2 = item
-            region = self.img.crop((x1, y1, x2, y2))
-            pixel_size = 10
-            small_w = max(1, (x2 - x1) // pixel_size)
-            small_h = max(1, (y2 - y1) // pixel_size)
-            small = region.resize((small_w, small_h), Image.Resampling.NEAREST)
-            pixelated = small.resize((x2 - x1, y2 - y1), Image.Resampling.NEAREST)
-            self.img.paste(pixelated, (x1, y1))
-            self.draw = ImageDraw.Draw(self.img)
+    def redo(self):
+        if not self.text_mode:
+            self.annotations.redo()
     
     def refresh_display(self):
-        """Refresh the scaled display"""
-        display_width = int(self.img.width * self.scale)
-        display_height = int(self.img.height * self.scale)
-        self.display_img = self.img.resize((display_width, display_height), Image.Resampling.LANCZOS)
-        self.photo = ImageTk.PhotoImage(self.display_img)
-        self.canvas.delete("screenshot")
-        self.canvas.create_image(self.offset_x, self.offset_y, anchor=tk.NW,
-                                image=self.photo, tags="screenshot")
-        self.canvas.tag_lower("screenshot")
+        """Show another frame (picked with the pre-capture scrubber)"""
+        self.display.rebuild(self.full_screenshot)
     
     def add_metadata(self):
-        meta = PngImagePlugin.PngInfo()
-        meta.add_text("viewclipper_version", "1.0")
-        meta.add_text("viewclipper_mode", "fullscreen")
-        meta.add_text("viewclipper_captured_at", datetime.now().isoformat())
-        return meta
+        return {
+            "viewclipper_version": "1.0",
+            "viewclipper_mode": "fullscreen",
+            "viewclipper_captured_at": datetime.now().isoformat(),
+        }
     
     def save(self, action='local'):
         if self.text_mode and self.text_buffer:
             self.commit_text()
         
-        self.result = self.img  # Return full resolution image
+        self.result = self.annotations.rasterize(self.full_screenshot)
         self.metadata = self.add_metadata()
         self.save_action = action
         self.root.quit()
         self.root.destroy()
     
     def copy_and_close(self):
-        if self.text_mode and self.text_buffer:
-            self.commit_text()
-        
-        copy_to_clipboard(self.img)  # Copy full resolution image
-        print("📋 Copied to clipboard!")
-        
-        self.result = None
-        self.root.quit()
-        self.root.destroy()
+        self.save('clipboard')
     
     def cancel(self):
         self.result = None
@@ -1553,8 +1533,10 @@ class FullscreenEditor:
 class PredefinedEditor(FullscreenEditor):
     """Predefined area capture with scaled display and toolbar"""
     
-    def __init__(self, top_offset, bottom_offset, left_offset, right_offset, default_to_clipboard=False):
-        super().__init__(default_to_clipboard)
+    def __init__(self, top_offset, bottom_offset, left_offset, right_offset, default_to_clipboard=False,
+                 redaction_mode='pixelate', redaction_strength=10, undo_memory_mb=128):
+        super().__init__(default_to_clipboard, redaction_mode=redaction_mode,
+                         redaction_strength=redaction_strength, undo_memory_mb=undo_memory_mb)
         self.top_offset = top_offset
         self.bottom_offset = bottom_offset
         self.left_offset = left_offset
@@ -1563,6 +1545,7 @@ class PredefinedEditor(FullscreenEditor):
     def capture_and_edit(self):
         """Capture predefined area and show editor"""
         screen_width, screen_height = get_screen_size()
+        self.screen_width, self.screen_height = screen_width, screen_height
         
         # Calculate predefined region
         x1 = self.left_offset
@@ -1574,13 +1557,8 @@ class PredefinedEditor(FullscreenEditor):
             raise ValueError(f"Invalid predefined area: {img_width}x{img_height}")
         
         # Capture predefined region
-        with mss() as sct:
-            monitor = {"top": y1, "left": x1, "width": img_width, "height": img_height}
-            screenshot = sct.grab(monitor)
-            self.full_screenshot = Image.frombytes('RGB', screenshot.size, screenshot.rgb)
-        
-        self.img = self.full_screenshot.copy()
-        self.draw = ImageDraw.Draw(self.img)
+        monitor = {"top": y1, "left": x1, "width": img_width, "height": img_height}
+        self.full_screenshot = capture_service.grab(monitor)
         
         # Calculate scale
         toolbar_height = 60
@@ -1611,10 +1589,14 @@ class PredefinedEditor(FullscreenEditor):
                                 highlightthickness=0, bg='#2b2b2b', cursor="arrow")
         self.canvas.pack()
         
-        self.display_img = self.img.resize((display_width, display_height), Image.Resampling.LANCZOS)
-        self.photo = ImageTk.PhotoImage(self.display_img)
+        self.display = ScaledDisplay(self.full_screenshot, (display_width, display_height))
+        self.photo = self.display.photo
         self.canvas.create_image(self.offset_x, self.offset_y, anchor=tk.NW,
                                 image=self.photo, tags="screenshot")
+        self.annotations = AnnotationDocument(
+            CanvasRenderer(self.canvas, self.full_screenshot, self.scale, (self.offset_x, self.offset_y)),
+            memory_budget=self.undo_memory_mb << 20,
+        )
         
         self.canvas.create_rectangle(
             self.offset_x - 2, self.offset_y - 2,
@@ -1628,6 +1610,8 @@ class PredefinedEditor(FullscreenEditor):
         self.root.bind('<Escape>', self.on_escape)
         self.root.bind('<Return>', self.on_enter)
         self.root.bind('<Key>', self.on_key_press)
+        self.root.bind('<Control-z>', lambda e: self.undo())
+        self.root.bind('<Control-y>', lambda e: self.redo())
         
         self.show_toolbar()
         
@@ -1638,41 +1622,35 @@ class PredefinedEditor(FullscreenEditor):
         return None
     
     def add_metadata(self):
-        meta = PngImagePlugin.PngInfo()
-        meta.add_text("viewclipper_version", "1.0")
-        meta.add_text("viewclipper_mode", "predefined")
-        meta.add_text("viewclipper_captured_at", datetime.now().isoformat())
-        return meta
+        return {
+            "viewclipper_version": "1.0",
+            "viewclipper_mode": "predefined",
+            "viewclipper_captured_at": datetime.now().isoformat(),
+        }
 
 
 def capture_fullscreen():
     """Capture entire screen using physical dimensions"""
     screen_width, screen_height = get_screen_size()
     
-    with mss() as sct:
-        monitor = {
-            "top": 0,
-            "left": 0,
-            "width": screen_width,
-            "height": screen_height
-        }
-        screenshot = sct.grab(monitor)
-        img = Image.frombytes('RGB', screenshot.size, screenshot.rgb)
-        return img
+    monitor = {
+        "top": 0,
+        "left": 0,
+        "width": screen_width,
+        "height": screen_height
+    }
+    return capture_service.grab(monitor)
 
 
 def capture_region(region):
     """Capture specific region (x, y, width, height) in actual pixels"""
-    with mss() as sct:
-        monitor = {
-            "top": region[1], 
-            "left": region[0], 
-            "width": region[2], 
-            "height": region[3]
-        }
-        screenshot = sct.grab(monitor)
-        img = Image.frombytes('RGB', screenshot.size, screenshot.rgb)
-        return img
+    monitor = {
+        "top": region[1], 
+        "left": region[0], 
+        "width": region[2], 
+        "height": region[3]
+    }
+    return capture_service.grab(monitor)
 
 
 def capture_predefined(top_offset, bottom_offset, left_offset=0, right_offset=0):
@@ -1691,26 +1669,77 @@ def capture_predefined(top_offset, bottom_offset, left_offset=0, right_offset=0)
 
 
 def copy_to_clipboard(img):
-    """Copy PIL Image to Windows clipboard"""
+    """
+    Copy PIL Image to Windows clipboard as a DIB. Returns the clipboard
+    sequence number after the copy, for add_png_to_clipboard().
+    """
+    if img.mode != 'RGB':
+        img = img.convert('RGB')
+    # Pillow's DIB writer leaves out the BMP file header, so the buffer is
+    # handed to the clipboard as it is, without slicing a copy
     output = io.BytesIO()
-    img.convert('RGB').save(output, 'BMP')
-    data = output.getvalue()[14:]
-    output.close()
+    img.save(output, 'DIB')
     
     win32clipboard.OpenClipboard()
     try:
         win32clipboard.EmptyClipboard()
-        win32clipboard.SetClipboardData(win32clipboard.CF_DIB, data)
+        win32clipboard.SetClipboardData(win32clipboard.CF_DIB, output.getbuffer())
     finally:
         win32clipboard.CloseClipboard()
+    return win32clipboard.GetClipboardSequenceNumber()
 
 
-def save_screenshot(img, metadata=None):
-    """Save image with unique filename and optional metadata"""
+def add_png_to_clipboard(png_data, sequence):
+    """
+    Add the "PNG" clipboard format (browsers, chat apps and image editors
+    prefer it) to a copy made by copy_to_clipboard(), unless something else
+    has been copied since. The DIB goes first so pasting works while the
+    PNG is still being encoded.
+    """
+    win32clipboard.OpenClipboard()
+    try:
+        if win32clipboard.GetClipboardSequenceNumber() == sequence:
+            win32clipboard.SetClipboardData(win32clipboard.RegisterClipboardFormat("PNG"), png_data)
+    finally:
+        win32clipboard.CloseClipboard()
+
+
+def encode_screenshot(img, metadata=None, profile=None, palette=DEFAULT_PALETTE_MODE,
+                      output_format=DEFAULT_OUTPUT_FORMAT, quality=DEFAULT_LOSSY_QUALITY, parallel=False):
+    """
+    Encode a screenshot once, in memory, in an output format from
+    encoders.py (PNG with the given profile and palette mode by default;
+    parallel uses the multi-threaded PNG writer for very large captures).
+    The same bytes then go to the file, the clipboard and the upload.
+    """
+    output = io.BytesIO()
+    write_image(img, output, output_format, metadata, profile, palette, quality, parallel)
+    return output.getvalue()
+
+
+def write_screenshot(data, filepath=None, output_format=DEFAULT_OUTPUT_FORMAT):
+    """
+    Write an encoded screenshot to filepath, or a unique name in the save
+    folder. The bytes go to a temporary file next to the target that is
+    renamed into place, so a partly written file never has the final name.
+    """
     Config.ensure_folder()
-    filepath = os.path.join(Config.SAVE_FOLDER, Config.get_filename())
-    if metadata:
-        img.save(filepath, pnginfo=metadata)
-    else:
-        img.save(filepath)
-    return filepath
\ No newline at end of file
+    if filepath is None:
+        filepath = os.path.join(Config.SAVE_FOLDER, Config.get_filename(output_format))
+    temp_path = filepath + '.part'
+    try:
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, filepath)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return filepath
+
+
+def save_screenshot(img, metadata=None, filepath=None, profile=None, palette=DEFAULT_PALETTE_MODE,
+                    output_format=DEFAULT_OUTPUT_FORMAT, quality=DEFAULT_LOSSY_QUALITY, parallel=False):
+    """Encode and save image with unique filename (unless one is given) and optional metadata"""
+    data = encode_screenshot(img, metadata, profile, palette, output_format, quality, parallel)
+    return write_screenshot(data, filepath, output_format)
\ No newline at end of file
@@ -0,0 +1,148 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from mss import mss
+from PIL import Image
+from screen_geometry import bounding_box, display_info
+
+
+log = logging.getLogger(__name__)
+
+
+def frame_to_image(screenshot):
+    """
+    Decode a raw mss BGRA frame straight into an RGB PIL image.
+    Uses PIL's "BGRX" raw decoder, so no intermediate RGB bytes are built.
+    """
+    return Image.frombytes('RGB', screenshot.size, screenshot.raw, 'raw', 'BGRX')
+
+
+class CaptureService:
+    """
+    Long-lived screen grabber shared by every capture mode.
+
+    mss keeps its device contexts and bitmap buffers per instance (and on
+    older releases per thread), so each grabbing thread gets one instance that
+    is reused across captures. Instances are rebuilt only after display_info
+    reports a display configuration change.
+    
+    Grab durations are logged at debug level and kept per thread in
+    last_grab_ms, so the pre-capture thread doesn't overwrite a capture's.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._instances = []
+        self._generation = 0
+        self._pool = None
+    
+    @property
+    def last_grab_ms(self):
+        """Duration of the calling thread's last grab, in milliseconds"""
+        return getattr(self._local, 'last_grab_ms', 0.0)
+
+    def _get_grabber(self):
+        """Return this thread's mss instance, creating it on first use"""
+        generation = (display_info.generation, self._generation)
+
+        sct = getattr(self._local, 'sct', None)
+        if sct is not None and self._local.generation != generation:
+            self._release(sct)
+            sct = None
+
+        if sct is None:
+            sct = mss()
+            self._local.sct = sct
+            self._local.generation = generation
+            with self._lock:
+                self._instances.append(sct)
+        return sct
+
+    def _release(self, sct):
+        """Close a grabber and forget about it"""
+        with self._lock:
+            if sct in self._instances:
+                self._instances.remove(sct)
+        try:
+            sct.close()
+        except:
+            pass
+        if getattr(self._local, 'sct', None) is sct:
+            self._local.sct = None
+
+    def warm_up(self):
+        """Create the calling thread's grabber ahead of the first hotkey"""
+        self._get_grabber()
+
+    def invalidate(self):
+        """Force every thread to rebuild its grabber on the next capture"""
+        with self._lock:
+            self._generation += 1
+
+    def _grab_image(self, monitor):
+        return frame_to_image(self._get_grabber().grab(monitor))
+
+    def grab(self, monitor, quiet=False):
+        """
+        Grab a screen rectangle and return it as an RGB PIL image.
+        monitor: dict with top, left, width, height (same as mss)
+        """
+        start = time.perf_counter()
+        img = self._grab_image(monitor)
+        self._local.last_grab_ms = (time.perf_counter() - start) * 1000
+
+        if not quiet:
+            log.debug("Grabbed %dx%d in %.1f ms", img.width, img.height, self._local.last_grab_ms)
+        return img
+
+    def grab_monitors(self, monitors, quiet=False):
+        """
+        Grab several monitors concurrently and stitch them into one image
+        covering their bounding box. Gaps between monitors stay black.
+        monitors: screen_geometry.Monitor list
+        """
+        if len(monitors) == 1:
+            return self.grab(monitors[0].as_mss(), quiet)
+
+        start = time.perf_counter()
+        left, top, right, bottom = bounding_box(monitors)
+
+        # Pool threads are long-lived, so each keeps its own grabber
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='grab')
+            pool = self._pool
+        parts = list(pool.map(lambda m: self._grab_image(m.as_mss()), monitors))
+
+        img = Image.new('RGB', (right - left, bottom - top))
+        for monitor, part in zip(monitors, parts):
+            img.paste(part, (monitor.left - left, monitor.top - top))
+        self._local.last_grab_ms = (time.perf_counter() - start) * 1000
+
+        if not quiet:
+            log.debug("Grabbed %d monitors (%dx%d) in %.1f ms",
+                      len(monitors), img.width, img.height, self._local.last_grab_ms)
+        return img
+
+    def close(self):
+        """Release all grabbers (call once on application exit)"""
+        with self._lock:
+            instances = self._instances
+            self._instances = []
+            self._generation += 1
+            pool = self._pool
+            self._pool = None
+        if pool:
+            pool.shutdown(wait=True)
+        for sct in instances:
+            try:
+                sct.close()
+            except:
+                pass
+        self._local = threading.local()
+
+
+# Global capture service instance
+capture_service = CaptureService()
@@ -1,14 +1,16 @@
 from PIL import Image
+from encoders import read_metadata
 import sys
 
-filepath = sys.argv[1] if len(sys.argv) > 1 else input("Enter PNG path: ")
+filepath = sys.argv[1] if len(sys.argv) > 1 else input("Enter screenshot path: ")
 
 img = Image.open(filepath)
 print("\n📋 ViewClipper Metadata:")
 print("-" * 40)
 
-if hasattr(img, 'text'):
-    for key, value in img.text.items():
+metadata = read_metadata(img)
+if metadata:
+    for key, value in metadata.items():
         print(f"  {key}: {value}")
 else:
-    print("  No metadata found")
\ No newline at end of file
+    print("  No metadata found")
@@ -1,6 +1,7 @@
 import os
 from datetime import datetime
 from settings import settings_manager
+from encoders import output_format, DEFAULT_OUTPUT_FORMAT
 
 
 class Config:
@@ -9,9 +10,9 @@ class Config:
     
     # Filename pattern
     @staticmethod
-    def get_filename():
+    def get_filename(format_name=DEFAULT_OUTPUT_FORMAT):
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S%f")[:-3]
-        return f"screenshot_{timestamp}.png"
+        return f"screenshot_{timestamp}{output_format(format_name).extension}"
     
     # Ensure save folder exists
     @staticmethod
@@ -0,0 +1,62 @@
+import math
+from PIL import Image, ImageTk
+
+
+def pad_box(box, pad):
+    x1, y1, x2, y2 = box
+    return (x1 - pad, y1 - pad, x2 + pad, y2 + pad)
+
+
+def clamp_box(box, size):
+    """Clip a box to an image of the given size (may become empty)"""
+    x1, y1, x2, y2 = box
+    return (max(0, int(x1)), max(0, int(y1)),
+            min(size[0], int(math.ceil(x2))), min(size[1], int(math.ceil(y2))))
+
+
+def intersect_box(a, b):
+    return (max(a[0], b[0]), max(a[1], b[1]), min(a[2], b[2]), min(a[3], b[3]))
+
+
+def box_is_empty(box):
+    return box[2] <= box[0] or box[3] <= box[1]
+
+
+def points_box(points, pad=0):
+    """Bounding box of (x, y) points, grown by pad"""
+    xs = [p[0] for p in points]
+    ys = [p[1] for p in points]
+    return (min(xs) - pad, min(ys) - pad, max(xs) + pad + 1, max(ys) + pad + 1)
+
+
+class ScaledDisplay:
+    """
+    Downscaled view of a large image, kept in a reused PhotoImage.
+
+    The screenshot itself never changes while editing (annotations are
+    canvas items on top), so the view is only resampled when the editor
+    shows a new capture or a different pre-capture frame.
+    """
+
+    def __init__(self, img, size, resample=Image.Resampling.LANCZOS):
+        self.size = tuple(size)
+        self.resample = resample
+        self.image = None
+        self.photo = None
+        self.rebuild(img)
+
+    @property
+    def scaled(self):
+        return self.size != self.source_size
+
+    def rebuild(self, img):
+        """Resample the whole image (new capture or a different frame)"""
+        self.source_size = img.size
+        if self.scaled:
+            self.image = img.resize(self.size, self.resample)
+        else:
+            self.image = img
+        if self.photo is None:
+            self.photo = ImageTk.PhotoImage(self.image)
+        else:
+            self.photo.paste(self.image)
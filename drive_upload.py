@@ -1,10 +1,12 @@
+import io
 import os.path
 import win32clipboard
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload
+from googleapiclient.http import MediaFileUpload, MediaIoBaseUpload
+from encoders import OUTPUT_FORMATS
 
 # If modifying these scopes, delete the file token.json.
 SCOPES = ['https://www.googleapis.com/auth/drive.file']
@@ -66,8 +68,20 @@ def get_or_create_folder(service):
         print(f"⚠️ Error finding folder: {e}")
         return None
 
-def upload_to_drive(filepath):
-    """Uploads file to specific folder and returns link"""
+def mimetype_for(filepath):
+    """MIME type of a saved screenshot, from its extension"""
+    extension = os.path.splitext(filepath)[1].lower()
+    for fmt in OUTPUT_FORMATS.values():
+        if fmt.extension == extension:
+            return fmt.mimetype
+    return 'image/png'
+
+def upload_to_drive(filepath, data=None):
+    """
+    Uploads file to specific folder and returns link. When the encoded
+    bytes are given they are uploaded from memory instead of reading the
+    file back.
+    """
     try:
         service = get_drive_service()
         if not service:
@@ -85,7 +99,10 @@ def upload_to_drive(filepath):
         if folder_id:
             file_metadata['parents'] = [folder_id]
 
-        media = MediaFileUpload(filepath, mimetype='image/png')
+        if data is not None:
+            media = MediaIoBaseUpload(io.BytesIO(data), mimetype=mimetype_for(filepath))
+        else:
+            media = MediaFileUpload(filepath, mimetype=mimetype_for(filepath))
         
         # Upload the file
         file = service.files().create(
@@ -1,10 +1,15 @@
 import tkinter as tk
 from tkinter import colorchooser, ttk
-from PIL import Image, ImageDraw, ImageTk, ImageFont, ImageFilter, PngImagePlugin
+from PIL import Image, ImageTk
 import os
-import math
 import sys
 from datetime import datetime
+from screen_geometry import display_info
+from display import ScaledDisplay
+from redaction import RedactionPreview
+from settings import settings_manager
+from annotations import (AnnotationDocument, CanvasRenderer, Arrow, Line, Rect, Circle,
+                         Text, Highlight, Blur, Stamp, Badge, simplify_path)
 
 
 def get_resource_path(filename):
@@ -52,16 +57,20 @@ class ToolTip:
 
 
 class ImageEditor:
-    def __init__(self, img):
+    def __init__(self, img, redaction_mode='pixelate', redaction_strength=10, undo_memory_mb=128):
         self.original_img = img.copy()
         self.img = img.copy()
-        self.draw = ImageDraw.Draw(self.img)
         self.result = None
         self.save_action = None  # Will be 'local' or 'cloud'
         
-        # Undo system
-        self.history = [self.img.copy()]
-        self.max_history = 20
+        # Placed elements as records, drawn as canvas items and rasterized on save
+        self.annotations = None
+        self.undo_memory_mb = undo_memory_mb
+        
+        # Blur tool: redaction.py mode and cell size / radius
+        self.redaction_mode = redaction_mode
+        self.redaction_strength = redaction_strength
+        self.redaction_preview = None
         
         # Drawing state
         self.tool = None
@@ -87,6 +96,7 @@ class ImageEditor:
         # Highlighter state
         self.highlighter_points = []
         self.highlighter_opacity = 100
+        self.stroke_item = None  # live highlighter polyline
         
         # Mode system
         self.current_mode = "general"  # general, howto, qa
@@ -94,6 +104,9 @@ class ImageEditor:
         # Step counter for How-To mode
         self.step_counter = 1
         
+        # (display generation, Tk pixels per point)
+        self._dpi_cache = None
+        
         # Setup window
         self.root = tk.Tk()
         self.root.title("QA Team - ViewClipper")
@@ -116,6 +129,7 @@ class ImageEditor:
         self.root.bind('<Return>', lambda e: self.handle_return())
         self.root.protocol("WM_DELETE_WINDOW", self.cancel)
         self.root.bind('<Control-z>', lambda e: self.undo())
+        self.root.bind('<Control-y>', lambda e: self.redo())
     
     def set_window_icon(self):
         """Set the window icon"""
@@ -258,6 +272,16 @@ class ImageEditor:
         undo_btn.pack(side=tk.LEFT, padx=4)
         ToolTip(undo_btn, 'Undo (Ctrl+Z)')
         
+        # Redo
+        redo_btn = tk.Button(
+            toolbar, text='↷',
+            command=self.redo,
+            bg='#4a4a4a', fg='white', width=3,
+            font=('Arial', 11), relief=tk.RAISED, cursor='hand2'
+        )
+        redo_btn.pack(side=tk.LEFT, padx=4)
+        ToolTip(redo_btn, 'Redo (Ctrl+Y)')
+        
         # --- NEW SAVE BUTTONS ---
         
         # Spacer
@@ -372,19 +396,23 @@ class ImageEditor:
             self.scale = min(max_width / img_width, max_height / img_height)
             new_width = int(img_width * self.scale)
             new_height = int(img_height * self.scale)
-            self.display_img = self.img.resize((new_width, new_height), Image.Resampling.LANCZOS)
         else:
-            self.display_img = self.img.copy()
+            new_width, new_height = img_width, img_height
             self.scale = 1.0
-            
-        self.photo = ImageTk.PhotoImage(self.display_img)
+        
+        # Scaled view of the screenshot; annotations are drawn over it as canvas items
+        self.display = ScaledDisplay(self.img, (new_width, new_height))
+        self.display_img = self.display.image
+        self.photo = self.display.photo
         
         self.canvas = tk.Canvas(
             self.root, width=self.display_img.width, height=self.display_img.height,
             bg='#2b2b2b', highlightthickness=0
         )
         self.canvas.pack(padx=10, pady=10)
-        self.canvas.create_image(0, 0, anchor=tk.NW, image=self.photo)
+        self.canvas.create_image(0, 0, anchor=tk.NW, image=self.photo, tags="screenshot")
+        self.annotations = AnnotationDocument(CanvasRenderer(self.canvas, self.img, self.scale),
+                                              memory_budget=self.undo_memory_mb << 20)
         self.canvas.focus_set()
         
         toolbar_height = 50
@@ -457,10 +485,15 @@ class ImageEditor:
         return 16 + self.weight * 2
     
     def get_dpi_scale(self):
-        try:
-            return self.root.winfo_fpixels('1i') / 72.0
-        except:
-            return 1.0
+        """Tk pixels per point, cached until the display configuration changes"""
+        generation = display_info.generation
+        if self._dpi_cache is None or self._dpi_cache[0] != generation:
+            try:
+                scale = self.root.winfo_fpixels('1i') / 72.0
+            except:
+                scale = 1.0
+            self._dpi_cache = (generation, scale)
+        return self._dpi_cache[1]
     
     def get_canvas_font_size(self):
         dpi_scale = self.get_dpi_scale()
@@ -469,11 +502,6 @@ class ImageEditor:
     def get_pil_font_size(self):
         return self.get_base_font_size()
         
-    def save_to_history(self):
-        self.history.append(self.img.copy())
-        if len(self.history) > self.max_history:
-            self.history.pop(0)
-            
     def undo(self):
         if self.preview_mode:
             self.cancel_preview()
@@ -482,20 +510,34 @@ class ImageEditor:
             self.cancel_preview()
             return
             
-        if len(self.history) > 1:
-            self.history.pop()
-            self.img = self.history[-1].copy()
-            self.draw = ImageDraw.Draw(self.img)
-            self.refresh_canvas()
+        if self.annotations.undo() is not None:
             self.status_label.config(text='Undone')
         else:
             self.status_label.config(text='Nothing to undo')
     
+    def redo(self):
+        if self.preview_mode or self.text_mode:
+            return
+        
+        if self.annotations.redo() is not None:
+            self.status_label.config(text='Redone')
+        else:
+            self.status_label.config(text='Nothing to redo')
+    
+    def stroke_coords(self, points):
+        """Flat canvas coordinates for a path in image coordinates"""
+        return [c * self.scale for point in points for c in point]
+    
     def cleanup_temp_items(self):
         for item in self.temp_items:
             self.canvas.delete(item)
         self.temp_items.clear()
     
+    def hide_redaction_preview(self):
+        if self.redaction_preview is not None:
+            self.redaction_preview.hide()
+            self.redaction_preview = None
+    
     def cleanup_preview_items(self):
         for item in self.preview_items:
             self.canvas.delete(item)
@@ -526,6 +568,9 @@ class ImageEditor:
             self.start_text_mode(self.start_x, self.start_y)
         elif self.tool == 'highlight':
             self.highlighter_points = [(self.start_x, self.start_y)]
+            self.stroke_item = None
+        elif self.tool == 'blur':
+            self.redaction_preview = RedactionPreview(self.canvas, self.display.image, self.scale)
         elif self.tool in ['step', 'pointer', 'magnifier', 'tip', 'warning', 
                            'bug', 'fail', 'pass', 'question', 'critical', 'high', 'med', 'low']:
             # Stamp tools - place on click
@@ -562,14 +607,8 @@ class ImageEditor:
                 'color': self.color  # Store selected color
             }
             
-            # Draw on canvas with selected color
-            item = self.canvas.create_text(
-                x * self.scale, y * self.scale,
-                text=stamp_text,
-                font=('Arial', int(48 * self.scale)),
-                fill=self.rgb_to_hex(self.color),
-                anchor=tk.CENTER
-            )
+            # Preview with the same sprite that is pasted on save
+            item = self.annotations.renderer.draw_sprite(Stamp(x, y, stamp_text, self.color, 48))
             self.preview_items.append(item)
             
             if self.tool == 'step':
@@ -587,30 +626,9 @@ class ImageEditor:
                 'y': y
             }
             
-            # Draw badge on canvas
-            pad = 4
-            font_size = int(14 * self.scale)
-            
-            # Create text first to get size
-            text_item = self.canvas.create_text(
-                x * self.scale, y * self.scale,
-                text=text,
-                font=('Arial', font_size, 'bold'),
-                fill=fg_color,
-                anchor=tk.CENTER
-            )
-            bbox = self.canvas.bbox(text_item)
-            
-            # Create background
-            bg_item = self.canvas.create_rectangle(
-                bbox[0] - pad, bbox[1] - pad,
-                bbox[2] + pad, bbox[3] + pad,
-                fill=bg_color, outline=''
-            )
-            self.canvas.tag_raise(text_item)
-            
-            self.preview_items.append(bg_item)
-            self.preview_items.append(text_item)
+            # Preview with the same sprite that is pasted on save
+            item = self.annotations.renderer.draw_sprite(Badge(x, y, text, bg_color, fg_color, 14))
+            self.preview_items.append(item)
         
         self.add_preview_border()
         self.preview_mode = True
@@ -638,6 +656,10 @@ class ImageEditor:
             
             for item in self.preview_items:
                 self.canvas.move(item, dx, dy)
+            if self.preview_data and self.preview_data['type'] == 'blur':
+                # Show what the region hides at its new position
+                self.redaction_preview.show(self.canvas.coords(self.preview_items[0]),
+                                            self.redaction_mode, self.redaction_strength)
             
             self.drag_start_x = event.x
             self.drag_start_y = event.y
@@ -652,39 +674,24 @@ class ImageEditor:
             return
         
         if self.tool == 'highlight':
-            px = int(event.x / self.scale)
-            py = int(event.y / self.scale)
-            self.highlighter_points.append((px, py))
-            
-            if len(self.highlighter_points) >= 2:
-                p1 = self.highlighter_points[-2]
-                p2 = self.highlighter_points[-1]
-                
-                color = self.rgb_to_hex(self.color)
-                width = max(8, int(self.weight * 3 * self.scale))
-                
-                item = self.canvas.create_line(
-                    p1[0] * self.scale, p1[1] * self.scale,
-                    p2[0] * self.scale, p2[1] * self.scale,
-                    fill=color, width=width, capstyle=tk.ROUND, joinstyle=tk.ROUND,
-                    stipple='gray50'
-                )
+            item = self.annotations.renderer.extend_stroke(
+                self.stroke_item, self.highlighter_points,
+                int(event.x / self.scale), int(event.y / self.scale),
+                self.rgb_to_hex(self.color), max(8, int(self.weight * 3 * self.scale))
+            )
+            if item is not self.stroke_item:
+                self.stroke_item = item
                 self.temp_items.append(item)
             return
         
         if self.tool == 'blur':
-            # Show blur preview rectangle
+            # Show the redaction itself under a dashed outline
             self.cleanup_temp_items()
             
             sx, sy = self.start_x * self.scale, self.start_y * self.scale
             ex, ey = event.x, event.y
-            
-            # Draw dashed rectangle to show blur area
-            item = self.canvas.create_rectangle(
-                sx, sy, ex, ey,
-                outline='#ff6600', width=2, dash=(4, 4)
-            )
-            self.temp_items.append(item)
+            self.redaction_preview.show((sx, sy, ex, ey), self.redaction_mode, self.redaction_strength,
+                                        outline=True)
             
             # Add "BLUR" text in center
             cx, cy = (sx + ex) / 2, (sy + ey) / 2
@@ -737,10 +744,13 @@ class ImageEditor:
             return
         
         if self.tool == 'highlight':
-            if len(self.highlighter_points) >= 2:
+            if len(self.highlighter_points) >= 2 and self.stroke_item is not None:
+                # Preview, move and commit the simplified path
+                points = simplify_path(self.highlighter_points)
+                self.canvas.coords(self.stroke_item, *self.stroke_coords(points))
                 self.preview_data = {
                     'type': 'highlight',
-                    'points': self.highlighter_points.copy(),
+                    'points': points,
                     'color': self.color,
                     'weight': self.weight,
                     'opacity': self.highlighter_opacity
@@ -775,14 +785,16 @@ class ImageEditor:
                     'x2': x2, 'y2': y2
                 }
                 
-                # Show pixelated preview on canvas
+                # Keep the redaction preview, outlined, until it is placed
                 self.cleanup_temp_items()
+                self.redaction_preview.show((x1 * self.scale, y1 * self.scale,
+                                             x2 * self.scale, y2 * self.scale),
+                                            self.redaction_mode, self.redaction_strength)
                 
-                # Create pixelated preview
                 preview_rect = self.canvas.create_rectangle(
                     x1 * self.scale, y1 * self.scale,
                     x2 * self.scale, y2 * self.scale,
-                    fill='#888888', stipple='gray50', outline='#ff6600', width=2
+                    outline='#ff6600', width=2
                 )
                 self.preview_items.append(preview_rect)
                 
@@ -791,6 +803,7 @@ class ImageEditor:
                 self.status_label.config(text='Drag to move, click outside to place')
             else:
                 self.cleanup_temp_items()
+                self.redaction_preview.hide()
             
             self.start_x = None
             self.start_y = None
@@ -915,111 +928,12 @@ class ImageEditor:
         self.text_mode = False
         self.status_label.config(text='Drag to move, click outside to place')
 
-    def draw_highlighter(self, points, color, weight, opacity):
-        if len(points) < 2:
-            return
-        
-        overlay = Image.new('RGBA', self.img.size, (0, 0, 0, 0))
-        overlay_draw = ImageDraw.Draw(overlay)
-        
-        line_width = max(8, weight * 3)
-        rgba_color = (color[0], color[1], color[2], opacity)
-        
-        for i in range(len(points) - 1):
-            x1, y1 = int(points[i][0]), int(points[i][1])
-            x2, y2 = int(points[i + 1][0]), int(points[i + 1][1])
-            overlay_draw.line([(x1, y1), (x2, y2)], fill=rgba_color, width=line_width)
-            r = line_width // 2
-            overlay_draw.ellipse([x1 - r, y1 - r, x1 + r, y1 + r], fill=rgba_color)
-        
-        if points:
-            x, y = int(points[-1][0]), int(points[-1][1])
-            r = line_width // 2
-            overlay_draw.ellipse([x - r, y - r, x + r, y + r], fill=rgba_color)
-        
-        if self.img.mode != 'RGBA':
-            self.img = self.img.convert('RGBA')
-        
-        self.img = Image.alpha_composite(self.img, overlay)
-        self.img = self.img.convert('RGB')
-        self.draw = ImageDraw.Draw(self.img)
-
-    def apply_blur(self, x1, y1, x2, y2):
-        """Apply pixelation blur to region"""
-        # Clamp to image bounds
-        x1 = max(0, min(x1, self.img.width - 1))
-        y1 = max(0, min(y1, self.img.height - 1))
-        x2 = max(0, min(x2, self.img.width))
-        y2 = max(0, min(y2, self.img.height))
-        
-        if x2 <= x1 or y2 <= y1:
-            return
-        
-        # Extract region
-        region = self.img.crop((x1, y1, x2, y2))
-        
-        # Pixelate by downscaling then upscaling
-        pixel_size = 10
-        small_w = max(1, (x2 - x1) // pixel_size)
-        small_h = max(1, (y2 - y1) // pixel_size)
-        
-        small = region.resize((small_w, small_h), Image.Resampling.NEAREST)
-        pixelated = small.resize((x2 - x1, y2 - y1), Image.Resampling.NEAREST)
-        
-        # Paste back
-        self.img.paste(pixelated, (x1, y1))
-        self.draw = ImageDraw.Draw(self.img)
-
-    def draw_stamp(self, stamp_text, x, y, color=None):
-        """Draw stamp emoji/text on image"""
-        if color is None:
-            color = self.color  # Use selected color
-        
-        try:
-            # Try to use a font that supports emojis
-            font_obj = ImageFont.truetype("seguiemj.ttf", 48)
-        except:
-            try:
-                font_obj = ImageFont.truetype("arial.ttf", 48)
-            except:
-                font_obj = ImageFont.load_default()
-        
-        # Get text size for centering
-        bbox = self.draw.textbbox((0, 0), stamp_text, font=font_obj)
-        text_w = bbox[2] - bbox[0]
-        text_h = bbox[3] - bbox[1]
-        
-        # Draw with selected color
-        self.draw.text((x - text_w // 2, y - text_h // 2), stamp_text, fill=color, font=font_obj)
-
-    def draw_badge(self, text, x, y, bg_color, fg_color):
-        """Draw severity badge on image"""
-        try:
-            font_obj = ImageFont.truetype("arial.ttf", 14)
-        except:
-            font_obj = ImageFont.load_default()
-        
-        # Get text size
-        bbox = self.draw.textbbox((0, 0), text, font=font_obj)
-        text_w = bbox[2] - bbox[0]
-        text_h = bbox[3] - bbox[1]
-        
-        pad = 4
-        # Draw background
-        self.draw.rectangle(
-            [x - text_w // 2 - pad, y - text_h // 2 - pad,
-             x + text_w // 2 + pad, y + text_h // 2 + pad],
-            fill=bg_color
-        )
-        
-        # Draw text
-        self.draw.text((x - text_w // 2, y - text_h // 2), text, fill=fg_color, font=font_obj)
-
     def commit_preview(self):
         if not self.preview_mode or not self.preview_data:
             return
         
         data = self.preview_data
+        record = None
         
         main_item = self.preview_items[0] if self.preview_items else None
         if not main_item:
@@ -1034,12 +948,7 @@ class ImageEditor:
             else:
                 x, y = 0, 0
             
-            try:
-                font_obj = ImageFont.truetype("arial.ttf", data['font_size'])
-            except:
-                font_obj = ImageFont.load_default()
-            
-            self.draw.text((x, y), data['text'], fill=data['color'], font=font_obj)
+            record = Text(x, y, data['text'], data['color'], data['font_size'])
             
         elif data['type'] == 'highlight':
             preview_items_no_border = self.preview_items[:-1] if len(self.preview_items) > 1 else self.preview_items
@@ -1064,7 +973,7 @@ class ImageEditor:
             else:
                 adjusted_points = data['points']
             
-            self.draw_highlighter(adjusted_points, data['color'], data['weight'], data['opacity'])
+            record = Highlight(adjusted_points, data['color'], max(8, data['weight'] * 3), data['opacity'])
             
         elif data['type'] == 'blur':
             # Get current position from preview item
@@ -1074,28 +983,24 @@ class ImageEditor:
                 y1 = int(bbox[1] / self.scale)
                 x2 = int(bbox[2] / self.scale)
                 y2 = int(bbox[3] / self.scale)
-                self.apply_blur(x1, y1, x2, y2)
+                record = Blur(x1, y1, x2, y2, self.redaction_strength, self.redaction_mode)
                 
-        elif data['type'] == 'stamp':
-            coords = self.canvas.coords(main_item)
-            if coords:
-                x = int(coords[0] / self.scale)
-                y = int(coords[1] / self.scale)
+        elif data['type'] in ('stamp', 'badge'):
+            if data['type'] == 'stamp':
                 stamp_color = data.get('color', self.color)
-                self.draw_stamp(data['stamp'], x, y, stamp_color)
-                
-        elif data['type'] == 'badge':
-            # Find center from text item (second item, after bg)
-            if len(self.preview_items) >= 2:
-                text_item = self.preview_items[1]
-                coords = self.canvas.coords(text_item)
+                record = Stamp(data['x'], data['y'], data['stamp'], stamp_color, 48)
             else:
-                coords = self.canvas.coords(main_item)
+                record = Badge(data['x'], data['y'], data['text'], data['bg_color'], data['fg_color'], 14)
             
+            # The sprite item sits at the centre plus the sprite's offset
+            coords = self.canvas.coords(main_item)
             if coords:
-                x = int(coords[0] / self.scale)
-                y = int(coords[1] / self.scale)
-                self.draw_badge(data['text'], x, y, data['bg_color'], data['fg_color'])
+                dx, dy = self.annotations.renderer.sprite_offset(record)
+                x = round((coords[0] - dx) / self.scale)
+                y = round((coords[1] - dy) / self.scale)
+                record = record._replace(x=x, y=y)
+            else:
+                record = None
             
         else:
             item_coords = self.canvas.coords(main_item)
@@ -1119,31 +1024,32 @@ class ImageEditor:
             weight = data['weight']
             
             if data['type'] == 'arrow':
-                self.draw_arrow(x1, y1, x2, y2, color, weight)
+                record = Arrow(x1, y1, x2, y2, color, weight)
             elif data['type'] == 'hline':
-                self.draw.line([x1, y1, x2, y1], fill=color, width=weight)
+                record = Line(x1, y1, x2, y1, color, weight)
             elif data['type'] == 'vline':
-                self.draw.line([x1, y1, x1, y2], fill=color, width=weight)
+                record = Line(x1, y1, x1, y2, color, weight)
             elif data['type'] == 'rect':
-                self.draw.rectangle([x1, y1, x2, y2], outline=color, width=weight)
-            elif data['type'] == 'circle':
-                self.draw.ellipse([x1, y1, x2, y2], outline=color, width=weight)
-            elif data['type'] == 'ellipse':
-                self.draw.ellipse([x1, y1, x2, y2], outline=color, width=weight)
+                record = Rect(x1, y1, x2, y2, color, weight)
+            elif data['type'] in ('circle', 'ellipse'):
+                record = Circle(x1, y1, x2, y2, color, weight)
         
-        self.save_to_history()
+        # The preview items are replaced by the record's own canvas items
         self.cleanup_preview_items()
+        self.hide_redaction_preview()
+        if record is not None:
+            self.annotations.add(record)
         self.preview_mode = False
         self.preview_data = None
         self.text_buffer = ""
         self.text_position = None
         self.highlighter_points = []
-        self.refresh_canvas()
         self.status_label.config(text='Element placed')
 
     def cancel_preview(self):
         self.cleanup_preview_items()
         self.cleanup_temp_items()
+        self.hide_redaction_preview()
         self.preview_mode = False
         self.preview_data = None
         self.text_mode = False
@@ -1153,24 +1059,6 @@ class ImageEditor:
         self.dragging = False
         self.status_label.config(text='Cancelled')
         
-    def draw_arrow(self, x1, y1, x2, y2, color, weight):
-        self.draw.line([x1, y1, x2, y2], fill=color, width=weight)
-        
-        angle = math.atan2(y2 - y1, x2 - x1)
-        arrow_length = 15 + weight * 2
-        arrow_width = 6 + weight
-        
-        tip_x, tip_y = x2, y2
-        base_left_x = x2 - arrow_length * math.cos(angle) - arrow_width * math.sin(angle)
-        base_left_y = y2 - arrow_length * math.sin(angle) + arrow_width * math.cos(angle)
-        base_right_x = x2 - arrow_length * math.cos(angle) + arrow_width * math.sin(angle)
-        base_right_y = y2 - arrow_length * math.sin(angle) - arrow_width * math.cos(angle)
-    
-        self.draw.polygon(
-            [(tip_x, tip_y), (base_left_x, base_left_y), (base_right_x, base_right_y)],
-            fill=color, outline=color
-        )
-        
     def handle_return(self):
         if self.text_mode and not self.preview_mode:
             if self.text_buffer:
@@ -1186,26 +1074,13 @@ class ImageEditor:
         else:
             self.cancel()
             
-    def refresh_canvas(self):
-        if self.scale != 1.0:
-            self.display_img = self.img.resize(
-                (int(self.img.width * self.scale), int(self.img.height * self.scale)),
-                Image.Resampling.LANCZOS
-            )
-        else:
-            self.display_img = self.img.copy()
-            
-        self.photo = ImageTk.PhotoImage(self.display_img)
-        self.canvas.delete('all')
-        self.canvas.create_image(0, 0, anchor=tk.NW, image=self.photo)
-    
     def add_metadata(self, img):
-        """Add ViewClipper metadata to image"""
-        meta = PngImagePlugin.PngInfo()
-        meta.add_text("viewclipper_version", "1.0")
-        meta.add_text("viewclipper_mode", self.current_mode)
-        meta.add_text("viewclipper_captured_at", datetime.now().isoformat())
-        return meta
+        """ViewClipper metadata for the saved image"""
+        return {
+            "viewclipper_version": "1.0",
+            "viewclipper_mode": self.current_mode,
+            "viewclipper_captured_at": datetime.now().isoformat(),
+        }
         
     def save(self, action='local'):
         """
@@ -1219,7 +1094,7 @@ class ImageEditor:
         
         self.save_action = action
         self.metadata = self.add_metadata(self.img)
-        self.result = self.img
+        self.result = self.annotations.rasterize(self.img)
         self.root.quit()
         self.root.destroy()
         
@@ -1238,7 +1113,12 @@ def edit_image(img):
     Open editor and return tuple: (image, metadata, action)
     action will be 'local' or 'cloud'
     """
-    editor = ImageEditor(img)
+    editor = ImageEditor(
+        img,
+        redaction_mode=settings_manager.get('redaction_mode', 'pixelate'),
+        redaction_strength=settings_manager.get('redaction_strength', 10),
+        undo_memory_mb=settings_manager.get('undo_memory_mb', 128),
+    )
     result = editor.run()
     
     if result and hasattr(editor, 'metadata'):
@@ -0,0 +1,221 @@
+"""
+Encoder settings for saved screenshots.
+
+PNG profiles trade write time against file size. Each sets the zlib
+level, the zlib strategy and Pillow's optimize flag (level 9 with the
+best of the PNG row filters picked per row). benchmarks/bench_png.py
+measures them on a synthetic screenshot corpus; the default follows from
+those numbers.
+
+Captures with at most 256 colours (flat UI, plain text) are written as
+indexed PNGs, losslessly, with filtered rows (png_writer.py); near-lossless
+mode also palettizes images whose 256-colour version stays within a small
+per-channel error.
+
+Other output formats (WebP, JPEG) are chosen per capture mode. PNG keeps
+ViewClipper metadata in text chunks; the others carry it as JSON in the
+EXIF ImageDescription tag, together with the format name, and
+read_metadata() gets it back from either.
+"""
+import json
+import zlib
+from collections import namedtuple
+import numpy as np
+from PIL import Image, ImageChops, PngImagePlugin
+import png_writer
+import parallel_png
+
+
+PNG_PROFILES = {
+    # ~1.3x faster than balanced; text pages 30% and flat UI 3x larger
+    'fast': {'compress_level': 1, 'compress_type': zlib.Z_DEFAULT_STRATEGY, 'optimize': False},
+    # zlib's default level: within 4% of smallest at 40-75% less time
+    'balanced': {'compress_level': 6, 'compress_type': zlib.Z_DEFAULT_STRATEGY, 'optimize': False},
+    # 1.2-4x slower than balanced for 1-4% smaller files
+    'smallest': {'compress_level': 9, 'compress_type': zlib.Z_DEFAULT_STRATEGY, 'optimize': True},
+}
+PNG_PROFILE_LABELS = {
+    'fast': 'Fast',
+    'balanced': 'Balanced',
+    'smallest': 'Smallest',
+}
+DEFAULT_PNG_PROFILE = 'balanced'
+
+
+PALETTE_MODES = ('off', 'exact', 'near_lossless')
+PALETTE_MODE_LABELS = {
+    'off': 'Off',
+    'exact': 'Lossless',
+    'near_lossless': 'Near-lossless',
+}
+DEFAULT_PALETTE_MODE = 'exact'
+
+# Largest per-channel difference (0-255) near-lossless mode accepts
+NEAR_LOSSLESS_MAX_ERROR = 16
+
+
+OutputFormat = namedtuple('OutputFormat', 'extension pil_format mimetype lossless')
+
+OUTPUT_FORMATS = {
+    'png': OutputFormat('.png', 'PNG', 'image/png', True),
+    # 7% smaller than the default PNG (text 1.4x, flat UI 3x), 1.5x slower
+    'webp_lossless': OutputFormat('.webp', 'WEBP', 'image/webp', True),
+    # WebP's fastest lossless method: 2.8x faster than the default PNG, 7% larger
+    'fast_lossless': OutputFormat('.webp', 'WEBP', 'image/webp', True),
+    'webp': OutputFormat('.webp', 'WEBP', 'image/webp', False),
+    'jpeg': OutputFormat('.jpg', 'JPEG', 'image/jpeg', False),
+}
+OUTPUT_FORMAT_LABELS = {
+    'png': 'PNG',
+    'webp_lossless': 'WebP (lossless)',
+    'fast_lossless': 'Fast lossless (WebP)',
+    'webp': 'WebP (lossy)',
+    'jpeg': 'JPEG',
+}
+DEFAULT_OUTPUT_FORMAT = 'png'
+DEFAULT_LOSSY_QUALITY = 90
+
+# EXIF tag the metadata is stored in outside PNG
+IMAGE_DESCRIPTION = 0x010E
+
+
+def png_options(profile=None):
+    """Keyword arguments for Image.save(..., 'PNG') for a profile name"""
+    return dict(PNG_PROFILES.get(profile, PNG_PROFILES[DEFAULT_PNG_PROFILE]))
+
+
+def zlib_level(options):
+    """zlib level for PNG options, 9 where Pillow's optimize flag is set"""
+    return 9 if options.get('optimize') else options['compress_level']
+
+
+def write_png(img, fp, options):
+    """
+    Write img as a PNG to a binary file object, with png_options() plus an
+    optional pnginfo. Indexed images go through png_writer, which filters
+    their rows; Pillow leaves palette rows unfiltered, and flat UI captures
+    came out twice the size of the RGB PNG.
+    """
+    if img.mode == 'P':
+        png_writer.save(img, fp, zlib_level(options), options['compress_type'], options.get('pnginfo'))
+    else:
+        img.save(fp, 'PNG', **options)
+
+
+def output_format(name):
+    """OutputFormat for a format name, PNG for unknown names"""
+    return OUTPUT_FORMATS.get(name, OUTPUT_FORMATS[DEFAULT_OUTPUT_FORMAT])
+
+
+def format_options(name, profile=None, quality=DEFAULT_LOSSY_QUALITY):
+    """Keyword arguments for Image.save() for an output format name"""
+    if name == 'webp_lossless':
+        # method 2 is within 0.1% of method 4's size at 30% less time
+        return {'lossless': True, 'method': 2, 'quality': 50}
+    if name == 'fast_lossless':
+        return {'lossless': True, 'method': 0, 'quality': 0}
+    if name == 'webp':
+        return {'quality': quality, 'method': 4}
+    if name == 'jpeg':
+        # No chroma subsampling, so coloured text keeps sharp edges
+        return {'quality': quality, 'subsampling': 0}
+    return png_options(profile)
+
+
+def metadata_options(fmt, metadata):
+    """Keyword arguments for Image.save() that embed a metadata dict"""
+    if not metadata:
+        return {}
+    if fmt.pil_format == 'PNG':
+        info = PngImagePlugin.PngInfo()
+        for key, value in metadata.items():
+            info.add_text(key, str(value))
+        return {'pnginfo': info}
+    exif = Image.Exif()
+    exif[IMAGE_DESCRIPTION] = json.dumps(metadata)
+    return {'exif': exif}
+
+
+def read_metadata(img):
+    """Metadata dict from an image opened with Image.open(), empty if none"""
+    if getattr(img, 'text', None):
+        return dict(img.text)
+    description = img.getexif().get(IMAGE_DESCRIPTION)
+    try:
+        metadata = json.loads(description)
+    except (TypeError, ValueError):
+        return {}
+    return metadata if isinstance(metadata, dict) else {}
+
+
+def exact_palette(img, colors):
+    """
+    img as a P image with exactly the given colours, as returned by
+    getcolors(). Pixels are mapped through a 2^24 lookup table rather than
+    convert()/quantize(), whose palette matching is approximate.
+    """
+    rgb = np.asarray(img, dtype=np.uint8)
+    packed = (rgb[..., 0].astype(np.uint32) << 16) | (rgb[..., 1].astype(np.uint32) << 8) | rgb[..., 2]
+    keys = np.array([(r << 16) | (g << 8) | b for _, (r, g, b) in colors], dtype=np.uint32)
+    lookup = np.zeros(1 << 24, dtype=np.uint8)
+    lookup[keys] = np.arange(len(keys), dtype=np.uint8)
+
+    indexed = Image.frombytes('P', img.size, lookup[packed].tobytes())
+    indexed.putpalette([channel for _, color in colors for channel in color])
+    return indexed
+
+
+def near_lossless_palette(img, max_error=NEAR_LOSSLESS_MAX_ERROR):
+    """img reduced to 256 colours, or None if any channel would move by more than max_error"""
+    indexed = img.quantize(256, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE)
+    extrema = ImageChops.difference(indexed.convert('RGB'), img).getextrema()
+    if max(high for _, high in extrema) > max_error:
+        return None
+    return indexed
+
+
+def palettize(img, mode=DEFAULT_PALETTE_MODE):
+    """
+    Indexed version of an RGB image for PNG output when the palette mode
+    allows it, otherwise the image itself.
+    """
+    if mode not in ('exact', 'near_lossless') or img.mode != 'RGB':
+        return img
+    # getcolors() stops counting once it passes the limit, so this is
+    # cheap on photos and other busy images
+    colors = img.getcolors(256)
+    if colors is not None:
+        # Most frequent colours first
+        return exact_palette(img, sorted(colors, reverse=True))
+    if mode == 'near_lossless':
+        indexed = near_lossless_palette(img)
+        if indexed is not None:
+            return indexed
+    return img
+
+
+def write_image(img, fp, name=DEFAULT_OUTPUT_FORMAT, metadata=None, profile=None,
+                palette=DEFAULT_PALETTE_MODE, quality=DEFAULT_LOSSY_QUALITY, parallel=False):
+    """
+    Encode img to a binary file object in the named output format. The
+    format name is added to the metadata so it can be read back later.
+    With parallel set, large PNGs go through parallel_png instead of a
+    single-threaded encoder.
+    """
+    if name not in OUTPUT_FORMATS:
+        name = DEFAULT_OUTPUT_FORMAT
+    fmt = OUTPUT_FORMATS[name]
+    if metadata is not None:
+        metadata = dict(metadata, viewclipper_format=name)
+    options = format_options(name, profile, quality)
+    options.update(metadata_options(fmt, metadata))
+    if fmt.pil_format == 'PNG':
+        img = palettize(img, palette)
+        if parallel and parallel_png.worthwhile(img):
+            parallel_png.save(img, fp, zlib_level(options), options['compress_type'], options.get('pnginfo'))
+        else:
+            write_png(img, fp, options)
+        return
+    if fmt.pil_format == 'JPEG' and img.mode not in ('RGB', 'L'):
+        img = img.convert('RGB')
+    img.save(fp, fmt.pil_format, **options)
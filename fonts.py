@@ -0,0 +1,82 @@
+import threading
+from collections import OrderedDict
+from PIL import ImageFont
+
+
+TEXT_FONTS = ("arial.ttf",)
+STAMP_FONTS = ("seguiemj.ttf", "arial.ttf")
+
+# Text sizes the editors offer (12 or 16 + 2 * weight, weight 1-12; badges
+# are 14) and the stamp size
+WARM_SIZES = {
+    TEXT_FONTS: list(range(14, 41, 2)),
+    STAMP_FONTS: [48],
+}
+
+
+class FontCache:
+    """
+    Fonts shared by every editor for the life of the process.
+
+    A fallback chain such as ("seguiemj.ttf", "arial.ttf") is resolved once
+    to the first font that loads (or PIL's default), and loaded fonts are
+    kept per (chain, size) with least-recently-used eviction, so drawing
+    or re-rendering text never goes back to disk for a size already used.
+    """
+
+    def __init__(self, max_fonts=64):
+        self.max_fonts = max_fonts
+        self._fonts = OrderedDict()  # (names, size) -> font
+        self._resolved = {}  # names -> first loadable name, None for the default
+        self._lock = threading.Lock()
+
+    def get(self, size, names=TEXT_FONTS):
+        names = tuple(names)
+        key = (names, size)
+        with self._lock:
+            font = self._fonts.get(key)
+            if font is not None:
+                self._fonts.move_to_end(key)
+                return font
+
+        font = self._load(names, size)
+        with self._lock:
+            self._fonts[key] = font
+            self._fonts.move_to_end(key)
+            while len(self._fonts) > self.max_fonts:
+                self._fonts.popitem(last=False)
+        return font
+
+    def _load(self, names, size):
+        if names in self._resolved:
+            name = self._resolved[names]
+            if name is None:
+                return ImageFont.load_default()
+            return ImageFont.truetype(name, size)
+
+        for name in names:
+            try:
+                font = ImageFont.truetype(name, size)
+            except OSError:
+                continue
+            self._resolved[names] = name
+            return font
+        self._resolved[names] = None
+        return ImageFont.load_default()
+
+    def warm_up(self, sizes=WARM_SIZES):
+        """Load the usual fonts on a background thread"""
+        def load():
+            for names, font_sizes in sizes.items():
+                for size in font_sizes:
+                    self.get(size, names)
+
+        threading.Thread(target=load, name="font-warm-up", daemon=True).start()
+
+    def clear(self):
+        with self._lock:
+            self._fonts.clear()
+            self._resolved.clear()
+
+
+font_cache = FontCache()
@@ -0,0 +1,105 @@
+from collections import OrderedDict
+from PIL import Image, ImageDraw, ImageTk
+
+
+class Loupe:
+    """
+    Magnifier that follows the cursor on a canvas showing a captured frame.
+
+    Only the small patch around the cursor is cropped and upscaled with
+    nearest-neighbour, then pasted into one reused PhotoImage. Rendered
+    patches are kept in a small LRU so moving back and forth is free.
+    """
+
+    def __init__(self, canvas, radius=8, zoom=10, cache_size=256):
+        self.canvas = canvas
+        self.radius = radius
+        self.zoom = zoom
+        self.size = (radius * 2 + 1) * zoom
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.img = None
+        self.origin = (0, 0)
+        self.visible = False
+
+        # Pixel grid, drawn once and pasted over every patch
+        self.grid_mask = Image.new('L', (self.size, self.size), 0)
+        grid = ImageDraw.Draw(self.grid_mask)
+        for offset in range(0, self.size, zoom):
+            grid.line((offset, 0, offset, self.size), fill=60)
+            grid.line((0, offset, self.size, offset), fill=60)
+        center = radius * zoom
+        grid.rectangle((center, center, center + zoom, center + zoom), outline=255)
+
+        self.photo = ImageTk.PhotoImage('RGB', (self.size, self.size), master=canvas)
+        self.image_item = canvas.create_image(0, 0, anchor='nw', image=self.photo,
+                                              state='hidden', tags="loupe")
+        self.border_item = canvas.create_rectangle(0, 0, 0, 0, outline='white', width=2,
+                                                   state='hidden', tags="loupe")
+        self.label_bg = canvas.create_rectangle(0, 0, 0, 0, fill='#333', outline='',
+                                                state='hidden', tags="loupe")
+        self.label_item = canvas.create_text(0, 0, anchor='nw', fill='white',
+                                             font=('Consolas', 9), state='hidden', tags="loupe")
+
+    def set_frame(self, img, origin=(0, 0)):
+        """Use a new frame; origin is its top-left in screen coordinates"""
+        self.img = img
+        self.origin = origin
+        self.cache.clear()
+
+    def render(self, x, y):
+        """Upscaled patch around (x, y) with the grid applied"""
+        key = (x, y)
+        patch = self.cache.get(key)
+        if patch is not None:
+            self.cache.move_to_end(key)
+            return patch
+
+        r = self.radius
+        # crop() pads outside the frame with black
+        patch = self.img.crop((x - r, y - r, x + r + 1, y + r + 1))
+        patch = patch.resize((self.size, self.size), Image.Resampling.NEAREST)
+        patch.paste((255, 255, 255), mask=self.grid_mask)
+
+        self.cache[key] = patch
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return patch
+
+    def show(self, x, y, extra=None):
+        """Move the loupe next to (x, y) and show that pixel; extra is appended to the readout"""
+        if self.img is None:
+            return
+        x = max(0, min(self.img.width - 1, x))
+        y = max(0, min(self.img.height - 1, y))
+        self.photo.paste(self.render(x, y))
+
+        # Sit below-right of the cursor, flipping near the frame edges
+        gap = 24
+        left = x + gap if x + gap + self.size < self.img.width else x - gap - self.size
+        top = y + gap if y + gap + self.size + 40 < self.img.height else y - gap - self.size - 40
+
+        r, g, b = self.img.getpixel((x, y))[:3]
+        text = f"{x + self.origin[0]}, {y + self.origin[1]}\nRGB({r}, {g}, {b})  #{r:02x}{g:02x}{b:02x}"
+        if extra:
+            text += f"\n{extra}"
+
+        canvas = self.canvas
+        canvas.coords(self.image_item, left, top)
+        canvas.coords(self.border_item, left, top, left + self.size, top + self.size)
+        canvas.coords(self.label_item, left + 4, top + self.size + 4)
+        canvas.itemconfig(self.label_item, text=text)
+        if not self.visible:
+            canvas.itemconfig("loupe", state='normal')
+            canvas.tag_raise("loupe")
+            self.visible = True
+
+        # Hidden items have no bbox, so size the label background once shown
+        _, _, text_right, text_bottom = canvas.bbox(self.label_item)
+        canvas.coords(self.label_bg, left, top + self.size,
+                      max(left + self.size, text_right + 4), text_bottom + 4)
+
+    def hide(self):
+        if self.visible:
+            self.canvas.itemconfig("loupe", state='hidden')
+            self.visible = False
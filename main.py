@@ -9,14 +9,21 @@ import queue
 import sys
 import os
 import argparse
+import logging
 from PIL import Image
 import pystray
 from drive_upload import upload_to_drive
 from capture import (
     capture_fullscreen, capture_region, capture_predefined, 
-    RegionSelector, save_screenshot, copy_to_clipboard,
+    RegionSelector, encode_screenshot, write_screenshot, copy_to_clipboard, add_png_to_clipboard,
     LightshotRegionCapture
 )
+from capture_service import capture_service
+from fonts import font_cache
+from pipeline import Stage
+from encoders import DEFAULT_PNG_PROFILE, DEFAULT_PALETTE_MODE, DEFAULT_OUTPUT_FORMAT, DEFAULT_LOSSY_QUALITY
+from screen_geometry import display_info
+from precapture import PreCaptureRecorder
 from editor import edit_image
 from config import Config
 from settings import settings_manager
@@ -30,6 +37,15 @@ mutex_handle = None
 # Global tray icon reference
 tray_icon = None
 
+# Global pre-capture recorder (None unless enabled)
+precapture_recorder = None
+
+# Output stages: finished screenshots are written, then uploaded, off the main loop.
+# Copies get their own stage so their PNG format never waits behind file saves.
+save_stage = None
+upload_stage = None
+clipboard_stage = None
+
 
 def get_resource_path(filename):
     """Get path to resource, works for dev and PyInstaller"""
@@ -222,8 +238,8 @@ class HotkeyThread(threading.Thread):
         self.running = False
 
 
-def process_editor_result(result):
-    """Handle the result from the editor (Save Local vs Save Cloud)"""
+def process_editor_result(result, capture_mode):
+    """Handle the result from the editor (Save Local, Save Cloud or Copy)"""
     if not result:
         print("❌ Cancelled")
         return
@@ -231,14 +247,138 @@ def process_editor_result(result):
     # Unpack the new 3-part tuple
     img, metadata, save_action = result
     
-    # Always save locally first
-    filepath = save_screenshot(img, metadata)
+    # Copies go to the clipboard as PNG. Everything else is saved locally
+    # first, in the format chosen for this capture mode; the name is taken
+    # now, so files keep capture order.
+    if save_action == 'clipboard':
+        output_format = 'png'
+        filepath = None
+    else:
+        output_format = settings_manager.get(f'{capture_mode}_format', DEFAULT_OUTPUT_FORMAT)
+        filepath = os.path.join(Config.SAVE_FOLDER, Config.get_filename(output_format))
+    encode_options = {
+        'profile': settings_manager.get('png_profile', DEFAULT_PNG_PROFILE),
+        'palette': settings_manager.get('png_palette', DEFAULT_PALETTE_MODE),
+        'output_format': output_format,
+        'quality': settings_manager.get('lossy_quality', DEFAULT_LOSSY_QUALITY),
+        'parallel': settings_manager.get('png_parallel', False),
+    }
+    
+    if save_action == 'clipboard':
+        # The DIB goes on the clipboard right away, so pasting straight after
+        # the editor closes never gets the previous contents
+        try:
+            sequence = copy_to_clipboard(img)
+        except Exception as e:
+            print(f"❌ Copy failed: {e}")
+            return
+        print("📋 Copied to clipboard!")
+        future = clipboard_stage.submit(add_png_copy, img, metadata, sequence, encode_options)
+        future.add_done_callback(on_png_copied)
+        return
+    
+    future = save_stage.submit(output_screenshot, img, metadata, filepath, encode_options)
+    future.add_done_callback(lambda done: on_saved(done, save_action, filepath))
+
+
+def add_png_copy(img, metadata, sequence, encode_options):
+    """Runs on the clipboard stage: adds the PNG format to a copy already on the clipboard"""
+    add_png_to_clipboard(encode_screenshot(img, metadata, **encode_options), sequence)
+
+
+def on_png_copied(future):
+    """Runs on the clipboard stage once the PNG format has been added"""
+    error = future.exception()
+    if error:
+        print(f"⚠️ Could not add PNG to the clipboard: {error}")
+
+
+def output_screenshot(img, metadata, filepath, encode_options):
+    """
+    Runs on the save stage: encodes the screenshot once, in memory, and
+    writes the bytes to the file. They are returned for the upload.
+    """
+    data = encode_screenshot(img, metadata, **encode_options)
+    write_screenshot(data, filepath)
+    return data
+
+
+def on_saved(future, save_action, filepath):
+    """Runs on the save stage once a screenshot has been written"""
+    error = future.exception()
+    if error:
+        print(f"❌ Save failed: {error}")
+        return
     print(f"✓ Saved locally: {filepath}")
     
-    # If user clicked "Save Cloud", then upload
+    # If user clicked "Save Cloud", upload the same bytes from memory. The
+    # save stage never waits on a full upload queue; the file stays saved.
     if save_action == 'cloud':
+        try:
+            upload_stage.submit(upload_to_drive, filepath, future.result(), block=False)
+        except queue.Full:
+            print(f"⚠️ Upload queue full, not uploading: {filepath}")
+            return
         print("☁️ Uploading to Drive...")
-        upload_to_drive(filepath)
+
+
+def start_output_stages():
+    """Start the background save, upload and clipboard stages"""
+    global save_stage, upload_stage, clipboard_stage
+    save_stage = Stage("save")
+    upload_stage = Stage("upload")
+    clipboard_stage = Stage("clipboard")
+
+
+def stop_output_stages():
+    """Finish pending saves, then the uploads they queued, and pending copies"""
+    if save_stage:
+        save_stage.stop()
+    if upload_stage:
+        upload_stage.stop()
+    if clipboard_stage:
+        clipboard_stage.stop()
+
+
+def on_display_change():
+    """Called from the display watcher thread after monitors or DPI change"""
+    print(f"🖥️  Display changed: {display_info.layout().describe()}")
+    # Frames recorded with the old layout can't be cropped to the new one
+    if precapture_recorder:
+        precapture_recorder.buffer.clear()
+
+
+def start_precapture():
+    """Start the background ring buffer of recent frames"""
+    global precapture_recorder
+    
+    # Record the whole virtual desktop; editors crop out their own area
+    def grab_desktop():
+        return capture_service.grab_monitors(display_info.layout().monitors, quiet=True)
+    
+    precapture_recorder = PreCaptureRecorder(
+        grab_desktop,
+        seconds=settings_manager.get('precapture_seconds', 4),
+        fps=settings_manager.get('precapture_fps', 4),
+        memory_mb=settings_manager.get('precapture_memory_mb', 200),
+    )
+    precapture_recorder.start()
+
+
+def get_recent_frames():
+    """Frames from the pre-capture buffer, or None when it is off"""
+    if not precapture_recorder:
+        return None
+    return precapture_recorder.snapshot()
+
+
+def editor_options():
+    """Blur tool and undo settings passed to the editors"""
+    return {
+        'redaction_mode': settings_manager.get('redaction_mode', 'pixelate'),
+        'redaction_strength': settings_manager.get('redaction_strength', 10),
+        'undo_memory_mb': settings_manager.get('undo_memory_mb', 128),
+    }
 
 
 def take_screenshot_fullscreen():
@@ -249,9 +389,12 @@ def take_screenshot_fullscreen():
     
     # Always use editor with toolbar
     from capture import FullscreenEditor
-    editor = FullscreenEditor(default_to_clipboard=default_to_clipboard)
+    editor = FullscreenEditor(default_to_clipboard=default_to_clipboard,
+                              frames=get_recent_frames(),
+                              monitor_mode=settings_manager.get('fullscreen_monitor', 'current'),
+                              **editor_options())
     result = editor.capture_and_edit()
-    process_editor_result(result)
+    process_editor_result(result, 'fullscreen')
 
 
 def take_screenshot_region():
@@ -262,9 +405,11 @@ def take_screenshot_region():
     default_to_clipboard = settings_manager.get('region_copy_to_clipboard', True)
     
     # Always use Lightshot-style mode with integrated editing
-    lightshot = LightshotRegionCapture(default_to_clipboard=default_to_clipboard)
+    lightshot = LightshotRegionCapture(default_to_clipboard=default_to_clipboard,
+                                       frames=get_recent_frames(),
+                                       **editor_options())
     result = lightshot.capture_and_edit()
-    process_editor_result(result)
+    process_editor_result(result, 'region')
 
 
 def take_screenshot_predefined():
@@ -282,9 +427,10 @@ def take_screenshot_predefined():
     # Always use editor with toolbar
     try:
         from capture import PredefinedEditor
-        editor = PredefinedEditor(top, bottom, left, right, default_to_clipboard=default_to_clipboard)
+        editor = PredefinedEditor(top, bottom, left, right, default_to_clipboard=default_to_clipboard,
+                                  **editor_options())
         result = editor.capture_and_edit()
-        process_editor_result(result)
+        process_editor_result(result, 'predefined')
     except ValueError as e:
         print(f"❌ Error: {e}")
     except Exception as e:
@@ -293,17 +439,25 @@ def take_screenshot_predefined():
 
 def process_action(action):
     """Process action in main thread"""
-    if action == 'fullscreen':
-        take_screenshot_fullscreen()
-    elif action == 'region':
-        take_screenshot_region()
-    elif action == 'predefined':
-        take_screenshot_predefined()
-    elif action == 'settings':
-        settings_manager.show_settings_window()
-    elif action == 'exit':
-        return False  # Signal to exit
-    return True
+    # Don't record the editor window into the pre-capture buffer
+    if precapture_recorder and action in ('fullscreen', 'region', 'predefined'):
+        precapture_recorder.pause()
+    
+    try:
+        if action == 'fullscreen':
+            take_screenshot_fullscreen()
+        elif action == 'region':
+            take_screenshot_region()
+        elif action == 'predefined':
+            take_screenshot_predefined()
+        elif action == 'settings':
+            settings_manager.show_settings_window()
+        elif action == 'exit':
+            return False  # Signal to exit
+        return True
+    finally:
+        if precapture_recorder:
+            precapture_recorder.resume()
 
 
 def create_tray_icon():
@@ -362,7 +516,13 @@ def main():
     parser = argparse.ArgumentParser(description='ViewClipper Screenshot Tool')
     parser.add_argument('--settings', action='store_true', 
                         help='Open settings window on startup')
+    parser.add_argument('--precapture', action='store_true',
+                        help='Keep a buffer of recent frames to step back to in the editor')
+    parser.add_argument('--verbose', action='store_true',
+                        help='Log capture timings')
     args = parser.parse_args()
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING,
+                        format='%(asctime)s %(name)s: %(message)s')
     
     # Check for single instance
     if not check_single_instance():
@@ -390,6 +550,9 @@ def main():
         full_clip = settings_manager.get('fullscreen_copy_to_clipboard', False)
         predef_clip = settings_manager.get('predefined_copy_to_clipboard', False)
         
+        # Pre-capture ring buffer
+        precapture_on = args.precapture or settings_manager.get('precapture_enabled', False)
+        
         print("=" * 60)
         print("  📷 ViewClipper - Screenshot Tool (with Google Drive Sync)")
         print("=" * 60)
@@ -401,9 +564,28 @@ def main():
         print(f"\n  System Tray: Right-click tray icon for menu")
         print(f"\n  Predefined area margins:")
         print(f"    Top: {top}px, Bottom: {bottom}px, Left: {left}px, Right: {right}px")
-        print(f"\n  Save location: {Config.SAVE_FOLDER}")
+        print(f"\n  Monitors: {display_info.layout().describe()}")
+        print(f"  Save location: {Config.SAVE_FOLDER}")
+        if precapture_on:
+            print(f"  Pre-capture: last {settings_manager.get('precapture_seconds', 4)}s "
+                  f"@ {settings_manager.get('precapture_fps', 4)} fps (← / → in editor)")
         print("=" * 60)
         
+        # Cache monitor geometry until Windows reports a display change
+        display_info.start_watching()
+        display_info.add_listener(on_display_change)
+        
+        # Captures run on this thread - set up the grabber before the first hotkey
+        capture_service.warm_up()
+        
+        # Load the annotation fonts in the background before the first edit
+        font_cache.warm_up()
+        
+        start_output_stages()
+        
+        if precapture_on:
+            start_precapture()
+        
         # Start hotkey thread
         hotkey_thread = HotkeyThread()
         hotkey_thread.start()
@@ -440,6 +622,14 @@ def main():
                     pass
             # Stop hotkey thread
             hotkey_thread.stop()
+            # Stop pre-capture recorder
+            if precapture_recorder:
+                precapture_recorder.stop()
+            # Let queued saves and uploads finish
+            stop_output_stages()
+            # Release screen grabbers
+            capture_service.close()
+            display_info.stop_watching()
             
     finally:
         release_mutex()
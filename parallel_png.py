@@ -0,0 +1,125 @@
+"""
+Multi-threaded PNG writer for very large captures.
+
+The image is cut into strips of rows that are filtered and deflated on a
+thread pool (numpy and zlib both release the GIL), the way pigz splits a
+gzip stream. Every strip but the last ends with a sync flush, so the raw
+deflate streams join into one, and each strip is primed with the last
+32 KB of the one before it so matches can still reach across the seam.
+The joined stream gets a zlib header and an Adler-32 combined from the
+per-strip checksums, and is written as ordinary IDAT chunks by
+png_writer, whose row filters the strips use: the result is a standard
+PNG any reader can open.
+"""
+import os
+import struct
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from png_writer import COLOR_TYPES, filter_rows, write_png
+
+
+WINDOW = 32 * 1024  # deflate window, primed from the previous strip
+STRIP_BYTES = 1 << 20  # raw bytes per strip
+
+# Smallest image (in pixels) worth splitting: roughly 2560x1600. Pillow
+# already writes anything smaller in a fraction of a second, and short
+# strips lose more to the seams (see benchmarks/bench_parallel_png.py)
+MIN_PIXELS = 4_000_000
+
+ADLER_BASE = 65521
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def supports(img):
+    """Whether save() can write this image"""
+    return img.mode in COLOR_TYPES and (img.mode != 'P' or img.getpalette() is not None)
+
+
+def worthwhile(img):
+    """Whether img is large enough, and the machine has the cores, for save() to beat Pillow"""
+    return supports(img) and img.width * img.height >= MIN_PIXELS and (os.cpu_count() or 1) > 1
+
+
+def worker_pool():
+    """Thread pool shared by every parallel save, one thread per core"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=os.cpu_count() or 1,
+                                       thread_name_prefix="png-deflate")
+        return _pool
+
+
+def deflate_strip(data, zdict, level, strategy, last):
+    """Raw deflate of one strip, with its Adler-32 and length"""
+    if zdict:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15, 8, strategy, zdict)
+    else:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15, 8, strategy)
+    body = compressor.compress(data) + compressor.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+    return body, zlib.adler32(data), len(data)
+
+
+def adler32_combine(adler1, adler2, length2):
+    """Adler-32 of two buffers joined, from each one's checksum (zlib's adler32_combine)"""
+    remainder = length2 % ADLER_BASE
+    sum1 = adler1 & 0xffff
+    sum2 = (remainder * sum1) % ADLER_BASE
+    sum1 += (adler2 & 0xffff) + ADLER_BASE - 1
+    sum2 += (adler1 >> 16) + (adler2 >> 16) + ADLER_BASE - remainder
+    if sum1 >= ADLER_BASE:
+        sum1 -= ADLER_BASE
+    if sum1 >= ADLER_BASE:
+        sum1 -= ADLER_BASE
+    if sum2 >= ADLER_BASE << 1:
+        sum2 -= ADLER_BASE << 1
+    if sum2 >= ADLER_BASE:
+        sum2 -= ADLER_BASE
+    return sum1 | (sum2 << 16)
+
+
+def zlib_header(level):
+    """Two-byte zlib header for a 32 KB window and the level hint zlib itself writes"""
+    flevel = 0 if level in (0, 1) else 1 if level < 6 else 2 if level in (6, -1) else 3
+    cmf = 0x78
+    flg = flevel << 6
+    flg += 31 - (cmf * 256 + flg) % 31
+    return bytes((cmf, flg))
+
+
+def save(img, fp, level=6, strategy=zlib.Z_DEFAULT_STRATEGY, pnginfo=None,
+         strip_bytes=STRIP_BYTES, pool=None):
+    """
+    Write img (L, LA, RGB, RGBA or P) to a binary file object as a PNG,
+    with the chunks of pnginfo. pool defaults to worker_pool().
+    """
+    _, bpp = COLOR_TYPES[img.mode]
+    pool = pool or worker_pool()
+    width, height = img.size
+    rows = np.asarray(img, dtype=np.uint8).reshape(height, width * bpp)
+    row_bytes = width * bpp
+    rows_per_strip = max(1, strip_bytes // row_bytes)
+    starts = range(0, height, rows_per_strip)
+    no_prior = np.zeros(row_bytes, np.uint8)
+
+    def filter_strip(start):
+        prior = rows[start - 1] if start else no_prior
+        return filter_rows(rows[start:start + rows_per_strip], prior, bpp).reshape(-1)
+
+    filtered = list(pool.map(filter_strip, starts))
+
+    def deflate(index):
+        zdict = filtered[index - 1][-WINDOW:].tobytes() if index else None
+        return deflate_strip(filtered[index], zdict, level, strategy, index == len(filtered) - 1)
+
+    parts = list(pool.map(deflate, range(len(filtered))))
+
+    adler = 1
+    for _, strip_adler, length in parts:
+        adler = adler32_combine(adler, strip_adler, length)
+    stream = b''.join([zlib_header(level)] + [body for body, _, _ in parts] + [struct.pack('>I', adler)])
+    write_png(fp, img, stream, pnginfo)
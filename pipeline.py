@@ -0,0 +1,52 @@
+import queue
+import threading
+from concurrent.futures import Future
+
+
+class Stage:
+    """
+    One background step of the output pipeline: a thread that runs
+    submitted jobs in order from a bounded queue.
+
+    submit() returns immediately with a Future unless max_pending jobs are
+    already waiting, in which case it blocks until one finishes (or, with
+    block=False, raises queue.Full). stop()
+    lets the jobs already queued finish before the thread exits, so nothing
+    accepted is lost on a clean shutdown.
+    """
+
+    _STOP = object()
+
+    def __init__(self, name, max_pending=8):
+        self.name = name
+        self._jobs = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    @property
+    def pending(self):
+        return self._jobs.qsize()
+
+    def submit(self, fn, *args, block=True, **kwargs):
+        future = Future()
+        self._jobs.put((future, fn, args, kwargs), block=block)
+        return future
+
+    def _run(self):
+        while True:
+            job = self._jobs.get()
+            if job is self._STOP:
+                return
+            future, fn, args, kwargs = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+    def stop(self, timeout=None):
+        """Finish the queued jobs, then end the thread"""
+        if self._thread.is_alive():
+            self._jobs.put(self._STOP)
+            self._thread.join(timeout)
@@ -0,0 +1,273 @@
+import threading
+import time
+import zlib
+from collections import deque, namedtuple
+from PIL import Image, ImageChops
+
+
+# kind is 'key' (whole frame) or 'delta' (changed box pasted over the previous frame)
+_Frame = namedtuple('_Frame', 'timestamp kind box size data')
+
+
+class FrameRingBuffer:
+    """
+    Bounded buffer of recent screen frames.
+
+    Frames are stored compactly: a zlib-compressed keyframe followed by
+    compressed crops of only the area that changed since the previous frame.
+    Unchanged frames are not stored at all. Whole keyframe groups are dropped
+    once they fall out of the time window or the memory budget.
+    """
+
+    def __init__(self, seconds=4.0, memory_budget=200 * 1024 * 1024,
+                 keyframe_interval=12, thumb_factor=4):
+        self.seconds = seconds
+        self.memory_budget = memory_budget
+        self.keyframe_interval = keyframe_interval
+        self.thumb_factor = thumb_factor
+
+        self._frames = deque()
+        self._bytes = 0
+        self._since_keyframe = 0
+        self._last_thumb = None
+        self._last_seen = 0.0
+        self._generation = 0  # bumped by clear()
+        self._lock = threading.Lock()
+
+    @property
+    def memory_used(self):
+        return self._bytes
+
+    def push(self, img, timestamp=None):
+        """
+        Add a frame. Returns False if it matched the previous frame and was skipped.
+
+        The diff and compression run outside the lock; if clear() ran in the
+        meantime the frame is redone as a keyframe, so the buffer never
+        starts with a delta.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+
+        thumb = img.reduce(self.thumb_factor)
+        while True:
+            with self._lock:
+                generation = self._generation
+                last_thumb = self._last_thumb
+                since_keyframe = self._since_keyframe
+                empty = not self._frames
+
+            box = None
+            if last_thumb is not None and last_thumb.size == thumb.size:
+                changed = ImageChops.difference(thumb, last_thumb).getbbox()
+                if changed is None:
+                    with self._lock:
+                        if self._generation != generation:
+                            continue
+                        self._last_seen = timestamp
+                    return False
+                box = self._scale_box(changed, img.size)
+
+            area = img.width * img.height
+            keyframe = (
+                box is None
+                or empty
+                or since_keyframe >= self.keyframe_interval
+                or (box[2] - box[0]) * (box[3] - box[1]) > area // 2
+            )
+
+            if keyframe:
+                frame = _Frame(timestamp, 'key', (0, 0) + img.size, img.size,
+                               zlib.compress(img.tobytes(), 1))
+            else:
+                crop = img.crop(box)
+                frame = _Frame(timestamp, 'delta', box, img.size,
+                               zlib.compress(crop.tobytes(), 1))
+
+            with self._lock:
+                if self._generation != generation:
+                    continue
+                self._last_thumb = thumb
+                self._since_keyframe = 0 if keyframe else since_keyframe + 1
+                self._frames.append(frame)
+                self._bytes += len(frame.data)
+                self._last_seen = timestamp
+                self._evict(timestamp)
+            return True
+
+    def _scale_box(self, box, size):
+        """Scale a thumbnail box back to full resolution with a little padding"""
+        f = self.thumb_factor
+        return (
+            max(0, box[0] * f - f),
+            max(0, box[1] * f - f),
+            min(size[0], box[2] * f + f),
+            min(size[1], box[3] * f + f),
+        )
+
+    def _group_end(self, start):
+        """Index just past the keyframe group starting at start"""
+        end = start + 1
+        while end < len(self._frames) and self._frames[end].kind == 'delta':
+            end += 1
+        return end
+
+    def _evict(self, now):
+        """Drop whole keyframe groups that are too old or over budget (lock held)"""
+        while True:
+            end = self._group_end(0)
+            if end >= len(self._frames):
+                return  # never drop the newest group
+
+            # The group was on screen until the next group started
+            too_old = self._frames[end].timestamp < now - self.seconds
+            over_budget = self._bytes > self.memory_budget
+            if not (too_old or over_budget):
+                return
+
+            for _ in range(end):
+                self._bytes -= len(self._frames.popleft().data)
+
+    def clear(self):
+        with self._lock:
+            self._frames.clear()
+            self._bytes = 0
+            self._since_keyframe = 0
+            self._last_thumb = None
+            self._generation += 1
+
+    def snapshot(self):
+        """Return an immutable view of the buffered frames (newest first)"""
+        with self._lock:
+            frames = list(self._frames)
+            cutoff = time.time() - self.seconds
+
+            # A frame stays on screen until the next one replaces it
+            count = 0
+            for i in range(len(frames) - 1, -1, -1):
+                ended = frames[i + 1].timestamp if i + 1 < len(frames) else self._last_seen
+                if ended < cutoff:
+                    break
+                count += 1
+
+            # Frames are stored as deltas, so keep back to the keyframe of the oldest one
+            first = len(frames) - count
+            while 0 < first < len(frames) and frames[first].kind == 'delta':
+                first -= 1
+            return RecentFrames(frames[first:], count)
+
+
+class RecentFrames:
+    """Frames captured before the hotkey, decoded lazily. Index 0 is the newest."""
+
+    def __init__(self, frames, count):
+        self._frames = frames
+        self._count = count
+        self._cached_index = None
+        self._cached_image = None
+
+    def __len__(self):
+        return self._count
+
+    def timestamp(self, index):
+        return self._frames[len(self._frames) - 1 - index].timestamp
+
+    def image(self, index):
+        """Decode frame at index (0 = newest) into an RGB image"""
+        position = len(self._frames) - 1 - index
+        if position == self._cached_index:
+            return self._cached_image
+
+        start = position
+        while self._frames[start].kind != 'key':
+            start -= 1
+
+        # Continue from the cached frame if it is on the way
+        if self._cached_index is not None and start <= self._cached_index < position:
+            img = self._cached_image.copy()
+            start = self._cached_index + 1
+        else:
+            key = self._frames[start]
+            img = Image.frombytes('RGB', key.size, zlib.decompress(key.data))
+            start += 1
+
+        for frame in self._frames[start:position + 1]:
+            x1, y1, x2, y2 = frame.box
+            patch = Image.frombytes('RGB', (x2 - x1, y2 - y1), zlib.decompress(frame.data))
+            img.paste(patch, (x1, y1))
+
+        self._cached_index = position
+        self._cached_image = img
+        return img
+
+
+class PreCaptureRecorder(threading.Thread):
+    """
+    Background thread that keeps the last few seconds of the screen in a
+    FrameRingBuffer so a capture can open on "the moment before" the hotkey.
+
+    grab_fn returns the current virtual desktop as an RGB image.
+    The frame rate adapts: it drops when the screen is static and is capped
+    so grabbing never uses more than max_duty of one core.
+    """
+
+    def __init__(self, grab_fn, seconds=4.0, fps=4.0, memory_mb=200, max_duty=0.10):
+        super().__init__()
+        self.daemon = True
+        self.grab_fn = grab_fn
+        self.fps = max(0.5, fps)
+        self.max_duty = max_duty
+        self.buffer = FrameRingBuffer(seconds, int(memory_mb * 1024 * 1024))
+
+        self.running = True
+        self._paused = threading.Event()
+        self._wake = threading.Event()
+        self.interval = 1.0 / self.fps
+
+    def run(self):
+        target = 1.0 / self.fps
+        idle_frames = 0
+
+        while self.running:
+            if self._paused.is_set():
+                self._wake.wait(0.1)
+                self._wake.clear()
+                continue
+
+            start = time.perf_counter()
+            try:
+                img = self.grab_fn()
+                changed = self.buffer.push(img)
+            except Exception as e:
+                print(f"⚠️ Pre-capture grab failed: {e}")
+                changed = False
+            cost = time.perf_counter() - start
+
+            # Back off on static screens (up to 4x slower), recover on change
+            idle_frames = 0 if changed else idle_frames + 1
+            if idle_frames > self.fps * 2:
+                interval = target * 4
+            elif idle_frames > self.fps:
+                interval = target * 2
+            else:
+                interval = target
+            # Never spend more than max_duty of the time grabbing
+            self.interval = max(interval, cost / self.max_duty)
+
+            self._wake.wait(max(0.0, self.interval - cost))
+            self._wake.clear()
+
+    def snapshot(self):
+        return self.buffer.snapshot()
+
+    def pause(self):
+        """Stop grabbing (e.g. while an editor covers the screen)"""
+        self._paused.set()
+
+    def resume(self):
+        self._paused.clear()
+        self._wake.set()
+
+    def stop(self):
+        self.running = False
+        self._wake.set()
@@ -0,0 +1,136 @@
+"""
+Redaction of image regions for the blur tool.
+
+Every mode works on the region alone and stays on PIL's C paths, so the
+cost follows the region's area. Pixelation averages each cell with
+Image.reduce instead of sampling one pixel of it, and large blur radii are
+applied to a reduced copy that is scaled back up.
+"""
+import tkinter as tk
+from PIL import Image, ImageFilter, ImageTk
+from display import clamp_box, box_is_empty
+
+
+MODES = ('pixelate', 'blur', 'gaussian', 'solid')
+MODE_LABELS = {
+    'pixelate': 'Pixelate',
+    'blur': 'Box blur',
+    'gaussian': 'Gaussian blur',
+    'solid': 'Solid fill',
+}
+SOLID_COLOR = (0, 0, 0)
+
+# Large blurs run on a copy reduced until the radius is down to this
+MIN_REDUCED_RADIUS = 2
+
+
+def pixelate(region, cell):
+    """Region as blocks of cell x cell pixels, each the average of its block"""
+    cell = max(1, int(round(cell)))
+    if cell == 1:
+        return region.copy()
+    # reduce() keeps partial cells at the right and bottom edges; the box
+    # maps every output pixel back to its own cell
+    small = region.reduce(cell)
+    width, height = region.size
+    return small.resize(region.size, Image.Resampling.NEAREST, box=(0, 0, width / cell, height / cell))
+
+
+def blur(region, radius, gaussian=False):
+    """Box or gaussian blur using only pixels inside the region"""
+    radius = max(1.0, float(radius))
+    factor = max(1, min(int(radius // MIN_REDUCED_RADIUS), region.width, region.height))
+    work = region.reduce(factor) if factor > 1 else region
+    radius /= factor
+    work = work.filter(ImageFilter.GaussianBlur(radius) if gaussian else ImageFilter.BoxBlur(radius))
+    if work.size != region.size:
+        work = work.resize(region.size, Image.Resampling.BILINEAR)
+    return work
+
+
+def redact(region, mode='pixelate', strength=10):
+    """
+    Redacted copy of region. strength is the cell size for pixelate and the
+    radius for the blurs, in pixels of region; solid ignores it.
+    """
+    if mode == 'solid':
+        return Image.new(region.mode, region.size, SOLID_COLOR)
+    if mode in ('blur', 'gaussian'):
+        return blur(region, strength, gaussian=(mode == 'gaussian'))
+    return pixelate(region, strength)
+
+
+def redact_box(img, box, mode='pixelate', strength=10):
+    """Redact box of img in place"""
+    box = clamp_box(box, img.size)
+    if box_is_empty(box):
+        return
+    img.paste(redact(img.crop(box), mode, strength), box[:2])
+
+
+class RedactionPreview:
+    """
+    What a redaction will hide, shown on the canvas while its box is
+    dragged. The frame passed in is the one already shown at display size
+    (e.g. ScaledDisplay.image), so each update only processes the box's
+    display pixels; the committed record is rendered at full resolution.
+    """
+
+    def __init__(self, canvas, frame, scale=1.0, offset=(0, 0), tag="redaction_preview"):
+        self.canvas = canvas
+        self.frame = frame
+        self.scale = scale
+        self.offset = offset
+        self.tag = tag
+        self.photo = None
+        self.item = None
+        self.outline_item = None
+
+    def show(self, box, mode='pixelate', strength=10, outline=False):
+        """
+        Preview the redaction of box, given in canvas coordinates. With
+        outline, the box being dragged is drawn dashed over it.
+        """
+        self._show_outline(box if outline else None)
+        x1, y1, x2, y2 = box
+        left, top = min(x1, x2) - self.offset[0], min(y1, y2) - self.offset[1]
+        right, bottom = max(x1, x2) - self.offset[0], max(y1, y2) - self.offset[1]
+        box = clamp_box((left, top, right, bottom), self.frame.size)
+        if box_is_empty(box):
+            self._hide_patch()
+            return
+
+        patch = redact(self.frame.crop(box), mode, strength * self.scale)
+        if self.photo is not None and (self.photo.width(), self.photo.height()) == patch.size:
+            self.photo.paste(patch)
+        else:
+            self.photo = ImageTk.PhotoImage(patch, master=self.canvas)
+        x, y = box[0] + self.offset[0], box[1] + self.offset[1]
+        if self.item is None:
+            self.item = self.canvas.create_image(x, y, anchor=tk.NW, image=self.photo, tags=self.tag)
+            if self.outline_item is not None:
+                self.canvas.tag_lower(self.item, self.outline_item)
+        else:
+            self.canvas.itemconfig(self.item, image=self.photo)
+            self.canvas.coords(self.item, x, y)
+
+    def hide(self):
+        self._show_outline(None)
+        self._hide_patch()
+
+    def _hide_patch(self):
+        if self.item is not None:
+            self.canvas.delete(self.item)
+        self.item = None
+        self.photo = None
+
+    def _show_outline(self, box):
+        if box is None:
+            if self.outline_item is not None:
+                self.canvas.delete(self.outline_item)
+            self.outline_item = None
+        elif self.outline_item is None:
+            self.outline_item = self.canvas.create_rectangle(*box, outline='#ff6600', width=2, dash=(4, 4),
+                                                             tags=self.tag)
+        else:
+            self.canvas.coords(self.outline_item, *box)
@@ -0,0 +1,339 @@
+import ctypes
+import threading
+import time
+from collections import namedtuple
+import win32api
+import win32con
+import win32gui
+
+
+WM_DPICHANGED = 0x02E0
+SPI_SETLOGICALDPIOVERRIDE = 0x009F
+
+
+class Monitor(namedtuple('Monitor', 'left top width height scale primary')):
+    """One display in virtual-desktop pixels, with its DPI scale (1.0 = 96 DPI)"""
+    __slots__ = ()
+
+    @property
+    def right(self):
+        return self.left + self.width
+
+    @property
+    def bottom(self):
+        return self.top + self.height
+
+    @property
+    def box(self):
+        return (self.left, self.top, self.right, self.bottom)
+
+    def contains(self, x, y):
+        return self.left <= x < self.right and self.top <= y < self.bottom
+
+    def as_mss(self):
+        """Monitor dict in the format mss.grab() expects"""
+        return {"top": self.top, "left": self.left, "width": self.width, "height": self.height}
+
+
+def bounding_box(monitors):
+    """(left, top, right, bottom) covering all given monitors"""
+    return (
+        min(m.left for m in monitors),
+        min(m.top for m in monitors),
+        max(m.right for m in monitors),
+        max(m.bottom for m in monitors),
+    )
+
+
+class MonitorLayout:
+    """All monitors plus the bounding box of the virtual desktop"""
+
+    def __init__(self, monitors):
+        self.monitors = list(monitors)
+        left, top, right, bottom = bounding_box(self.monitors)
+        self.virtual = Monitor(left, top, right - left, bottom - top,
+                               max(m.scale for m in self.monitors), False)
+
+    @property
+    def primary(self):
+        for monitor in self.monitors:
+            if monitor.primary:
+                return monitor
+        return self.monitors[0]
+
+    def monitor_at(self, x, y):
+        """Monitor containing a virtual-desktop point (primary if none)"""
+        for monitor in self.monitors:
+            if monitor.contains(x, y):
+                return monitor
+        return self.primary
+
+    def current(self):
+        """Monitor under the mouse cursor"""
+        try:
+            x, y = win32api.GetCursorPos()
+        except:
+            return self.primary
+        return self.monitor_at(x, y)
+
+    def describe(self):
+        return ", ".join(
+            f"{m.width}x{m.height} @{int(m.scale * 100)}%{' (primary)' if m.primary else ''}"
+            for m in self.monitors
+        )
+
+
+def get_monitor_dpi_scale(handle):
+    """Effective DPI scale of one monitor (Windows 8.1+), 1.0 if unknown"""
+    try:
+        dpi_x = ctypes.c_uint()
+        dpi_y = ctypes.c_uint()
+        # MDT_EFFECTIVE_DPI = 0
+        ctypes.windll.shcore.GetDpiForMonitor(int(handle), 0, ctypes.byref(dpi_x), ctypes.byref(dpi_y))
+        return dpi_x.value / 96.0
+    except:
+        return 1.0
+
+
+def get_monitor_layout():
+    """Query the OS for every monitor's bounds and DPI scale"""
+    monitors = []
+    try:
+        for handle, _, _ in win32api.EnumDisplayMonitors():
+            info = win32api.GetMonitorInfo(handle)
+            left, top, right, bottom = info['Monitor']
+            monitors.append(Monitor(
+                left, top, right - left, bottom - top,
+                get_monitor_dpi_scale(handle),
+                bool(info.get('Flags', 0) & 1),  # MONITORINFOF_PRIMARY
+            ))
+    except:
+        monitors = []
+
+    if not monitors:
+        try:
+            width = ctypes.windll.user32.GetSystemMetrics(0)
+            height = ctypes.windll.user32.GetSystemMetrics(1)
+        except:
+            width, height = 1920, 1080
+        monitors = [Monitor(0, 0, width, height, 1.0, True)]
+
+    # Primary first, then left-to-right
+    monitors.sort(key=lambda m: (not m.primary, m.left, m.top))
+    return MonitorLayout(monitors)
+
+
+def get_display_signature():
+    """Cheap fingerprint of the virtual desktop (origin, size, monitor count)"""
+    try:
+        metrics = ctypes.windll.user32.GetSystemMetrics
+        # SM_XVIRTUALSCREEN, SM_YVIRTUALSCREEN, SM_CXVIRTUALSCREEN, SM_CYVIRTUALSCREEN, SM_CMONITORS
+        return tuple(metrics(index) for index in (76, 77, 78, 79, 80))
+    except:
+        return None
+
+
+def get_system_dpi_scale():
+    """System DPI scale from the screen DC (1.0 = 96 DPI)"""
+    try:
+        dc = ctypes.windll.user32.GetDC(0)
+        dpi = ctypes.windll.gdi32.GetDeviceCaps(dc, 88)  # LOGPIXELSX
+        ctypes.windll.user32.ReleaseDC(0, dc)
+        return dpi / 96.0
+    except:
+        return 1.0
+
+
+def get_refresh_rate():
+    """Primary display refresh rate in Hz (60 if unknown)"""
+    try:
+        dc = ctypes.windll.user32.GetDC(0)
+        rate = ctypes.windll.gdi32.GetDeviceCaps(dc, 116)  # VREFRESH
+        ctypes.windll.user32.ReleaseDC(0, dc)
+        # 0 and 1 mean "hardware default"
+        return rate if rate > 1 else 60
+    except:
+        return 60
+
+
+class DisplayWatcher(threading.Thread):
+    """
+    Hidden top-level window that receives display broadcasts
+    (WM_DISPLAYCHANGE, WM_DPICHANGED, WM_SETTINGCHANGE) and reports them.
+    Message-only windows do not get broadcasts, so a real hidden window is used.
+    """
+
+    CLASS_NAME = 'ViewClipperDisplayWatcher'
+
+    def __init__(self, on_change):
+        super().__init__()
+        self.daemon = True
+        self.on_change = on_change
+        self.hwnd = None
+        self.ready = threading.Event()
+
+    def run(self):
+        try:
+            wc = win32gui.WNDCLASS()
+            wc.lpszClassName = self.CLASS_NAME
+            wc.lpfnWndProc = self._wnd_proc
+            wc.hInstance = win32api.GetModuleHandle(None)
+            try:
+                win32gui.RegisterClass(wc)
+            except win32gui.error:
+                pass  # already registered by an earlier watcher
+            self.hwnd = win32gui.CreateWindow(
+                self.CLASS_NAME, 'ViewClipper display watcher', 0,
+                0, 0, 0, 0, 0, 0, wc.hInstance, None
+            )
+        except Exception as e:
+            print(f"⚠️ Display change notifications unavailable: {e}")
+            return
+        finally:
+            self.ready.set()
+        win32gui.PumpMessages()
+
+    def _wnd_proc(self, hwnd, msg, wparam, lparam):
+        if msg == win32con.WM_DISPLAYCHANGE or msg == WM_DPICHANGED:
+            self.on_change()
+        elif msg == win32con.WM_SETTINGCHANGE and wparam in (
+                win32con.SPI_SETWORKAREA, SPI_SETLOGICALDPIOVERRIDE):
+            self.on_change()
+        elif msg == win32con.WM_DESTROY:
+            win32gui.PostQuitMessage(0)
+            return 0
+        return win32gui.DefWindowProc(hwnd, msg, wparam, lparam)
+
+    def stop(self):
+        if self.hwnd:
+            try:
+                win32gui.PostMessage(self.hwnd, win32con.WM_CLOSE, 0, 0)
+            except:
+                pass
+
+
+# Without a watcher, how long a display signature is trusted before checking again
+POLL_INTERVAL = 0.25
+
+
+class DisplayInfo:
+    """
+    Cached monitor layout, DPI scale and refresh rate.
+
+    Values are queried from the OS once and kept until Windows reports a
+    display or DPI change, so hot paths (mouse motion, redraws) never make a
+    system call. Without a running watcher, a cheap display signature is
+    compared instead, at most every POLL_INTERVAL seconds, so a changed
+    layout is still noticed soon after.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._layout = None
+        self._dpi_scale = None
+        self._refresh_rate = None
+        self._generation = 0
+        self._signature = None
+        self._polled_at = None
+        self._listeners = []
+        self._watcher = None
+
+    def _poll(self):
+        """Without a watcher, notice changes by comparing the display signature"""
+        if self._watcher is not None:
+            return
+        now = time.monotonic()
+        polled_at = self._polled_at
+        if polled_at is not None and now - polled_at < POLL_INTERVAL:
+            return
+        self._polled_at = now
+        signature = get_display_signature()
+        if signature == self._signature:
+            return
+        with self._lock:
+            first = self._signature is None
+            self._signature = signature
+        if not first:
+            self.invalidate()
+
+    @property
+    def generation(self):
+        """Counter that increases every time the display configuration changes"""
+        self._poll()
+        return self._generation
+
+    def layout(self):
+        """Current MonitorLayout"""
+        self._poll()
+        layout = self._layout
+        if layout is None:
+            layout = get_monitor_layout()
+            with self._lock:
+                self._layout = layout
+        return layout
+
+    def screen_size(self):
+        """Primary monitor size in physical pixels"""
+        primary = self.layout().primary
+        return primary.width, primary.height
+
+    def dpi_scale(self):
+        """System DPI scale (1.0 = 96 DPI)"""
+        self._poll()
+        scale = self._dpi_scale
+        if scale is None:
+            scale = get_system_dpi_scale()
+            with self._lock:
+                self._dpi_scale = scale
+        return scale
+
+    def refresh_rate(self):
+        """Primary display refresh rate in Hz"""
+        self._poll()
+        rate = self._refresh_rate
+        if rate is None:
+            rate = get_refresh_rate()
+            with self._lock:
+                self._refresh_rate = rate
+        return rate
+
+    def invalidate(self):
+        """Drop cached values and tell listeners the display changed"""
+        with self._lock:
+            self._layout = None
+            self._dpi_scale = None
+            self._refresh_rate = None
+            self._generation += 1
+            listeners = list(self._listeners)
+        for callback in listeners:
+            try:
+                callback()
+            except Exception as e:
+                print(f"⚠️ Display change listener failed: {e}")
+
+    def add_listener(self, callback):
+        """Call callback() (from the watcher thread) after every display change"""
+        with self._lock:
+            self._listeners.append(callback)
+
+    def start_watching(self):
+        """Start listening for display change notifications"""
+        if self._watcher is not None:
+            return
+        watcher = DisplayWatcher(self.invalidate)
+        watcher.start()
+        watcher.ready.wait(2.0)
+        if watcher.hwnd:
+            self._watcher = watcher
+            # Anything cached before the watcher existed may be stale
+            self.invalidate()
+
+    def stop_watching(self):
+        watcher = self._watcher
+        self._watcher = None
+        if watcher:
+            watcher.stop()
+
+
+# Global display info instance
+display_info = DisplayInfo()
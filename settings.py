@@ -2,6 +2,11 @@ import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 import json
 import os
+from screen_geometry import display_info
+from redaction import MODES as REDACTION_MODES, MODE_LABELS as REDACTION_LABELS
+from encoders import (PNG_PROFILES, PNG_PROFILE_LABELS, DEFAULT_PNG_PROFILE,
+                      PALETTE_MODES, PALETTE_MODE_LABELS, DEFAULT_PALETTE_MODE,
+                      OUTPUT_FORMATS, OUTPUT_FORMAT_LABELS, DEFAULT_OUTPUT_FORMAT, DEFAULT_LOSSY_QUALITY)
 
 
 class HotkeyEntry(tk.Frame):
@@ -198,6 +203,25 @@ class SettingsManager:
             'region_copy_to_clipboard': True,  # Default: copy to clipboard
             'fullscreen_copy_to_clipboard': False,  # Default: save to file
             'predefined_copy_to_clipboard': False,  # Default: save to file
+            'fullscreen_monitor': 'current',  # 'current' (under cursor) or 'all'
+            'png_profile': DEFAULT_PNG_PROFILE,  # see encoders.py / benchmarks/bench_png.py
+            'png_palette': DEFAULT_PALETTE_MODE,  # indexed PNG for captures with few colours
+            'png_parallel': False,  # multi-threaded PNG writer for very large captures (parallel_png.py)
+            # Output format per capture mode (see encoders.OUTPUT_FORMATS)
+            'region_format': DEFAULT_OUTPUT_FORMAT,
+            'fullscreen_format': DEFAULT_OUTPUT_FORMAT,
+            'predefined_format': DEFAULT_OUTPUT_FORMAT,
+            'lossy_quality': DEFAULT_LOSSY_QUALITY,  # JPEG / lossy WebP, 1-100
+            # Pre-capture ring buffer (step back in time with Left/Right in the editor)
+            'precapture_enabled': False,
+            'precapture_seconds': 4,
+            'precapture_fps': 4,
+            'precapture_memory_mb': 200,
+            # Blur tool (see redaction.py): pixelate cell size or blur radius in pixels
+            'redaction_mode': 'pixelate',
+            'redaction_strength': 10,
+            # Editor undo: redo steps and blur previews are trimmed past this
+            'undo_memory_mb': 128,
         }
         
         if os.path.exists(self.settings_file):
@@ -486,6 +510,81 @@ class SettingsManager:
         predefined_toggle.pack(fill=tk.X, pady=4)
         clipboard_toggles['predefined'] = predefined_toggle
         
+        all_monitors_var = tk.BooleanVar(value=self.settings.get('fullscreen_monitor', 'current') == 'all')
+        tk.Checkbutton(
+            output_frame,
+            text="Fullscreen captures all monitors (otherwise the one under the cursor)",
+            variable=all_monitors_var,
+            bg='#3c3c3c', fg='white', selectcolor='#2b2b2b',
+            activebackground='#3c3c3c', activeforeground='white',
+            font=('Arial', 9)
+        ).pack(anchor='w', pady=(4, 0))
+        
+        png_profile_var = tk.StringVar(value=self.settings.get('png_profile', DEFAULT_PNG_PROFILE))
+        png_row = tk.Frame(output_frame, bg='#3c3c3c')
+        png_row.pack(fill=tk.X, pady=(4, 0))
+        tk.Label(png_row, text="PNG compression:", bg='#3c3c3c', fg='white', font=('Arial', 9)).pack(side=tk.LEFT, padx=(0, 6))
+        for profile in PNG_PROFILES:
+            tk.Radiobutton(
+                png_row,
+                text=PNG_PROFILE_LABELS[profile],
+                value=profile,
+                variable=png_profile_var,
+                bg='#3c3c3c', fg='white', selectcolor='#2b2b2b',
+                activebackground='#3c3c3c', activeforeground='white',
+                font=('Arial', 9)
+            ).pack(side=tk.LEFT, padx=(0, 10))
+        
+        png_palette_var = tk.StringVar(value=self.settings.get('png_palette', DEFAULT_PALETTE_MODE))
+        palette_row = tk.Frame(output_frame, bg='#3c3c3c')
+        palette_row.pack(fill=tk.X, pady=(4, 0))
+        tk.Label(palette_row, text="Indexed colour:", bg='#3c3c3c', fg='white', font=('Arial', 9)).pack(side=tk.LEFT, padx=(0, 6))
+        for mode in PALETTE_MODES:
+            tk.Radiobutton(
+                palette_row,
+                text=PALETTE_MODE_LABELS[mode],
+                value=mode,
+                variable=png_palette_var,
+                bg='#3c3c3c', fg='white', selectcolor='#2b2b2b',
+                activebackground='#3c3c3c', activeforeground='white',
+                font=('Arial', 9)
+            ).pack(side=tk.LEFT, padx=(0, 10))
+        
+        png_parallel_var = tk.BooleanVar(value=self.settings.get('png_parallel', False))
+        tk.Checkbutton(
+            output_frame,
+            text="Multi-threaded PNG for very large captures (multi-monitor, 8K)",
+            variable=png_parallel_var,
+            bg='#3c3c3c', fg='white', selectcolor='#2b2b2b',
+            activebackground='#3c3c3c', activeforeground='white',
+            font=('Arial', 9)
+        ).pack(anchor='w', pady=(4, 0))
+        
+        format_names = {OUTPUT_FORMAT_LABELS[name]: name for name in OUTPUT_FORMATS}
+        format_vars = {}
+        for mode, label in (('region', "Region format:"), ('fullscreen', "Fullscreen format:"),
+                            ('predefined', "Predefined format:")):
+            format_row = tk.Frame(output_frame, bg='#3c3c3c')
+            format_row.pack(fill=tk.X, pady=(4, 0))
+            tk.Label(format_row, text=label, bg='#3c3c3c', fg='white', font=('Arial', 9), width=16, anchor='w').pack(side=tk.LEFT)
+            current = self.settings.get(f'{mode}_format', DEFAULT_OUTPUT_FORMAT)
+            format_vars[mode] = tk.StringVar(value=OUTPUT_FORMAT_LABELS.get(current, OUTPUT_FORMAT_LABELS[DEFAULT_OUTPUT_FORMAT]))
+            ttk.Combobox(
+                format_row,
+                textvariable=format_vars[mode],
+                values=list(format_names),
+                state='readonly',
+                width=20,
+                font=('Arial', 9)
+            ).pack(side=tk.LEFT)
+        
+        quality_row = tk.Frame(output_frame, bg='#3c3c3c')
+        quality_row.pack(fill=tk.X, pady=(4, 0))
+        tk.Label(quality_row, text="Lossy quality:", bg='#3c3c3c', fg='white', font=('Arial', 9), width=16, anchor='w').pack(side=tk.LEFT)
+        quality_var = tk.StringVar(value=str(self.settings.get('lossy_quality', DEFAULT_LOSSY_QUALITY)))
+        tk.Entry(quality_row, textvariable=quality_var, font=('Arial', 9), width=7, justify='center').pack(side=tk.LEFT, padx=(0, 6), ipady=2)
+        tk.Label(quality_row, text="1-100, for JPEG and lossy WebP", bg='#3c3c3c', fg='#888', font=('Arial', 8)).pack(side=tk.LEFT)
+        
         # === Predefined Area Section ===
         predefined_frame = tk.Frame(content_frame, bg='#3c3c3c', padx=15, pady=10)
         predefined_frame.pack(fill=tk.X, pady=(0, 8))
@@ -562,11 +661,8 @@ class SettingsManager:
                 bottom = int(bottom_var.get() or 0)
                 left = int(left_var.get() or 0)
                 right = int(right_var.get() or 0)
-                # Get screen size for preview
-                import ctypes
-                ctypes.windll.user32.SetProcessDPIAware()
-                sw = ctypes.windll.user32.GetSystemMetrics(0)
-                sh = ctypes.windll.user32.GetSystemMetrics(1)
+                # Get screen size for preview (cached, no system call per keystroke)
+                sw, sh = display_info.screen_size()
                 width = sw - left - right
                 height = sh - top - bottom
                 preview_label.config(
@@ -583,13 +679,99 @@ class SettingsManager:
         right_var.trace_add('write', update_preview)
         update_preview()
         
+        # === Pre-capture Section ===
+        precapture_frame = tk.Frame(content_frame, bg='#3c3c3c', padx=15, pady=10)
+        precapture_frame.pack(fill=tk.X, pady=(0, 8))
+        
+        tk.Label(
+            precapture_frame,
+            text="⏪ Pre-capture",
+            bg='#3c3c3c',
+            fg='white',
+            font=('Arial', 11, 'bold')
+        ).pack(anchor='w', pady=(0, 4))
+        
+        precapture_var = tk.BooleanVar(value=self.settings.get('precapture_enabled', False))
+        tk.Checkbutton(
+            precapture_frame,
+            text="Keep the last few seconds of the screen (use ← / → in the editor to step back)",
+            variable=precapture_var,
+            bg='#3c3c3c', fg='white', selectcolor='#2b2b2b',
+            activebackground='#3c3c3c', activeforeground='white',
+            font=('Arial', 9)
+        ).pack(anchor='w', pady=(0, 6))
+        
+        precapture_container = tk.Frame(precapture_frame, bg='#3c3c3c')
+        precapture_container.pack(fill=tk.X)
+        
+        seconds_row = tk.Frame(precapture_container, bg='#3c3c3c')
+        seconds_row.pack(fill=tk.X, pady=2)
+        tk.Label(seconds_row, text="Keep:", bg='#3c3c3c', fg='white', font=('Arial', 9), width=12, anchor='w').pack(side=tk.LEFT)
+        seconds_var = tk.StringVar(value=str(self.settings.get('precapture_seconds', 4)))
+        tk.Entry(seconds_row, textvariable=seconds_var, font=('Arial', 9), width=7, justify='center').pack(side=tk.LEFT, padx=(0, 6), ipady=2)
+        tk.Label(seconds_row, text="seconds", bg='#3c3c3c', fg='#888', font=('Arial', 8)).pack(side=tk.LEFT)
+        
+        fps_row = tk.Frame(precapture_container, bg='#3c3c3c')
+        fps_row.pack(fill=tk.X, pady=2)
+        tk.Label(fps_row, text="Frame rate:", bg='#3c3c3c', fg='white', font=('Arial', 9), width=12, anchor='w').pack(side=tk.LEFT)
+        fps_var = tk.StringVar(value=str(self.settings.get('precapture_fps', 4)))
+        tk.Entry(fps_row, textvariable=fps_var, font=('Arial', 9), width=7, justify='center').pack(side=tk.LEFT, padx=(0, 6), ipady=2)
+        tk.Label(fps_row, text="frames per second (lowered automatically on a static screen)", bg='#3c3c3c', fg='#888', font=('Arial', 8)).pack(side=tk.LEFT)
+        
+        memory_row = tk.Frame(precapture_container, bg='#3c3c3c')
+        memory_row.pack(fill=tk.X, pady=2)
+        tk.Label(memory_row, text="Memory limit:", bg='#3c3c3c', fg='white', font=('Arial', 9), width=12, anchor='w').pack(side=tk.LEFT)
+        memory_var = tk.StringVar(value=str(self.settings.get('precapture_memory_mb', 200)))
+        tk.Entry(memory_row, textvariable=memory_var, font=('Arial', 9), width=7, justify='center').pack(side=tk.LEFT, padx=(0, 6), ipady=2)
+        tk.Label(memory_row, text="MB", bg='#3c3c3c', fg='#888', font=('Arial', 8)).pack(side=tk.LEFT)
+        
+        # === Redaction Section ===
+        redaction_frame = tk.Frame(content_frame, bg='#3c3c3c', padx=15, pady=10)
+        redaction_frame.pack(fill=tk.X, pady=(0, 8))
+        
+        tk.Label(
+            redaction_frame,
+            text="▦ Blur / Redaction",
+            bg='#3c3c3c',
+            fg='white',
+            font=('Arial', 11, 'bold')
+        ).pack(anchor='w', pady=(0, 4))
+        
+        redaction_mode_var = tk.StringVar(value=self.settings.get('redaction_mode', 'pixelate'))
+        mode_row = tk.Frame(redaction_frame, bg='#3c3c3c')
+        mode_row.pack(fill=tk.X, pady=2)
+        for mode in REDACTION_MODES:
+            tk.Radiobutton(
+                mode_row,
+                text=REDACTION_LABELS[mode],
+                value=mode,
+                variable=redaction_mode_var,
+                bg='#3c3c3c', fg='white', selectcolor='#2b2b2b',
+                activebackground='#3c3c3c', activeforeground='white',
+                font=('Arial', 9)
+            ).pack(side=tk.LEFT, padx=(0, 10))
+        
+        strength_row = tk.Frame(redaction_frame, bg='#3c3c3c')
+        strength_row.pack(fill=tk.X, pady=2)
+        tk.Label(strength_row, text="Strength:", bg='#3c3c3c', fg='white', font=('Arial', 9), width=12, anchor='w').pack(side=tk.LEFT)
+        strength_var = tk.StringVar(value=str(self.settings.get('redaction_strength', 10)))
+        tk.Entry(strength_row, textvariable=strength_var, font=('Arial', 9), width=7, justify='center').pack(side=tk.LEFT, padx=(0, 6), ipady=2)
+        tk.Label(strength_row, text="pixels (block size or blur radius)", bg='#3c3c3c', fg='#888', font=('Arial', 8)).pack(side=tk.LEFT)
+        
+        undo_row = tk.Frame(redaction_frame, bg='#3c3c3c')
+        undo_row.pack(fill=tk.X, pady=2)
+        tk.Label(undo_row, text="Undo memory:", bg='#3c3c3c', fg='white', font=('Arial', 9), width=12, anchor='w').pack(side=tk.LEFT)
+        undo_memory_var = tk.StringVar(value=str(self.settings.get('undo_memory_mb', 128)))
+        tk.Entry(undo_row, textvariable=undo_memory_var, font=('Arial', 9), width=7, justify='center').pack(side=tk.LEFT, padx=(0, 6), ipady=2)
+        tk.Label(undo_row, text="MB (redo steps and blur previews)", bg='#3c3c3c', fg='#888', font=('Arial', 8)).pack(side=tk.LEFT)
+        
         # === Info Section ===
         info_frame = tk.Frame(content_frame, bg='#2b2b2b')
         info_frame.pack(fill=tk.X, pady=8)
         
         tk.Label(
             info_frame,
-            text="⚠️ Changes to hotkeys require restarting the application.",
+            text="⚠️ Changes to hotkeys and pre-capture require restarting the application.",
             bg='#2b2b2b',
             fg='#ffaa00',
             font=('Arial', 9),
@@ -630,6 +812,52 @@ class SettingsManager:
                 messagebox.showerror("Error", "Offset values must be valid numbers")
                 return
             
+            # Validate pre-capture options
+            try:
+                precapture_seconds = float(seconds_var.get())
+                precapture_fps = float(fps_var.get())
+                precapture_memory = int(memory_var.get())
+                
+                if precapture_seconds <= 0 or precapture_fps <= 0 or precapture_memory <= 0:
+                    messagebox.showerror("Error", "Pre-capture values must be greater than zero")
+                    return
+            except ValueError:
+                messagebox.showerror("Error", "Pre-capture values must be valid numbers")
+                return
+            
+            # Validate redaction strength
+            try:
+                redaction_strength = int(strength_var.get())
+                
+                if redaction_strength <= 0:
+                    messagebox.showerror("Error", "Redaction strength must be greater than zero")
+                    return
+            except ValueError:
+                messagebox.showerror("Error", "Redaction strength must be a whole number")
+                return
+            
+            # Validate undo memory
+            try:
+                undo_memory = int(undo_memory_var.get())
+                
+                if undo_memory <= 0:
+                    messagebox.showerror("Error", "Undo memory must be greater than zero")
+                    return
+            except ValueError:
+                messagebox.showerror("Error", "Undo memory must be a whole number of MB")
+                return
+            
+            # Validate lossy quality
+            try:
+                lossy_quality = int(quality_var.get())
+                
+                if not 1 <= lossy_quality <= 100:
+                    messagebox.showerror("Error", "Lossy quality must be between 1 and 100")
+                    return
+            except ValueError:
+                messagebox.showerror("Error", "Lossy quality must be a whole number")
+                return
+            
             # Check for duplicate hotkeys
             hotkeys = [
                 hotkey_fullscreen.get(),
@@ -657,6 +885,24 @@ class SettingsManager:
             self.settings['region_copy_to_clipboard'] = clipboard_toggles['region'].get()
             self.settings['fullscreen_copy_to_clipboard'] = clipboard_toggles['fullscreen'].get()
             self.settings['predefined_copy_to_clipboard'] = clipboard_toggles['predefined'].get()
+            self.settings['fullscreen_monitor'] = 'all' if all_monitors_var.get() else 'current'
+            self.settings['png_profile'] = png_profile_var.get()
+            self.settings['png_palette'] = png_palette_var.get()
+            self.settings['png_parallel'] = png_parallel_var.get()
+            for mode, var in format_vars.items():
+                self.settings[f'{mode}_format'] = format_names[var.get()]
+            self.settings['lossy_quality'] = lossy_quality
+            
+            # Save pre-capture options
+            self.settings['precapture_enabled'] = precapture_var.get()
+            self.settings['precapture_seconds'] = precapture_seconds
+            self.settings['precapture_fps'] = precapture_fps
+            self.settings['precapture_memory_mb'] = precapture_memory
+            
+            # Save redaction options
+            self.settings['redaction_mode'] = redaction_mode_var.get()
+            self.settings['redaction_strength'] = redaction_strength
+            self.settings['undo_memory_mb'] = undo_memory
             
             if self.save_settings():
                 # Update config
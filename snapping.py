@@ -0,0 +1,135 @@
+import threading
+from bisect import bisect_left, bisect_right
+from concurrent.futures import Future
+import numpy as np
+
+
+def find_edge_segments(gray, axis, threshold=24, min_length=40):
+    """
+    Long straight edges in a grayscale frame, found with vectorized run detection.
+
+    axis=0 finds horizontal edges (brightness jumps between two rows),
+    axis=1 vertical ones. Returns (position, start, end) arrays where position
+    is the boundary (the first row/column after the jump) and [start, end) is
+    the extent along the edge.
+    """
+    if axis == 1:
+        gray = gray.T
+    jumps = np.abs(gray[1:, :] - gray[:-1, :]) > threshold
+
+    # Run starts/ends of consecutive jump pixels along each boundary line
+    padded = np.zeros((jumps.shape[0], jumps.shape[1] + 2), dtype=np.int8)
+    padded[:, 1:-1] = jumps
+    steps = np.diff(padded, axis=1)
+    rows, starts = np.nonzero(steps == 1)
+    _, ends = np.nonzero(steps == -1)
+
+    keep = (ends - starts) >= min_length
+    return rows[keep] + 1, starts[keep], ends[keep]
+
+
+class EdgeIndex:
+    """
+    Edges bucketed along their extent, sorted by position within a bucket.
+
+    A query for the nearest edge before/after a point bisects one bucket and
+    walks outward only past edges that end inside the bucket, so lookups are
+    O(log n) in practice regardless of how many edges the frame has.
+    """
+
+    def __init__(self, positions, starts, ends, length, bucket=32):
+        self.bucket = bucket
+        self.buckets = [[] for _ in range(length // bucket + 1)]
+        for position, start, end in zip(positions.tolist(), starts.tolist(), ends.tolist()):
+            for b in range(start // bucket, (end - 1) // bucket + 1):
+                self.buckets[b].append((position, start, end))
+        self.keys = []
+        for entries in self.buckets:
+            entries.sort()
+            self.keys.append([entry[0] for entry in entries])
+
+    def _lookup(self, along):
+        b = along // self.bucket
+        if 0 <= b < len(self.buckets):
+            return self.buckets[b], self.keys[b]
+        return [], []
+
+    def before(self, position, along):
+        """Nearest edge at or before position whose extent covers along"""
+        entries, keys = self._lookup(along)
+        for i in range(bisect_right(keys, position) - 1, -1, -1):
+            edge, start, end = entries[i]
+            if start <= along < end:
+                return edge
+        return None
+
+    def after(self, position, along):
+        """Nearest edge strictly after position whose extent covers along"""
+        entries, keys = self._lookup(along)
+        for i in range(bisect_right(keys, position), len(entries)):
+            edge, start, end = entries[i]
+            if start <= along < end:
+                return edge
+        return None
+
+    def nearest(self, position, along, radius):
+        """Closest edge within radius of position, or None"""
+        entries, keys = self._lookup(along)
+        best = None
+        for i in range(bisect_left(keys, position - radius), len(entries)):
+            edge, start, end = entries[i]
+            if edge > position + radius:
+                break
+            if start <= along < end and (best is None or abs(edge - position) < abs(best - position)):
+                best = edge
+        return best
+
+
+class SnapMap:
+    """UI-edge map of one frame: hover rectangles and edge snapping"""
+
+    def __init__(self, img, min_size=16):
+        self.width, self.height = img.size
+        self.min_size = min_size
+
+        gray = np.asarray(img.convert('L'), dtype=np.int16)
+        self.rows = EdgeIndex(*find_edge_segments(gray, 0), self.width)
+        self.cols = EdgeIndex(*find_edge_segments(gray, 1), self.height)
+
+    def rect_at(self, x, y):
+        """Innermost rectangle of edges around (x, y), or None"""
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return None
+        top = self.rows.before(y, x)
+        bottom = self.rows.after(y, x)
+        left = self.cols.before(x, y)
+        right = self.cols.after(x, y)
+
+        x1 = 0 if left is None else left
+        y1 = 0 if top is None else top
+        x2 = self.width if right is None else right
+        y2 = self.height if bottom is None else bottom
+        if x2 - x1 < self.min_size or y2 - y1 < self.min_size:
+            return None
+        return (x1, y1, x2, y2)
+
+    def snap_point(self, x, y, radius=6):
+        """Pull a drag corner onto nearby edges"""
+        snapped_x = self.cols.nearest(x, y, radius)
+        snapped_y = self.rows.nearest(y, x, radius)
+        return (x if snapped_x is None else snapped_x,
+                y if snapped_y is None else snapped_y)
+
+
+def start_snap_detection(img):
+    """Build a SnapMap on a worker thread; returns a Future for it"""
+    future = Future()
+
+    def work():
+        try:
+            future.set_result(SnapMap(img))
+        except Exception as e:
+            future.set_exception(e)
+
+    threading.Thread(target=work, daemon=True).start()
+    return future